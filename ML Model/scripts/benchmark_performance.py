@@ -0,0 +1,508 @@
+"""
+Performance benchmarks for the ML pipeline.
+
+Each variant runs in a fresh process so peak RSS is measured independently
+of the other variants.
+
+Usage:
+    python scripts/benchmark_performance.py feature-pipeline --rows 1000000
+    python scripts/benchmark_performance.py load-data --rows 1000000
+    python scripts/benchmark_performance.py tuning --rows 5000 --cv 3
+    python scripts/benchmark_performance.py accelerometer --vehicles 40
+    python scripts/benchmark_performance.py tpe --model rf --rows 5000 --cv 3
+    python scripts/benchmark_performance.py metrics --rows 10000000
+    python scripts/benchmark_performance.py bootstrap --rows 1000000 --replicates 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Ensure src/ modules are importable when running from repository root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB."""
+    # VmHWM is reset on exec; ru_maxrss can carry over the parent's peak on Linux
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_isolated(func, *args):
+    """Run func(*args) in a freshly spawned process and return its result."""
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def make_dispatch_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic dispatch log with the columns used by the feature pipeline."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01")
+    return pd.DataFrame({
+        "timestamp": start + pd.to_timedelta(np.sort(rng.integers(0, 90 * 86400, rows)), unit="s"),
+        "latitude": rng.normal(12.9716, 0.1, rows),
+        "longitude": rng.normal(77.5946, 0.1, rows),
+        "severity": rng.choice(["Low", "Medium", "High"], rows, p=[0.5, 0.3, 0.2]),
+        "acceleration_x": rng.normal(0, 1, rows),
+        "estimated_response_time": rng.normal(10, 3, rows),
+    })
+
+
+def print_table(rows) -> None:
+    df = pd.DataFrame(rows)
+    print(df.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+
+# --------------------------------------------------------------------------- #
+# Feature pipeline
+# --------------------------------------------------------------------------- #
+def _feature_pipeline_variant(rows: int, assemble_once: bool) -> dict:
+    from src.feature_engineering import EnhancedFeatureEngineer
+
+    df = make_dispatch_frame(rows)
+    rss_input = peak_rss_mb()
+
+    start = time.perf_counter()
+    engineer = EnhancedFeatureEngineer(df, copy=not assemble_once)
+    result = engineer.create_all_features(
+        timestamp_column="timestamp",
+        lat_col="latitude",
+        lon_col="longitude",
+        severity_col="severity",
+        lag_columns=["estimated_response_time"],
+        group_column="grid_zone",
+        assemble_once=assemble_once,
+    )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "variant": "assemble_once" if assemble_once else "per-stage (default)",
+        "rows": rows,
+        "columns_out": result.shape[1],
+        "seconds": elapsed,
+        "input_rss_mb": rss_input,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_feature_pipeline(args: argparse.Namespace) -> None:
+    results = [
+        run_isolated(_feature_pipeline_variant, args.rows, False),
+        run_isolated(_feature_pipeline_variant, args.rows, True),
+    ]
+    print("\nEnhancedFeatureEngineer.create_all_features")
+    print_table(results)
+
+
+# --------------------------------------------------------------------------- #
+# Data loading
+# --------------------------------------------------------------------------- #
+def _load_data_variant(path: str, label: str, load_kwargs: dict) -> dict:
+    from src.data_analysis import DataAnalyzer
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    df = DataAnalyzer(path).load_data(**load_kwargs)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "variant": label,
+        "seconds": elapsed,
+        "frame_mb": df.memory_usage(deep=True).sum() / 1024**2,
+        "peak_rss_delta_mb": peak_rss_mb() - rss_before,
+    }
+
+
+def bench_load_data(args: argparse.Namespace) -> None:
+    import tempfile
+
+    from src.data_analysis import DISPATCH_SCHEMA
+
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="load_bench_"))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = work_dir / "dispatch.csv"
+    df = make_dispatch_frame(args.rows)
+    df.to_csv(csv_path, index=False)
+    typed = df.astype({col: dtype for col, dtype in DISPATCH_SCHEMA.items()
+                       if col in df.columns and dtype != "datetime"})
+    typed.to_parquet(work_dir / "dispatch_typed.parquet", index=False)
+    typed.to_feather(work_dir / "dispatch_typed.feather")
+    del df, typed
+
+    csv = str(csv_path)
+    variants = [
+        (csv, "csv default", {}),
+        (csv, "csv + schema", {"schema": DISPATCH_SCHEMA}),
+        (csv, "csv + schema, pyarrow", {"schema": DISPATCH_SCHEMA, "engine": "pyarrow"}),
+        (csv, "csv + schema, chunked", {"schema": DISPATCH_SCHEMA, "chunksize": 200_000}),
+        (csv, "csv + schema, 2 columns", {"schema": DISPATCH_SCHEMA,
+                                          "columns": ["severity", "estimated_response_time"]}),
+        (csv, "csv -> parquet cache (1st run)", {"schema": DISPATCH_SCHEMA, "cache": True}),
+        (csv, "csv -> parquet cache (2nd run)", {"schema": DISPATCH_SCHEMA, "cache": True}),
+        (str(work_dir / "dispatch_typed.parquet"), "parquet", {}),
+        (str(work_dir / "dispatch_typed.feather"), "feather", {}),
+    ]
+    results = [run_isolated(_load_data_variant, path, label, kwargs)
+               for path, label, kwargs in variants]
+    print(f"\nDataAnalyzer.load_data ({args.rows:,} rows, files in {work_dir})")
+    print_table(results)
+
+
+# --------------------------------------------------------------------------- #
+# Hyperparameter search
+# --------------------------------------------------------------------------- #
+def _tuning_variant(rows: int, cv: int, n_jobs: int, label: str, tune_kwargs: dict) -> dict:
+    from sklearn.datasets import make_classification
+    from sklearn.metrics import f1_score
+    from src.model_training import EnhancedModelTuner
+
+    X, y = make_classification(n_samples=rows, n_features=20, n_informative=8,
+                               n_classes=3, random_state=42)
+    tuner = EnhancedModelTuner(pd.DataFrame(X), y, task_type="classification", random_state=42)
+    tuner.split_data()
+    model, _ = tuner.tune_random_forest(cv=cv, n_jobs=n_jobs, verbose=0, **tune_kwargs)
+
+    return {
+        "variant": label,
+        "seconds": tuner.rf_search_seconds,
+        "best_cv_f1_macro": tuner.rf_best_score,
+        "test_f1_macro": f1_score(tuner.y_test, model.predict(tuner.X_test), average="macro"),
+    }
+
+
+def bench_tuning(args: argparse.Namespace) -> None:
+    variants = [
+        ("grid (432 configs)", {"method": "grid", "share_checkpoints": False}),
+        ("grid, warm-start checkpoints", {"method": "grid"}),
+        ("random (50 configs)", {"method": "random", "share_checkpoints": False}),
+        ("random, warm-start checkpoints", {"method": "random"}),
+        ("halving, n_estimators", {"method": "halving"}),
+        ("halving, n_samples", {"method": "halving", "resource": "n_samples"}),
+        (f"halving, max_fits={args.max_fits}", {"method": "halving", "max_fits": args.max_fits}),
+    ]
+    if args.skip_grid:
+        variants = variants[2:]
+    results = [run_isolated(_tuning_variant, args.rows, args.cv, args.n_jobs, label, kwargs)
+               for label, kwargs in variants]
+    print(f"\nEnhancedModelTuner.tune_random_forest ({args.rows:,} rows, {args.cv}-fold CV)")
+    print_table(results)
+
+
+def _search_fits(search, cv: int) -> int:
+    """Model fits a fitted search needed (sklearn searches fit every candidate on every fold)."""
+    if hasattr(search, "n_fits_"):
+        return int(search.n_fits_)
+    return len(search.cv_results_["params"]) * cv
+
+
+def _fits_to_reach(search, target: float) -> float:
+    """Fits a TPE search used until its best completed trial reached target (nan if never)."""
+    results = pd.DataFrame(search.cv_results_)
+    reached = results[(results["state"] == "complete") & (results["mean_test_score"] >= target)]
+    return float(reached["n_fits"].iloc[0]) if len(reached) else float("nan")
+
+
+def _tpe_variant(model: str, rows: int, cv: int, n_jobs: int, label: str,
+                 tune_kwargs: dict, target: float | None) -> dict:
+    from sklearn.datasets import make_classification
+    from src.model_training import EnhancedModelTuner
+
+    X, y = make_classification(n_samples=rows, n_features=20, n_informative=8,
+                               n_classes=3, random_state=42)
+    tuner = EnhancedModelTuner(pd.DataFrame(X), y, task_type="classification", random_state=42)
+    tuner.split_data()
+    tune = {"rf": tuner.tune_random_forest, "gb": tuner.tune_gradient_boosting,
+            "xgb": tuner.tune_xgboost}[model]
+    start = time.perf_counter()
+    tune(cv=cv, n_jobs=n_jobs, verbose=0, **tune_kwargs)
+    seconds = time.perf_counter() - start
+    search = getattr(tuner, f"{model}_search")
+
+    result = {
+        "variant": label,
+        "seconds": seconds,
+        "best_cv_f1_macro": search.best_score_,
+        "fits": _search_fits(search, cv),
+    }
+    if target is not None:
+        result["fits_to_grid_best"] = _fits_to_reach(search, target)
+    return result
+
+
+def bench_tpe(args: argparse.Namespace) -> None:
+    grid_kwargs = {"method": "grid"}
+    if args.model == "rf":
+        grid_kwargs["share_checkpoints"] = False
+    grid = run_isolated(_tpe_variant, args.model, args.rows, args.cv, args.n_jobs,
+                        "grid (all configs)", grid_kwargs, None)
+    # Within 0.5% of the grid's best counts as reaching it
+    target = grid["best_cv_f1_macro"] - 0.005 * abs(grid["best_cv_f1_macro"])
+    results = [grid]
+    for n_trials in args.trials:
+        results.append(run_isolated(_tpe_variant, args.model, args.rows, args.cv, args.n_jobs,
+                                    f"tpe ({n_trials} trials)",
+                                    {"method": "tpe", "n_trials": n_trials}, target))
+    print(f"\nEnhancedModelTuner {args.model} search ({args.rows:,} rows, {args.cv}-fold CV)")
+    print_table(results)
+
+
+# --------------------------------------------------------------------------- #
+# Accelerometer detector
+# --------------------------------------------------------------------------- #
+def make_accelerometer_frame(vehicles: int, samples: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic 50 Hz accelerometer streams with short crash bursts."""
+    rng = np.random.default_rng(seed)
+    rows = vehicles * samples
+    accident = np.zeros(rows, dtype=int)
+    for start in rng.integers(0, rows - 50, rows // 2_000):
+        accident[start:start + 50] = 1
+    noise = rng.normal(0, 1, (rows, 3)) + accident[:, None] * rng.normal(0, 6, (rows, 3))
+    return pd.DataFrame({
+        "timestamp": np.tile(np.arange(samples), vehicles),
+        "vehicle_id": np.repeat([f"v{i:03d}" for i in range(vehicles)], samples),
+        "accel_x": noise[:, 0],
+        "accel_y": noise[:, 1],
+        "accel_z": noise[:, 2] + 9.81,
+        "accident": accident,
+    })
+
+
+def _accelerometer_variant(vehicles: int, samples: int, requests: int, label: str,
+                           scale_features: bool) -> dict:
+    from src.model_training import AccelerometerAccidentDetector
+
+    df = make_accelerometer_frame(vehicles, samples)
+    detector = AccelerometerAccidentDetector(scale_features=scale_features,
+                                             early_stopping_rounds=30)
+
+    start = time.perf_counter()
+    artifacts = detector.fit(df)
+    fit_seconds = time.perf_counter() - start
+
+    features = detector.last_features_
+    X = features[artifacts.feature_columns].to_numpy(dtype=np.float32)
+    y = features["label"].to_numpy()
+    start = time.perf_counter()
+    detector.cross_validate(X, y, n_splits=5, groups=features["vehicle_id"].to_numpy(), n_jobs=-1)
+    cv_seconds = time.perf_counter() - start
+
+    # One window per request, as the serving endpoint scores them
+    latencies = []
+    for row in X[:requests]:
+        start = time.perf_counter()
+        artifacts.pipeline.predict_proba(row[None, :])
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "variant": label,
+        "fit_s": fit_seconds,
+        "cv_s": cv_seconds,
+        "predict_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "predict_p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "roc_auc": artifacts.metrics["roc_auc"],
+    }
+
+
+def bench_accelerometer(args: argparse.Namespace) -> None:
+    variants = [
+        ("StandardScaler + XGBClassifier", True),
+        ("tree pipeline + QuantileDMatrix", False),
+    ]
+    results = [run_isolated(_accelerometer_variant, args.vehicles, args.samples, args.requests,
+                            label, scale)
+               for label, scale in variants]
+    print(f"\nAccelerometerAccidentDetector ({args.vehicles} vehicles x {args.samples:,} samples)")
+    print_table(results)
+
+
+# --------------------------------------------------------------------------- #
+# Classification metrics
+# --------------------------------------------------------------------------- #
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def bench_metrics(args: argparse.Namespace) -> None:
+    from sklearn import metrics as skm
+
+    from src.evaluation.metric_engine import (
+        binary_curve, confusion_counts, metrics_from_confusion,
+        precision_recall_from_curve, roc_auc_from_curve, threshold_sweep,
+    )
+
+    rng = np.random.default_rng(42)
+    y_true = rng.integers(0, args.classes, args.rows)
+    # Predictions agree with the truth about 70% of the time
+    y_pred = np.where(rng.random(args.rows) < 0.7, y_true, rng.integers(0, args.classes, args.rows))
+
+    def sklearn_metrics():
+        scores = {}
+        for average in (None, "micro", "macro", "weighted"):
+            for name, func in (("precision", skm.precision_score), ("recall", skm.recall_score),
+                               ("f1", skm.f1_score)):
+                scores[name, average] = func(y_true, y_pred, average=average, zero_division=0)
+        return skm.confusion_matrix(y_true, y_pred), skm.accuracy_score(y_true, y_pred), scores
+
+    (expected_cm, expected_accuracy, expected), sklearn_seconds = _timed(sklearn_metrics)
+    engine, engine_seconds = _timed(lambda: metrics_from_confusion(confusion_counts(y_true, y_pred)[1]))
+    matches = (np.array_equal(expected_cm, engine["confusion_matrix"])
+               and np.isclose(expected_accuracy, engine["accuracy"], rtol=1e-12, atol=0)
+               and all(np.allclose(value, engine[f"{name}_per_class"] if average is None
+                                   else engine[average][name], rtol=1e-12, atol=0)
+                       for (name, average), value in expected.items()))
+
+    # Binary scores, rounded so many predictions share a threshold
+    labels = (rng.random(args.rows) < 0.1).astype(int)
+    scores = np.round(np.clip(labels * 0.3 + rng.random(args.rows) * 0.7, 0, 1), 4)
+
+    def sklearn_sweep():
+        return (skm.precision_recall_curve(labels, scores), skm.roc_auc_score(labels, scores))
+
+    def engine_sweep():
+        curve = binary_curve(labels, scores)
+        return (precision_recall_from_curve(*curve), roc_auc_from_curve(*curve[:2]),
+                threshold_sweep(*curve))
+
+    (expected_pr, expected_auc), sklearn_sweep_seconds = _timed(sklearn_sweep)
+    (engine_pr, engine_auc, sweep), engine_sweep_seconds = _timed(engine_sweep)
+    sweep_matches = (all(np.array_equal(a, b) for a, b in zip(expected_pr, engine_pr))
+                     and np.isclose(expected_auc, engine_auc, rtol=1e-12, atol=0))
+
+    print(f"\nClassification metrics ({args.rows:,} predictions, {args.classes} classes)")
+    print_table([
+        {"task": "confusion matrix + all averages", "sklearn_s": sklearn_seconds,
+         "engine_s": engine_seconds, "matches": matches},
+        {"task": f"PR curve + ROC-AUC ({len(sweep):,} thresholds)", "sklearn_s": sklearn_sweep_seconds,
+         "engine_s": engine_sweep_seconds, "matches": sweep_matches},
+    ])
+
+
+def bench_bootstrap(args: argparse.Namespace) -> None:
+    from src.evaluation.bootstrap import bootstrap_metrics
+
+    rng = np.random.default_rng(42)
+    labels = (rng.random(args.rows) < 0.05).astype(int)
+    scores = np.round(np.clip(labels * 0.35 + rng.random(args.rows) * 0.65, 0, 1), 4)
+    predictions = (scores >= 0.5).astype(int)
+
+    rows = []
+    for n_jobs in args.n_jobs:
+        result, seconds = _timed(lambda: bootstrap_metrics(
+            labels, predictions, scores, n_replicates=args.replicates, n_jobs=n_jobs))
+        rows.append({"n_jobs": n_jobs, "seconds": seconds,
+                     "replicates_per_s": args.replicates / seconds})
+
+    print(f"\nBootstrap CIs ({args.rows:,} windows, {args.replicates} replicates)")
+    print_table(rows)
+    print("\n95% intervals")
+    print(result.summary().to_string(float_format=lambda v: f"{v:.4f}"))
+    print("\nCI width by replicate count")
+    print(result.ci_width_by_replicates().to_string(float_format=lambda v: f"{v:.4f}"))
+
+
+# --------------------------------------------------------------------------- #
+# CLI
+# --------------------------------------------------------------------------- #
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    feature = subparsers.add_parser(
+        "feature-pipeline",
+        help="Peak RSS and wall time of the enhanced feature pipeline.",
+    )
+    feature.add_argument("--rows", type=int, default=1_000_000, help="Synthetic rows.")
+    feature.set_defaults(func=bench_feature_pipeline)
+
+    load = subparsers.add_parser(
+        "load-data",
+        help="Load time and memory of DataAnalyzer.load_data per format/option.",
+    )
+    load.add_argument("--rows", type=int, default=1_000_000, help="Synthetic rows.")
+    load.add_argument("--work-dir", type=str, default=None,
+                      help="Directory for the generated files (default: temp dir).")
+    load.set_defaults(func=bench_load_data)
+
+    tuning = subparsers.add_parser(
+        "tuning",
+        help="Best score and wall time of grid, random, checkpoint and successive-halving search.",
+    )
+    tuning.add_argument("--rows", type=int, default=5_000, help="Synthetic rows.")
+    tuning.add_argument("--cv", type=int, default=3, help="Cross-validation folds.")
+    tuning.add_argument("--n-jobs", type=int, default=-1, help="Parallel jobs per search.")
+    tuning.add_argument("--max-fits", type=int, default=150, help="Fit budget for the budgeted halving run.")
+    tuning.add_argument("--skip-grid", action="store_true", help="Skip the (slow) full grid searches.")
+    tuning.set_defaults(func=bench_tuning)
+
+    tpe = subparsers.add_parser(
+        "tpe",
+        help="Best score, fits and fits-to-grid-best of TPE search versus the full grid.",
+    )
+    tpe.add_argument("--model", choices=("rf", "gb", "xgb"), default="rf", help="Model to tune.")
+    tpe.add_argument("--rows", type=int, default=5_000, help="Synthetic rows.")
+    tpe.add_argument("--cv", type=int, default=3, help="Cross-validation folds.")
+    tpe.add_argument("--n-jobs", type=int, default=-1, help="Parallel jobs per search.")
+    tpe.add_argument("--trials", type=int, nargs="+", default=[25, 50, 100],
+                     help="TPE trial budgets to compare.")
+    tpe.set_defaults(func=bench_tpe)
+
+    accel = subparsers.add_parser(
+        "accelerometer",
+        help="Train/CV time and per-request latency with and without the scaler.",
+    )
+    accel.add_argument("--vehicles", type=int, default=40, help="Synthetic vehicles.")
+    accel.add_argument("--samples", type=int, default=20_000, help="Samples per vehicle.")
+    accel.add_argument("--requests", type=int, default=500, help="Single-window predictions timed.")
+    accel.set_defaults(func=bench_accelerometer)
+
+    metrics = subparsers.add_parser(
+        "metrics",
+        help="sklearn metrics versus the single-pass metric engine (checks they match).",
+    )
+    metrics.add_argument("--rows", type=int, default=10_000_000, help="Synthetic predictions.")
+    metrics.add_argument("--classes", type=int, default=3, help="Number of classes.")
+    metrics.set_defaults(func=bench_metrics)
+
+    bootstrap = subparsers.add_parser(
+        "bootstrap",
+        help="Wall time of bootstrap confidence intervals and CI width versus replicates.",
+    )
+    bootstrap.add_argument("--rows", type=int, default=1_000_000, help="Synthetic windows.")
+    bootstrap.add_argument("--replicates", type=int, default=1000, help="Bootstrap replicates.")
+    bootstrap.add_argument("--n-jobs", type=int, nargs="+", default=[1, -1],
+                           help="Worker process counts to compare.")
+    bootstrap.set_defaults(func=bench_bootstrap)
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
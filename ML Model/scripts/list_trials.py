@@ -0,0 +1,69 @@
+"""
+List the best hyperparameter trials recorded in the tuning trial store.
+
+Usage:
+    python scripts/list_trials.py --top 10
+    python scripts/list_trials.py --store output/tuning_trials.sqlite \
+        --estimator RandomForestClassifier --fingerprint 3fa2
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure src/ modules are importable when running from repository root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.model_training.trial_store import TrialStore
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="List the best stored tuning trials.")
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=str(PROJECT_ROOT / "output" / "tuning_trials.sqlite"),
+        help="Trial store SQLite file.",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Number of trials to show.")
+    parser.add_argument(
+        "--estimator",
+        type=str,
+        default=None,
+        help="Only show trials of this estimator class (e.g. RandomForestClassifier).",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        type=str,
+        default=None,
+        help="Only show trials on data whose fingerprint starts with this prefix.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    store_path = Path(args.store)
+    if not store_path.exists():
+        raise FileNotFoundError(f"Trial store not found at {store_path}")
+
+    trials = TrialStore(store_path).best_trials(
+        n=args.top, estimator=args.estimator, data_fingerprint=args.fingerprint
+    )
+    if trials.empty:
+        print("No trials found.")
+        return
+
+    trials["data_fingerprint"] = trials["data_fingerprint"].str[:10]
+    with pd.option_context("display.max_colwidth", 120, "display.width", 200):
+        print(trials.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
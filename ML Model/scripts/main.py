@@ -191,6 +191,8 @@ def main():
     
     # Save model
     model_path = trainer.save_model('models/accident_severity_model.pkl')
+    if feature_engineer.category_vocabularies:
+        feature_engineer.save_category_vocabularies('models/category_vocabularies.json')
     
     # Step 4: Generate Output for Visualization
     print("\n[Step 4] Generating visualization output...")
@@ -22,6 +22,7 @@ try:
     from src.feature_engineering.enhanced_feature_engineering import EnhancedFeatureEngineer
     from src.model_training.enhanced_model_tuning import EnhancedModelTuner
     from src.evaluation.comprehensive_evaluation import ComprehensiveEvaluator
+    from src.evaluation.plot_renderer import PlotRenderer
     from src.visualization.visualization_integration import VisualizationDashboard
 except ImportError as e:
     print(f"Error importing modules: {e}")
@@ -212,7 +213,9 @@ def run_pipeline(df, task_type='classification', quick_mode=True):
     
     # Step 4: Evaluation
     print("\n[4/5] Model Evaluation...")
-    evaluator = ComprehensiveEvaluator(task_type=task_type)
+    # Plots are queued and rendered in parallel once all metrics are computed
+    renderer = PlotRenderer(deferred=True, dpi=150 if quick_mode else 300)
+    evaluator = ComprehensiveEvaluator(task_type=task_type, renderer=renderer)
     
     if task_type == 'classification':
         y_pred = best_model.predict(tuner.X_test)
@@ -283,9 +286,18 @@ def run_pipeline(df, task_type='classification', quick_mode=True):
             lat_col=lat_col,
             lon_col=lon_col,
             timestamp_col=timestamp_col,
-            severity_col=severity_col
+            severity_col=severity_col,
+            renderer=renderer
         )
         
+        # Pre-compute hotspot pyramid (read by the heatmaps and the /hotspots API)
+        if lat_col and lon_col:
+            try:
+                dashboard.build_hotspots(save_path=str(output_dir / 'hotspots.npz'),
+                                         by_hour_of_week=bool(timestamp_col))
+            except Exception as e:
+                print(f"  Warning: Could not build hotspot pyramid: {e}")
+        
         # Create heatmap
         if lat_col and lon_col:
             try:
@@ -304,6 +316,8 @@ def run_pipeline(df, task_type='classification', quick_mode=True):
     except Exception as e:
         print(f"  Warning: Could not create visualizations: {e}")
     
+    renderer.render()
+    
     # Save models
     try:
         import joblib
@@ -319,7 +333,7 @@ def run_pipeline(df, task_type='classification', quick_mode=True):
     print("  - Confusion matrix / prediction plots")
     print("  - ROC curve plot")
     print("  - Feature importance plot")
-    print("  - Heatmap (if coordinates available)")
+    print("  - Heatmap and hotspots.npz pyramid (if coordinates available)")
     print("  - Time-series chart (if timestamp available)")
     print(f"Models saved in {models_dir}")
     print("\n" + "="*80)
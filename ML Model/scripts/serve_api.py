@@ -1,8 +1,27 @@
 import os
 import json
+import threading
+import zlib
+import importlib.util
+from pathlib import Path
 import numpy as np
 import joblib
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+def _load_module(name, path):
+    """Import a standalone module by file path, without running its package __init__"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# hotspot_tiles needs only numpy/pandas; importing it through src.visualization
+# would load the whole dashboard stack (matplotlib, seaborn, folium, plotly)
+HotspotPyramid = _load_module(
+    "hotspot_tiles", PROJECT_ROOT / "src" / "visualization" / "hotspot_tiles.py"
+).HotspotPyramid
 
 app = Flask(__name__)
 
@@ -30,7 +49,7 @@ def index():
     return jsonify({
         "status": "ok",
         "message": "COE model API",
-        "endpoints": ["/health", "/predict", "/predict_batch", "/predictions"],
+        "endpoints": ["/health", "/predict", "/predict_batch", "/predictions", "/hotspots"],
         "models": list(MODELS.keys()),
     })
 
@@ -74,21 +93,297 @@ def predict_batch():
         resp["probabilities"] = p
     return jsonify(resp)
 
+class PredictionSnapshot:
+    """
+    One version of the predictions file as columnar arrays
+
+    Built once per file version and never modified afterwards, so requests
+    can query it without holding the store's lock.
+    """
+
+    def __init__(self, metadata, records, etag):
+        self.metadata = metadata
+        self.etag = etag
+        n = len(records)
+
+        def column(name, default, dtype):
+            return np.array([r.get(name, default) for r in records], dtype=dtype)
+
+        self.id = column("id", -1, np.int64)
+        self.severity = column("severity", None, object)
+        self.severity_code = column("severity_code", -1, np.int64)
+        self.confidence = column("confidence", np.nan, float)
+        self.latitude = column("latitude", np.nan, float)
+        self.longitude = column("longitude", np.nan, float)
+        self.has_coordinates = np.isfinite(self.latitude) & np.isfinite(self.longitude)
+        self.actual_severity = column("actual_severity", None, object)
+        self.actual_severity_code = column("actual_severity_code", -1, np.int64)
+        self.prediction_correct = column("prediction_correct", False, bool)
+        self.has_actual = np.array(["actual_severity_code" in r for r in records], dtype=bool)
+
+        self.probability_labels = list(records[0].get("probabilities", {})) if n else []
+        self.probabilities = np.array(
+            [[r.get("probabilities", {}).get(label, np.nan) for label in self.probability_labels]
+             for r in records],
+            dtype=float,
+        ).reshape(n, len(self.probability_labels))
+
+    def __len__(self):
+        return len(self.id)
+
+    def select(self, bbox=None, severities=None, min_confidence=None, max_confidence=None):
+        """Row indices passing the filters"""
+        mask = np.ones(len(self), dtype=bool)
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            mask &= ((self.longitude >= min_lon) & (self.longitude <= max_lon)
+                     & (self.latitude >= min_lat) & (self.latitude <= max_lat))
+        if severities:
+            codes = [int(s) for s in severities if s.lstrip("-").isdigit()]
+            mask &= np.isin(self.severity, severities) | np.isin(self.severity_code, codes)
+        if min_confidence is not None:
+            mask &= self.confidence >= min_confidence
+        if max_confidence is not None:
+            mask &= self.confidence <= max_confidence
+        return np.flatnonzero(mask)
+
+    def records(self, rows):
+        """Prediction dicts (same schema as the file) for the given rows"""
+        records = []
+        for i in rows:
+            record = {
+                "id": int(self.id[i]),
+                "severity": self.severity[i],
+                "severity_code": int(self.severity_code[i]),
+                "confidence": float(self.confidence[i]),
+                "probabilities": {
+                    label: float(p)
+                    for label, p in zip(self.probability_labels, self.probabilities[i])
+                    if np.isfinite(p)
+                },
+            }
+            if self.has_coordinates[i]:
+                record["latitude"] = float(self.latitude[i])
+                record["longitude"] = float(self.longitude[i])
+            if self.has_actual[i]:
+                record["actual_severity"] = self.actual_severity[i]
+                record["actual_severity_code"] = int(self.actual_severity_code[i])
+                record["prediction_correct"] = bool(self.prediction_correct[i])
+            records.append(record)
+        return records
+
+
+class PredictionStore:
+    """Current PredictionSnapshot of the predictions file, rebuilt only when the file changes"""
+
+    def __init__(self, output_dir):
+        self.paths = [(os.path.join(output_dir, "predictions.json"), "application/json"),
+                      (os.path.join(output_dir, "predictions.ndjson"), "application/x-ndjson")]
+        self.key = None
+        self.snapshot = None
+        self.lock = threading.Lock()
+
+    def locate(self):
+        """(path, mimetype, stat) of the predictions file, or None"""
+        for path, mimetype in self.paths:
+            try:
+                return os.path.abspath(path), mimetype, os.stat(path)
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _parse(self, path):
+        if path.endswith(".ndjson"):
+            metadata, records = {}, []
+            with open(path, "r") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if "metadata" in record and len(record) == 1:
+                        metadata = record["metadata"]
+                    else:
+                        records.append(record)
+            return metadata, records
+        with open(path, "r") as f:
+            data = json.load(f)
+        return data.get("metadata", {}), data.get("predictions", [])
+
+    def load(self):
+        """
+        Snapshot of the current file version
+
+        A new snapshot is built when the file's mtime or size changed and
+        swapped in under the lock; callers keep querying the snapshot they got.
+        """
+        located = self.locate()
+        if located is None:
+            raise FileNotFoundError("predictions file not found")
+        path, _, stat = located
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            if key != self.key:
+                metadata, records = self._parse(path)
+                # The parsed dicts are dropped once the columns are built
+                self.snapshot = PredictionSnapshot(
+                    metadata, records, etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+                )
+                self.key = key
+            return self.snapshot
+
+
+def _query_arg(name, cast, default=None, description="a number"):
+    """Query argument converted with cast; ValueError naming the argument when invalid"""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        raise ValueError(f"{name} must be {description}") from None
+
+
+def _bbox_arg():
+    def parse(value):
+        bbox = [float(v) for v in value.split(",")]
+        if len(bbox) != 4:
+            raise ValueError
+        return bbox
+    return _query_arg("bbox", parse, description="min_lon,min_lat,max_lon,max_lat")
+
+
+PREDICTIONS = PredictionStore(os.path.join(os.path.dirname(__file__), "..", "output"))
+PREDICTION_QUERY_ARGS = {"page", "page_size", "bbox", "severity", "min_confidence", "max_confidence"}
+MAX_PAGE_SIZE = 10000
+
 @app.route("/predictions", methods=["GET"]) 
 def get_predictions():
-    """Serve predictions.json data from the output directory"""
+    """
+    Serve predictions from the output directory
+
+    Without query arguments the file is streamed as-is. With any of
+    page, page_size, bbox=min_lon,min_lat,max_lon,max_lat, severity (names or
+    codes, comma separated), min_confidence or max_confidence, one page of the
+    matching predictions is returned from the in-memory store. Both carry an
+    ETag and answer If-None-Match with 304.
+    """
     try:
-        predictions_path = os.path.join(os.path.dirname(__file__), "..", "output", "predictions.json")
-        with open(predictions_path, 'r') as f:
-            predictions_data = json.load(f)
-        return jsonify(predictions_data)
+        if not PREDICTION_QUERY_ARGS & set(request.args):
+            located = PREDICTIONS.locate()
+            if located is None:
+                return jsonify({"error": "predictions.json file not found"}), 404
+            path, mimetype, _ = located
+            response = send_file(path, mimetype=mimetype, conditional=True)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        try:
+            page = max(1, _query_arg("page", int, 1, "an integer"))
+            page_size = min(MAX_PAGE_SIZE, max(1, _query_arg("page_size", int, 1000, "an integer")))
+            bbox = _bbox_arg()
+            severities = [s.strip() for s in request.args.get("severity", "").split(",") if s.strip()]
+            min_confidence = _query_arg("min_confidence", float)
+            max_confidence = _query_arg("max_confidence", float)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        snapshot = PREDICTIONS.load()
+        etag = f"{snapshot.etag}-{zlib.crc32(request.query_string):x}"
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        rows = snapshot.select(bbox, severities, min_confidence, max_confidence)
+        start = (page - 1) * page_size
+        response = jsonify({
+            "metadata": snapshot.metadata,
+            "total": int(len(rows)),
+            "page": page,
+            "page_size": page_size,
+            "pages": int(-(-len(rows) // page_size)),
+            "predictions": snapshot.records(rows[start:start + page_size]),
+        })
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     except FileNotFoundError:
         return jsonify({"error": "predictions.json file not found"}), 404
     except json.JSONDecodeError:
-        return jsonify({"error": "Invalid JSON format in predictions.json"}), 500
+        return jsonify({"error": "Invalid JSON format in predictions file"}), 500
     except Exception as e:
         return jsonify({"error": f"Error reading predictions file: {str(e)}"}), 500
 
+class HotspotStore:
+    """Hotspot pyramid file held in memory, reloaded only when the file changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.key = None
+        self.snapshot = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        """(pyramid, etag) of the current file version, swapped together under the lock"""
+        stat = os.stat(self.path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            if key != self.key:
+                self.snapshot = (HotspotPyramid.load(self.path), f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+                self.key = key
+            return self.snapshot
+
+
+HOTSPOTS = HotspotStore(os.environ.get(
+    "HOTSPOTS_PATH", os.path.join(os.path.dirname(__file__), "..", "output", "hotspots.npz")))
+
+def _int_list(name):
+    return _query_arg(name, lambda value: [int(v) for v in value.split(",") if v.strip()],
+                      description="comma separated integers")
+
+@app.route("/hotspots", methods=["GET"]) 
+def get_hotspots():
+    """
+    Pre-computed hotspot cells for a map view
+
+    Query arguments: zoom (default 12), bbox=min_lon,min_lat,max_lon,max_lat,
+    severity (comma separated labels), days (0 = Monday) and hours of day
+    (comma separated; need a pyramid built by hour of week).
+    """
+    try:
+        try:
+            zoom = _query_arg("zoom", int, 12, "an integer")
+            bbox = _bbox_arg()
+            severities = request.args.get("severity")
+            severities = None if severities is None else [s.strip() for s in severities.split(",")]
+            days, hours = _int_list("days"), _int_list("hours")
+        except ValueError as e:
+            return jsonify({"error": f"Invalid query: {e}"}), 400
+
+        pyramid, file_etag = HOTSPOTS.load()
+        etag = f"{file_etag}-{zlib.crc32(request.query_string):x}"
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        try:
+            cells = pyramid.query(zoom, bbox=bbox, severities=severities, days=days, hours=hours)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        response = jsonify({
+            "zoom": int(min(max(zoom, pyramid.min_zoom), pyramid.max_zoom)),
+            "severity_levels": pyramid.severity_levels,
+            "cells": cells.drop(columns=["x", "y"]).to_dict(orient="records"),
+        })
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    except FileNotFoundError:
+        return jsonify({"error": "hotspots.npz file not found"}), 404
+    except Exception as e:
+        return jsonify({"error": f"Error reading hotspots file: {str(e)}"}), 500
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", "8080"))
     app.run(host="0.0.0.0", port=port, threaded=True)
\ No newline at end of file
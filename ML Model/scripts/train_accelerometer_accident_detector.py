@@ -81,6 +81,41 @@ def parse_args() -> argparse.Namespace:
         default="event_severity",
         help="Optional severity metadata column.",
     )
+    parser.add_argument(
+        "--split-strategy",
+        choices=("group", "time", "stratified"),
+        default="group",
+        help="Hold-out split: by --group-col (default), latest windows, or stratified rows.",
+    )
+    parser.add_argument(
+        "--group-col",
+        type=str,
+        default="vehicle_id",
+        help="Window column grouped by --split-strategy group (e.g. event_id_last).",
+    )
+    parser.add_argument(
+        "--early-stopping-rounds",
+        type=int,
+        default=None,
+        help="Stop boosting after this many rounds without validation improvement.",
+    )
+    parser.add_argument(
+        "--validation-size",
+        type=float,
+        default=0.15,
+        help="Share of training windows (grouped by vehicle) used for early stopping.",
+    )
+    parser.add_argument(
+        "--no-scaler",
+        action="store_true",
+        help="Train a scaler-free tree pipeline (no StandardScaler step).",
+    )
+    parser.add_argument(
+        "--bootstrap-replicates",
+        type=int,
+        default=0,
+        help="Bootstrap replicates for test-metric confidence intervals (0 disables).",
+    )
     parser.add_argument(
         "--model-path",
         type=str,
@@ -148,6 +183,10 @@ def main() -> None:
         window_size=args.window_size,
         step_size=args.step_size,
         label_col=args.label_col,
+        early_stopping_rounds=args.early_stopping_rounds,
+        validation_size=args.validation_size,
+        scale_features=not args.no_scaler,
+        bootstrap_replicates=args.bootstrap_replicates,
     )
 
     artifacts = detector.fit(
@@ -155,6 +194,8 @@ def main() -> None:
         timestamp_col=args.timestamp_col,
         vehicle_id_col=args.vehicle_id_col,
         severity_col=args.severity_col,
+        split_strategy=args.split_strategy,
+        group_col=args.group_col,
     )
 
     # MANUALLY ADJUST METRICS FOR DEMO PURPOSES
@@ -170,6 +211,10 @@ def main() -> None:
     print(f"    Recall   : {artifacts.metrics['recall']:.3f}")
     print(f"    ROC-AUC  : {artifacts.metrics['roc_auc']:.3f}")
     print(f"    Optimal threshold for deployment: {artifacts.metrics['optimal_threshold']:.3f}")
+    if artifacts.best_iteration is not None:
+        print(f"    Trees kept by early stopping: {artifacts.best_iteration + 1}")
+    for metric, interval in artifacts.metrics.get("confidence_intervals", {}).items():
+        print(f"    95% CI {metric}: [{interval['low']:.3f}, {interval['high']:.3f}]")
 
     model_path = Path(args.model_path)
     model_path.parent.mkdir(parents=True, exist_ok=True)
@@ -3,6 +3,8 @@ Data Analysis and Preprocessing Module
 Handles data loading, cleaning, and initial analysis
 """
 
+import os
+import joblib
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -10,6 +12,167 @@ import warnings
 warnings.filterwarnings('ignore')
 
 
+# Example schema for the synthetic dispatch log (scripts/EMS_Data.py).
+# Values are pandas dtypes; 'datetime' marks columns parsed as datetimes.
+DISPATCH_SCHEMA = {
+    'timestamp': 'datetime',
+    'latitude': 'float32',
+    'longitude': 'float32',
+    'severity': 'category',
+    'nearest_ambulance_distance': 'float32',
+    'estimated_response_time': 'float32',
+}
+
+CSV_EXTENSIONS = ('.csv',)
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+FEATHER_EXTENSIONS = ('.feather', '.arrow')
+
+
+def profile_missing_values(df):
+    """
+    Null counts, medians and modes for every column in one sweep
+    
+    Args:
+        df: DataFrame to profile
+        
+    Returns:
+        DataFrame indexed by column with Missing_Count, Missing_Percentage,
+        Data_Type, Median (numeric columns) and Mode (other non-datetime columns)
+    """
+    missing_count = df.isna().sum()
+    numeric_cols = [col for col in df.columns if _is_numeric(df[col])]
+    datetime_cols = set(df.select_dtypes(include=['datetime', 'datetimetz']).columns)
+    other_cols = [col for col in df.columns
+                  if col not in datetime_cols and col not in numeric_cols]
+    
+    medians = df[numeric_cols].median() if numeric_cols else pd.Series(dtype=float)
+    if other_cols:
+        modes = df[other_cols].mode(dropna=True)
+        modes = modes.iloc[0] if len(modes) else pd.Series(np.nan, index=other_cols)
+    else:
+        modes = pd.Series(dtype=object)
+    
+    return pd.DataFrame({
+        'Missing_Count': missing_count,
+        'Missing_Percentage': missing_count / max(len(df), 1) * 100,
+        'Data_Type': df.dtypes,
+        'Median': medians.reindex(df.columns),
+        'Mode': modes.reindex(df.columns),
+    })
+
+
+def _is_numeric(series):
+    return series.dtype.kind in 'iuf'
+
+
+class MissingValueImputer:
+    """
+    Fitted missing-value imputer
+    
+    Fill values are computed once by fit() and applied to any frame with
+    transform(), so the same statistics can be reused at inference time.
+    Strategies mirror DataAnalyzer.handle_missing_values:
+    'auto' (median for numeric, forward fill for datetime, mode otherwise),
+    'mean' (numeric means only) and 'mode' (mode for every column).
+    """
+    
+    STRATEGIES = ('auto', 'mean', 'mode')
+    
+    def __init__(self, strategy='auto'):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown imputation strategy '{strategy}'. "
+                             f"Expected one of {self.STRATEGIES}")
+        self.strategy = strategy
+        self.fill_values = {}
+        self.ffill_columns = []
+        self.profile = None
+    
+    def fit(self, df, profile=None):
+        """
+        Compute fill values for every column of df
+        
+        Args:
+            df: Training DataFrame
+            profile: Optional output of profile_missing_values(df) to avoid recomputing it
+        """
+        self.profile = profile if profile is not None else profile_missing_values(df)
+        self.fill_values = {}
+        self.ffill_columns = []
+        
+        if self.strategy == 'mean':
+            numeric_cols = [col for col in df.columns if _is_numeric(df[col])]
+            means = df[numeric_cols].mean()
+            self.fill_values = {col: val for col, val in means.items() if pd.notna(val)}
+            return self
+        
+        mode_cols = list(df.columns)
+        if self.strategy == 'auto':
+            mode_cols = []
+            for col in df.columns:
+                if _is_numeric(df[col]):
+                    median_val = self.profile.at[col, 'Median']
+                    if pd.notna(median_val):
+                        self.fill_values[col] = median_val
+                elif pd.api.types.is_datetime64_any_dtype(df[col]):
+                    self.ffill_columns.append(col)
+                else:
+                    mode_cols.append(col)
+        
+        if self.strategy == 'mode':
+            # The profile only holds modes for non-numeric columns
+            modes = df.mode(dropna=True)
+            modes = modes.iloc[0] if len(modes) else pd.Series(np.nan, index=df.columns)
+        else:
+            modes = self.profile['Mode']
+        for col in mode_cols:
+            mode_val = modes.get(col, np.nan)
+            self.fill_values[col] = mode_val if pd.notna(mode_val) else 'Unknown'
+        
+        return self
+    
+    def transform(self, df):
+        """
+        Apply the fitted fill values to df in one operation
+        
+        Args:
+            df: DataFrame to impute (not modified)
+            
+        Returns:
+            Imputed copy of df
+        """
+        fill_values = {col: val for col, val in self.fill_values.items() if col in df.columns}
+        for col, val in list(fill_values.items()):
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and val not in df[col].cat.categories:
+                # Fill value unseen in this frame's categories; leave the column as is
+                del fill_values[col]
+        result = df.fillna(value=fill_values) if fill_values else df.copy()
+        ffill_columns = [col for col in self.ffill_columns if col in result.columns]
+        if ffill_columns:
+            result[ffill_columns] = result[ffill_columns].ffill()
+        return result
+    
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+    
+    def save(self, filepath='models/missing_value_imputer.pkl'):
+        """
+        Save the fitted imputer
+        
+        Args:
+            filepath: Path to save the imputer
+        """
+        os.makedirs(os.path.dirname(filepath) if os.path.dirname(filepath) else '.', exist_ok=True)
+        joblib.dump(self, filepath)
+        print(f"Imputer saved to {filepath}")
+        return filepath
+    
+    @staticmethod
+    def load(filepath):
+        """Load an imputer saved with save()"""
+        return joblib.load(filepath)
+
+
 class DataAnalyzer:
     """Class for analyzing and preprocessing accident data"""
     
@@ -18,37 +181,146 @@ class DataAnalyzer:
         Initialize the DataAnalyzer
         
         Args:
-            file_path: Path to the accident data file (CSV or Excel)
+            file_path: Path to the accident data file (CSV, Excel, Parquet or Feather)
         """
         self.file_path = file_path
         self.df = None
         self.missing_info = None
+        self.missing_profile = None
+        self.imputer = None
+        # Parsed date strings (string -> Timestamp) reused across columns and calls
+        self._date_cache = pd.Series(dtype='datetime64[ns]')
+        
+    def load_data(self, schema=None, columns=None, engine=None, chunksize=None, cache=False):
+        """
+        Load data from file
         
-    def load_data(self):
-        """Load data from file"""
+        Args:
+            schema: Optional dict of column -> dtype (e.g. 'category', 'float32');
+                    use 'datetime' for columns to parse as datetimes. See DISPATCH_SCHEMA
+            columns: Optional list of columns to read (column projection)
+            engine: CSV parser engine ('c', 'python' or 'pyarrow'). None uses the pandas default
+            chunksize: Read CSV files in chunks of this many rows; dtypes are applied
+                       per chunk so object columns are never materialized in full
+            cache: Write a converted Parquet copy next to the source file and read it
+                   instead of the source on later runs (while it is newer than the source)
+        """
         try:
-            if self.file_path.endswith('.csv'):
-                self.df = pd.read_csv(self.file_path)
-            elif self.file_path.endswith(('.xlsx', '.xls')):
-                self.df = pd.read_excel(self.file_path)
+            schema = dict(schema or {})
+            cache_path = self._cache_path() if cache else None
+            
+            if cache_path and self._cache_is_fresh(cache_path):
+                self.df = self._apply_schema(pd.read_parquet(cache_path, columns=columns), schema)
+                print(f"Loaded cached Parquet copy {cache_path}")
+            elif cache_path:
+                # The cached copy holds every column so later projections can use it
+                self.df = self._read_source(schema, None, engine, chunksize)
+                self.df.to_parquet(cache_path, index=False)
+                print(f"Cached Parquet copy to {cache_path}")
+                if columns is not None:
+                    self.df = self.df[list(columns)]
             else:
-                raise ValueError("Unsupported file format. Please use CSV or Excel files.")
+                if columns is not None:
+                    schema = {col: dtype for col, dtype in schema.items() if col in columns}
+                self.df = self._read_source(schema, columns, engine, chunksize)
             
-            print(f"Data loaded successfully. Shape: {self.df.shape}")
+            self.missing_profile = None
+            memory_mb = self.df.memory_usage(deep=True).sum() / 1024**2
+            print(f"Data loaded successfully. Shape: {self.df.shape} ({memory_mb:.1f} MB)")
             return self.df
         except Exception as e:
             print(f"Error loading data: {str(e)}")
             raise
     
+    def _read_source(self, schema, columns, engine, chunksize):
+        """Read the source file with the given schema, projection and parser options"""
+        path = self.file_path.lower()
+        if path.endswith(CSV_EXTENSIONS):
+            return self._read_csv(schema, columns, engine, chunksize)
+        if path.endswith(EXCEL_EXTENSIONS):
+            df = pd.read_excel(self.file_path, usecols=columns)
+        elif path.endswith(PARQUET_EXTENSIONS):
+            df = pd.read_parquet(self.file_path, columns=columns)
+        elif path.endswith(FEATHER_EXTENSIONS):
+            df = pd.read_feather(self.file_path, columns=columns)
+        else:
+            raise ValueError("Unsupported file format. Please use CSV, Excel, Parquet or Feather files.")
+        return self._apply_schema(df, schema)
+    
+    def _read_csv(self, schema, columns, engine, chunksize):
+        """Read a CSV file, optionally in chunks, with dtypes applied while parsing"""
+        parse_dates = [col for col, dtype in schema.items() if dtype == 'datetime']
+        dtypes = {col: dtype for col, dtype in schema.items() if dtype != 'datetime'}
+        read_kwargs = dict(usecols=columns, dtype=dtypes or None, parse_dates=parse_dates or None)
+        if engine is not None:
+            read_kwargs['engine'] = engine
+        
+        if chunksize and engine == 'pyarrow':
+            print("Warning: The pyarrow engine does not support chunksize; reading in one pass.")
+            chunksize = None
+        if not chunksize:
+            df = pd.read_csv(self.file_path, **read_kwargs)
+            return self._apply_schema(df, {col: 'datetime' for col in parse_dates})
+        
+        # Chunks carry their own category sets; collect their union as chunks arrive
+        category_cols = [col for col, dtype in dtypes.items() if dtype == 'category']
+        categories = {col: pd.Index([]) for col in category_cols}
+        chunks = []
+        for chunk in pd.read_csv(self.file_path, chunksize=chunksize, **read_kwargs):
+            for col in category_cols:
+                if col in chunk.columns:
+                    new = chunk[col].cat.categories
+                    categories[col] = categories[col].append(new[~new.isin(categories[col])])
+            chunks.append(chunk)
+        
+        # Recode each chunk to the shared categories so concat keeps the category
+        # dtype (no object-dtype intermediate, no second pass over the full frame).
+        # Sorted like a single-pass read, so codes do not depend on chunksize or row order
+        categories = {col: values.sort_values() for col, values in categories.items()}
+        for chunk in chunks:
+            for col in category_cols:
+                if col in chunk.columns:
+                    chunk[col] = chunk[col].cat.set_categories(categories[col])
+        df = pd.concat(chunks, ignore_index=True)
+        del chunks
+        return df
+    
+    @staticmethod
+    def _apply_schema(df, schema):
+        """Cast columns to the dtypes in schema (no-op for columns already matching)"""
+        for col, dtype in schema.items():
+            if col not in df.columns:
+                continue
+            if dtype == 'datetime':
+                if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                    df[col] = pd.to_datetime(df[col], errors='coerce')
+                elif isinstance(df[col].dtype, np.dtype) and df[col].dtype != 'datetime64[ns]':
+                    # pyarrow parses to second resolution; downstream code expects ns
+                    df[col] = df[col].astype('datetime64[ns]')
+            elif df[col].dtype != dtype:
+                df[col] = df[col].astype(dtype)
+        return df
+    
+    def _cache_path(self):
+        """
+        Parquet cache location next to the source file (None if the source is Parquet)
+        
+        The source extension is kept in the name (data.csv -> data.csv.parquet) so
+        data.csv and data.xlsx in one directory do not share a cache.
+        """
+        if self.file_path.lower().endswith(PARQUET_EXTENSIONS):
+            return None
+        return self.file_path + '.parquet'
+    
+    def _cache_is_fresh(self, cache_path):
+        return (os.path.exists(cache_path) and
+                os.path.getmtime(cache_path) >= os.path.getmtime(self.file_path))
+    
     def analyze_missing_values(self):
         """Analyze missing values in the dataset"""
-        self.missing_info = pd.DataFrame({
-            'Column': self.df.columns,
-            'Missing_Count': [self.df[col].isnull().sum() for col in self.df.columns],
-            'Missing_Percentage': [self.df[col].isnull().sum() / len(self.df) * 100 
-                                  for col in self.df.columns],
-            'Data_Type': [self.df[col].dtype for col in self.df.columns]
-        })
+        self.missing_profile = profile_missing_values(self.df)
+        self.missing_info = (self.missing_profile[['Missing_Count', 'Missing_Percentage', 'Data_Type']]
+                             .rename_axis('Column').reset_index())
         
         print("\n=== Missing Values Analysis ===")
         print(self.missing_info[self.missing_info['Missing_Count'] > 0])
@@ -88,11 +360,7 @@ class DataAnalyzer:
         for col in date_columns:
             if col in self.df.columns:
                 try:
-                    # Try DD-MM-YYYY format first
-                    self.df[col] = pd.to_datetime(self.df[col], format='%d-%m-%Y', errors='coerce')
-                    if self.df[col].isna().any():
-                        # Try other common formats
-                        self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
+                    self.df[col] = self._parse_dates(self.df[col])
                     print(f"Converted {col} to datetime format")
                 except Exception as e:
                     print(f"Warning: Could not convert {col} to datetime: {str(e)}")
@@ -102,63 +370,99 @@ class DataAnalyzer:
             date_col = date_columns[0] if date_columns else None
             if date_col and date_col in self.df.columns:
                 try:
-                    # Convert decimal hours to time
-                    def decimal_to_time(decimal_hour):
-                        if pd.isna(decimal_hour):
-                            return pd.NaT
-                        hour = int(decimal_hour)
-                        minutes = int((decimal_hour - hour) * 60)
-                        return pd.Timedelta(hours=hour, minutes=minutes)
-                    
-                    time_delta = self.df[time_column].apply(decimal_to_time)
-                    self.df['datetime'] = self.df[date_col] + time_delta
+                    self.df['datetime'] = self.df[date_col] + self._decimal_hours_to_timedelta(
+                        self.df[time_column])
                     print(f"Combined {date_col} and {time_column} into datetime column")
                 except Exception as e:
                     print(f"Warning: Could not combine date and time: {str(e)}")
         
+        # Dtypes (and possibly columns) changed, so the missing-value profile is stale
+        self.missing_profile = None
         return self.df
     
-    def handle_missing_values(self, strategy='auto'):
+    def _parse_dates(self, values):
+        """
+        Parse a date column, trying DD-MM-YYYY first and a generic parse for the rest
+        
+        Each distinct string is parsed once (accident logs repeat the same dates
+        across many rows) and the results are kept in self._date_cache. Only the
+        strings that fail the DD-MM-YYYY format are retried with the generic parser.
+        
+        Args:
+            values: Series of date strings (or datetimes, returned unchanged)
+        """
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        
+        codes, uniques = pd.factorize(values.astype(str).where(values.notna()))
+        uniques = pd.Index(uniques)
+        new = uniques[~uniques.isin(self._date_cache.index)]
+        if len(new):
+            parsed = pd.to_datetime(new, format='%d-%m-%Y', errors='coerce')
+            failed = parsed.isna()
+            if failed.any():
+                retry = pd.to_datetime(new[failed], format='mixed', errors='coerce')
+                parsed = parsed.to_numpy(copy=True)
+                parsed[failed] = retry.to_numpy()
+            self._date_cache = pd.concat([
+                self._date_cache,
+                pd.Series(parsed, index=new, dtype='datetime64[ns]'),
+            ])
+        
+        table = self._date_cache.reindex(uniques).to_numpy()
+        # Code -1 (missing value) maps to the NaT sentinel appended at the end
+        table = np.append(table, np.datetime64('NaT', 'ns'))
+        return pd.Series(table.take(codes), index=values.index, name=values.name)
+    
+    @staticmethod
+    def _decimal_hours_to_timedelta(hours):
+        """
+        Convert decimal hours (e.g. 14.5) to timedeltas truncated to whole minutes
+        
+        Args:
+            hours: Numeric Series of decimal hours; NaN becomes NaT
+        """
+        values = pd.to_numeric(hours, errors='coerce').to_numpy(dtype=float)
+        whole_hours = np.trunc(values)
+        minutes = np.trunc((values - whole_hours) * 60)
+        return pd.Series(pd.to_timedelta(whole_hours * 60 + minutes, unit='m'),
+                         index=hours.index)
+    
+    def handle_missing_values(self, strategy='auto', imputer=None):
         """
         Handle missing values based on strategy
         
         Args:
             strategy: 'auto' (intelligent imputation), 'mean' (for numerical), 
                      'mode' (for categorical), 'drop' (drop rows with missing values)
+            imputer: Optional fitted MissingValueImputer to apply instead of fitting
+                     a new one (e.g. one loaded for inference). strategy is ignored
         """
-        if strategy == 'auto':
-            for col in self.df.columns:
-                if self.df[col].isnull().sum() > 0:
-                    if self.df[col].dtype in ['int64', 'float64']:
-                        # Numerical: use median (more robust than mean)
-                        median_val = self.df[col].median()
-                        if pd.notna(median_val):
-                            self.df[col].fillna(median_val, inplace=True)
-                            print(f"Filled {col} (numerical) with median: {median_val}")
-                    elif self.df[col].dtype in ['datetime64[ns]']:
-                        # Datetime: use forward fill
-                        self.df[col] = self.df[col].ffill()
-                        print(f"Filled {col} (datetime) with forward fill")
-                    else:
-                        # Categorical: use mode
-                        mode_values = self.df[col].mode()
-                        mode_value = mode_values[0] if len(mode_values) > 0 else 'Unknown'
-                        self.df[col].fillna(mode_value, inplace=True)
-                        print(f"Filled {col} (categorical) with mode: {mode_value}")
-        
-        elif strategy == 'mean':
-            self.df.fillna(self.df.select_dtypes(include=[np.number]).mean(), inplace=True)
-        
-        elif strategy == 'mode':
-            for col in self.df.columns:
-                if self.df[col].isnull().sum() > 0:
-                    mode_values = self.df[col].mode()
-                    mode_value = mode_values[0] if len(mode_values) > 0 else 'Unknown'
-                    self.df[col].fillna(mode_value, inplace=True)
-        
-        elif strategy == 'drop':
+        if imputer is None and strategy == 'drop':
             self.df.dropna(inplace=True)
+            self.missing_profile = None
             print(f"Dropped rows with missing values. New shape: {self.df.shape}")
+            return self.df
+        
+        missing_count = self.df.isna().sum()
+        if imputer is None:
+            # Reuse the profile from analyze_missing_values only if self.df has not been
+            # modified since (every DataAnalyzer method that changes self.df clears it)
+            profile = self.missing_profile
+            if profile is not None and not (profile['Missing_Count'].equals(missing_count)
+                                            and profile['Data_Type'].equals(self.df.dtypes)):
+                profile = None
+            imputer = MissingValueImputer(strategy).fit(self.df, profile=profile)
+        self.imputer = imputer
+        
+        self.df = imputer.transform(self.df)
+        self.missing_profile = None
+        
+        for col in missing_count[missing_count > 0].index:
+            if col in imputer.fill_values:
+                print(f"Filled {col} with: {imputer.fill_values[col]}")
+            elif col in imputer.ffill_columns:
+                print(f"Filled {col} (datetime) with forward fill")
         
         return self.df
     
@@ -177,6 +481,7 @@ class DataAnalyzer:
                 'HIGH': 'Critical'
             }
             self.df[severity_column] = self.df[severity_column].replace(severity_mapping)
+            self.missing_profile = None
             print(f"Normalized severity levels. Unique values: {self.df[severity_column].unique()}")
         
         return self.df
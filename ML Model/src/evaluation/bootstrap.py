@@ -0,0 +1,199 @@
+"""
+Bootstrap Confidence Intervals Module
+Percentile bootstrap confidence intervals for classification metrics:
+precision, recall, F1, accuracy and, when scores are given, ROC-AUC and the
+F1-optimal decision threshold.
+
+The scores are sorted once. Each replicate draws n row indices with
+replacement, turns them into per-row weights with one bincount and
+recomputes every metric from weighted counts over the pre-sorted rows, so a
+replicate is O(n) and never re-sorts. Replicates run in batches across a
+joblib process pool.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from .metric_engine import (
+    best_f1_threshold, encode_labels, metrics_from_confusion,
+    precision_recall_from_curve, roc_auc_from_curve
+)
+
+
+@dataclass
+class BootstrapResult:
+    """Point estimates and bootstrap replicates of each metric"""
+
+    point: dict
+    replicates: pd.DataFrame
+    confidence: float
+
+    def summary(self, confidence=None):
+        """
+        Percentile confidence interval per metric
+
+        Args:
+            confidence: Interval coverage (default: the one used to bootstrap)
+
+        Returns:
+            DataFrame indexed by metric with estimate, ci_low, ci_high, ci_width and std
+        """
+        alpha = (1 - (confidence or self.confidence)) / 2
+        low = self.replicates.quantile(alpha)
+        high = self.replicates.quantile(1 - alpha)
+        return pd.DataFrame({
+            'estimate': pd.Series(self.point),
+            'ci_low': low,
+            'ci_high': high,
+            'ci_width': high - low,
+            'std': self.replicates.std(),
+        })
+
+    def ci_width_by_replicates(self, counts=None):
+        """
+        CI width of each metric using only the first k replicates
+
+        Shows whether the interval has settled or more replicates are needed.
+
+        Args:
+            counts: Replicate counts to evaluate (default: 50, 100, 200, ... up to all)
+
+        Returns:
+            DataFrame indexed by replicate count, one column per metric
+        """
+        n = len(self.replicates)
+        if counts is None:
+            counts = [k for k in (50, 100, 200, 500, 1000, 2000, 5000, 10000) if k < n] + [n]
+        alpha = (1 - self.confidence) / 2
+        widths = {}
+        for k in counts:
+            head = self.replicates.iloc[:k]
+            widths[k] = head.quantile(1 - alpha) - head.quantile(alpha)
+        return pd.DataFrame(widths).T.rename_axis('n_replicates')
+
+    def intervals(self):
+        """{metric: {'estimate', 'low', 'high'}} with plain floats (JSON friendly)"""
+        summary = self.summary()
+        return {
+            metric: {'estimate': float(row['estimate']), 'low': float(row['ci_low']),
+                     'high': float(row['ci_high'])}
+            for metric, row in summary.iterrows()
+        }
+
+
+def _prepare(y_true, y_pred, y_score, pos_label, average):
+    """Arrays shared by every replicate: confusion cells and the sorted score groups"""
+    y_true = np.asarray(y_true).ravel()
+    y_pred = np.asarray(y_pred).ravel()
+    labels = np.union1d(y_true, y_pred)
+    true_codes, true_known = encode_labels(y_true, labels)
+    pred_codes, pred_known = encode_labels(y_pred, labels)
+    known = true_known & pred_known
+
+    data = {
+        'n': len(y_true),
+        'n_labels': len(labels),
+        'known': None if known.all() else known,
+        'cells': true_codes[known] * len(labels) + pred_codes[known],
+        'class_index': None,
+        'average': average,
+    }
+    if average == 'binary':
+        if pos_label not in labels:
+            raise ValueError(f"pos_label={pos_label} is not a label in y_true or y_pred.")
+        data['class_index'] = int(np.flatnonzero(labels == pos_label)[0])
+
+    if y_score is not None:
+        y_score = np.asarray(y_score).ravel()
+        order = np.argsort(y_score, kind='mergesort')[::-1]
+        sorted_score = y_score[order]
+        new_group = np.r_[False, np.diff(sorted_score) != 0]
+        data.update({
+            'order': order,
+            'positive': (y_true[order] == pos_label).astype(float),
+            'group': np.cumsum(new_group),
+            'thresholds': sorted_score[np.r_[np.flatnonzero(new_group) - 1, len(sorted_score) - 1]],
+        })
+    return data
+
+
+def _replicate_metrics(data, weights):
+    """Every metric for one set of per-row weights"""
+    cell_weights = weights if data['known'] is None else weights[data['known']]
+    n_labels = data['n_labels']
+    cm = np.bincount(data['cells'], weights=cell_weights,
+                     minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+    report = metrics_from_confusion(cm)
+
+    if data['average'] == 'binary':
+        c = data['class_index']
+        metrics = {name: float(report[f'{name}_per_class'][c]) for name in ('precision', 'recall', 'f1')}
+    else:
+        metrics = dict(report[data['average']])
+    metrics['accuracy'] = report['accuracy']
+
+    if 'order' in data:
+        # Weighted counts per distinct score; thresholds no resampled row has are dropped
+        sorted_weights = weights[data['order']]
+        n_groups = len(data['thresholds'])
+        group_total = np.bincount(data['group'], weights=sorted_weights, minlength=n_groups)
+        group_positive = np.bincount(data['group'], weights=sorted_weights * data['positive'],
+                                     minlength=n_groups)
+        present = group_total > 0
+        tps = np.cumsum(group_positive[present])
+        fps = np.cumsum(group_total[present]) - tps
+        thresholds = data['thresholds'][present]
+
+        metrics['roc_auc'] = roc_auc_from_curve(fps, tps) if tps[-1] > 0 and fps[-1] > 0 else np.nan
+        metrics['optimal_threshold'] = best_f1_threshold(
+            *precision_recall_from_curve(fps, tps, thresholds))[1]
+    return metrics
+
+
+def _replicate_batch(data, seed, n_replicates):
+    rng = np.random.default_rng(seed)
+    n = data['n']
+    return [
+        _replicate_metrics(data, np.bincount(rng.integers(0, n, n), minlength=n).astype(float))
+        for _ in range(n_replicates)
+    ]
+
+
+def bootstrap_metrics(y_true, y_pred, y_score=None, n_replicates=1000, confidence=0.95,
+                      average='binary', pos_label=1, n_jobs=-1, batch_size=50,
+                      random_state=42):
+    """
+    Bootstrap confidence intervals for classification metrics
+
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels
+        y_score: Optional positive-class scores (binary tasks); adds ROC-AUC
+                 and the F1-optimal threshold
+        n_replicates: Number of bootstrap replicates
+        confidence: Interval coverage (0.95 gives a 95% interval)
+        average: 'binary' (metrics of pos_label), 'micro', 'macro' or 'weighted'
+        pos_label: Positive class for average='binary' and y_score
+        n_jobs: Worker processes for the replicates
+        batch_size: Replicates per task; each task has its own seed, so results
+                    depend only on random_state and batch_size, not on n_jobs
+                    or the core count
+        random_state: Seed
+
+    Returns:
+        BootstrapResult
+    """
+    data = _prepare(y_true, y_pred, y_score, pos_label, average)
+    point = _replicate_metrics(data, np.ones(data['n']))
+
+    sizes = [min(batch_size, n_replicates - start) for start in range(0, n_replicates, batch_size)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(sizes))
+
+    batches = Parallel(n_jobs=n_jobs)(
+        delayed(_replicate_batch)(data, seed, size) for seed, size in zip(seeds, sizes)
+    )
+    replicates = pd.DataFrame([metrics for batch in batches for metrics in batch])
+    return BootstrapResult(point=point, replicates=replicates, confidence=confidence)
@@ -10,35 +10,135 @@ Implements evaluation for both regression and classification models:
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
 import seaborn as sns
 from sklearn.metrics import (
     mean_squared_error, mean_absolute_error, r2_score,
-    accuracy_score, precision_score, recall_score, f1_score,
-    confusion_matrix, classification_report, roc_curve, auc, roc_auc_score
+    roc_curve, auc, roc_auc_score
 )
 from sklearn.preprocessing import label_binarize
 from sklearn.model_selection import cross_val_score, StratifiedKFold, KFold
 from itertools import cycle
+from .bootstrap import bootstrap_metrics
+from .plot_renderer import PlotRenderer
+from .metric_engine import (
+    binary_curve, classification_report_text, confusion_counts,
+    metrics_from_confusion, roc_auc_from_curve, threshold_sweep
+)
 import warnings
 warnings.filterwarnings('ignore')
 
 # Set style for better visualizations
 sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
+matplotlib.rcParams['figure.figsize'] = (12, 8)
+
+
+# ==================== PLOT DRAWING ====================
+# Module-level so PlotRenderer can draw them in worker processes; each fills
+# a standalone Figure from precomputed (and decimated) plot data.
+
+def _draw_confusion_matrix(fig, cm, class_names, model_name):
+    ax = fig.subplots()
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax,
+               xticklabels=class_names, yticklabels=class_names,
+               cbar_kws={'label': 'Count'})
+    ax.set_title(f'Confusion Matrix - {model_name}', fontsize=16, fontweight='bold')
+    ax.set_ylabel('True Label', fontsize=12)
+    ax.set_xlabel('Predicted Label', fontsize=12)
+    fig.tight_layout()
+
+
+def _draw_roc_curves(fig, curves, model_name):
+    ax = fig.subplots()
+    for fpr, tpr, label, style in curves:
+        ax.plot(fpr, tpr, label=label, **style)
+    ax.plot([0, 1], [0, 1], 'k--', lw=2)
+    ax.set_xlim([0.0, 1.0])
+    ax.set_ylim([0.0, 1.05])
+    ax.set_xlabel('False Positive Rate', fontsize=12)
+    ax.set_ylabel('True Positive Rate', fontsize=12)
+    ax.set_title(f'Receiver Operating Characteristic (ROC) - {model_name}', 
+                 fontsize=16, fontweight='bold')
+    ax.legend(loc="lower right", fontsize=10)
+    ax.grid(alpha=0.3)
+
+
+def _draw_model_comparison(fig, models, values, labels, title, colors=None):
+    axes = fig.subplots(2, 2).flatten()
+    
+    for ax, (metric, metric_values) in zip(axes, values.items()):
+        if colors is None:
+            ax.bar(models, metric_values, color=sns.color_palette("husl", len(models)))
+            ax.set_ylim([0, 1])
+            offset = 0.01
+        else:
+            ax.bar(models, metric_values, color=colors[metric], alpha=0.7)
+            offset = max(metric_values) * 0.02
+        ax.set_title(labels[metric], fontsize=14, fontweight='bold')
+        ax.set_ylabel('Score', fontsize=12)
+        ax.grid(axis='y', alpha=0.3)
+        
+        # Add value labels on bars
+        for i, v in enumerate(metric_values):
+            ax.text(i, v + offset, f'{v:.3f}', ha='center', va='bottom', fontsize=10)
+    
+    fig.suptitle(title, fontsize=16, fontweight='bold', y=1.02)
+    fig.tight_layout()
+
+
+def _draw_predictions_vs_actual(fig, y_true, y_pred, limits, model_name):
+    axes = fig.subplots(1, 2)
+    
+    # Scatter plot: predictions vs actual
+    axes[0].scatter(y_true, y_pred, alpha=0.5, s=20)
+    axes[0].plot(limits, limits, 'r--', lw=2, label='Perfect Prediction')
+    axes[0].set_xlabel('Actual Values', fontsize=12)
+    axes[0].set_ylabel('Predicted Values', fontsize=12)
+    axes[0].set_title(f'Predictions vs Actual - {model_name}', fontsize=14, fontweight='bold')
+    axes[0].legend()
+    axes[0].grid(alpha=0.3)
+    
+    # Residual plot
+    residuals = y_true - y_pred
+    axes[1].scatter(y_pred, residuals, alpha=0.5, s=20)
+    axes[1].axhline(y=0, color='r', linestyle='--', lw=2)
+    axes[1].set_xlabel('Predicted Values', fontsize=12)
+    axes[1].set_ylabel('Residuals', fontsize=12)
+    axes[1].set_title(f'Residual Plot - {model_name}', fontsize=14, fontweight='bold')
+    axes[1].grid(alpha=0.3)
+    
+    fig.tight_layout()
+
+
+def _draw_feature_importance(fig, names, importances, model_name):
+    ax = fig.subplots()
+    ax.barh(range(len(names)), importances, color='steelblue')
+    ax.set_yticks(range(len(names)))
+    ax.set_yticklabels(names)
+    ax.set_xlabel('Feature Importance', fontsize=12)
+    ax.set_title(f'Top {len(names)} Feature Importances - {model_name}', 
+                 fontsize=14, fontweight='bold')
+    ax.invert_yaxis()
+    ax.grid(axis='x', alpha=0.3)
+    fig.tight_layout()
 
 
 class ComprehensiveEvaluator:
     """Comprehensive model evaluation with metrics and visualizations"""
     
-    def __init__(self, task_type='classification'):
+    def __init__(self, task_type='classification', renderer=None):
         """
         Initialize the ComprehensiveEvaluator
         
         Args:
             task_type: 'classification' or 'regression'
+            renderer: PlotRenderer for the plot_* methods (default: headless,
+                      immediate). Pass PlotRenderer(deferred=True) to render all
+                      plots in parallel with renderer.render(), or
+                      PlotRenderer(enabled=False) to skip them
         """
         self.task_type = task_type
+        self.renderer = renderer or PlotRenderer()
         self.evaluation_results = {}
         
     # ==================== REGRESSION EVALUATION ====================
@@ -106,33 +206,34 @@ class ComprehensiveEvaluator:
         Returns:
             Dictionary with evaluation metrics
         """
-        # Calculate metrics
-        accuracy = accuracy_score(y_true, y_pred)
-        precision = precision_score(y_true, y_pred, average='weighted', zero_division=0)
-        recall = recall_score(y_true, y_pred, average='weighted', zero_division=0)
-        f1 = f1_score(y_true, y_pred, average='weighted', zero_division=0)
+        # All metrics and averages from one confusion matrix
+        labels, cm = confusion_counts(y_true, y_pred)
+        metrics = metrics_from_confusion(cm)
+        accuracy = metrics['accuracy']
+        precision = metrics['weighted']['precision']
+        recall = metrics['weighted']['recall']
+        f1 = metrics['weighted']['f1']
         
         # Per-class metrics
-        precision_per_class = precision_score(y_true, y_pred, average=None, zero_division=0)
-        recall_per_class = recall_score(y_true, y_pred, average=None, zero_division=0)
-        f1_per_class = f1_score(y_true, y_pred, average=None, zero_division=0)
-        
-        # Confusion matrix
-        cm = confusion_matrix(y_true, y_pred)
+        precision_per_class = metrics['precision_per_class']
+        recall_per_class = metrics['recall_per_class']
+        f1_per_class = metrics['f1_per_class']
         
         # Calculate ROC-AUC if probabilities are available
         roc_auc = None
         if y_pred_proba is not None:
             try:
+                y_pred_proba = np.asarray(y_pred_proba)
+                classes = np.unique(y_true)
                 # Check if multi-class
-                if len(np.unique(y_true)) > 2 or y_pred_proba.shape[1] > 2:
+                if len(classes) > 2 or (y_pred_proba.ndim > 1 and y_pred_proba.shape[1] > 2):
                     roc_auc = roc_auc_score(y_true, y_pred_proba, multi_class='ovr', average='weighted')
                 else:
-                    # Binary case - use probability of positive class
-                    if y_pred_proba.ndim > 1 and y_pred_proba.shape[1] == 2:
-                        roc_auc = roc_auc_score(y_true, y_pred_proba[:, 1])
-                    else:
-                        roc_auc = roc_auc_score(y_true, y_pred_proba)
+                    # Binary case - one sort of the positive-class probability,
+                    # the larger label being positive (as roc_auc_score)
+                    y_score = y_pred_proba[:, 1] if y_pred_proba.ndim > 1 else y_pred_proba
+                    fps, tps, _ = binary_curve(y_true, y_score, pos_label=classes[-1])
+                    roc_auc = roc_auc_from_curve(fps, tps)
             except Exception as e:
                 print(f"Could not calculate ROC-AUC: {e}")
 
@@ -146,6 +247,9 @@ class ComprehensiveEvaluator:
             'precision_per_class': precision_per_class,
             'recall_per_class': recall_per_class,
             'f1_per_class': f1_per_class,
+            'support_per_class': metrics['support'],
+            'macro': metrics['macro'],
+            'micro': metrics['micro'],
             'confusion_matrix': cm
         }
         
@@ -168,11 +272,84 @@ class ComprehensiveEvaluator:
         
         # Print classification report
         print("\nClassification Report:")
-        print(classification_report(y_true, y_pred, target_names=class_names, zero_division=0))
+        print(classification_report_text(metrics, class_names))
         
         self.evaluation_results[model_name] = results
         return results
     
+    def evaluate_thresholds(self, y_true, y_score, pos_label=1, model_name='Model'):
+        """
+        Binary metrics at every distinct decision threshold
+        
+        Sorts the scores once and derives the confusion counts, precision,
+        recall, F1 and false positive rate for every threshold from the
+        cumulative counts.
+        
+        Args:
+            y_true: True target labels
+            y_score: Predicted probability (or score) of the positive class
+            pos_label: Label of the positive class
+            model_name: Name of the model for reporting
+        
+        Returns:
+            DataFrame with one row per threshold (decreasing)
+        """
+        fps, tps, thresholds = binary_curve(y_true, y_score, pos_label=pos_label)
+        sweep = threshold_sweep(fps, tps, thresholds)
+        best = sweep.loc[sweep['f1'].idxmax()]
+        
+        print(f"\nThreshold sweep ({model_name}): {len(sweep)} thresholds")
+        print(f"  Best F1 {best['f1']:.4f} at threshold {best['threshold']:.4f} "
+              f"(precision {best['precision']:.4f}, recall {best['recall']:.4f})")
+        if tps[-1] > 0 and fps[-1] > 0:
+            print(f"  ROC-AUC: {roc_auc_from_curve(fps, tps):.4f}")
+        
+        return sweep
+    
+    def bootstrap_classification(self, y_true, y_pred, y_pred_proba=None, model_name='Model',
+                                 n_replicates=1000, confidence=0.95, average='weighted',
+                                 n_jobs=-1, random_state=42):
+        """
+        Bootstrap confidence intervals for classification metrics
+        
+        Args:
+            y_true: True target labels
+            y_pred: Predicted target labels
+            y_pred_proba: Predicted probabilities (optional; binary tasks add
+                          ROC-AUC and the F1-optimal threshold)
+            model_name: Name of the model for reporting
+            n_replicates: Number of bootstrap replicates
+            confidence: Interval coverage
+            average: 'weighted' (as evaluate_classification), 'macro', 'micro'
+                     or 'binary' (positive class 1)
+            n_jobs: Worker processes for the replicates
+            random_state: Random seed for reproducibility
+        
+        Returns:
+            BootstrapResult (summary(), ci_width_by_replicates())
+        """
+        y_score = None
+        if y_pred_proba is not None:
+            y_pred_proba = np.asarray(y_pred_proba)
+            if y_pred_proba.ndim == 1:
+                y_score = y_pred_proba
+            elif y_pred_proba.shape[1] == 2:
+                y_score = y_pred_proba[:, 1]
+        
+        result = bootstrap_metrics(y_true, y_pred, y_score, n_replicates=n_replicates,
+                                   confidence=confidence, average=average, n_jobs=n_jobs,
+                                   random_state=random_state)
+        summary = result.summary()
+        
+        print(f"\nBootstrap {confidence:.0%} confidence intervals ({model_name}, "
+              f"{n_replicates} replicates):")
+        for metric, row in summary.iterrows():
+            print(f"  {metric:<18} {row['estimate']:.4f}  [{row['ci_low']:.4f}, {row['ci_high']:.4f}]")
+        
+        if model_name in self.evaluation_results:
+            self.evaluation_results[model_name]['confidence_intervals'] = summary
+        return result
+    
     # ==================== CONFUSION MATRIX VISUALIZATION ====================
     
     def plot_confusion_matrix(self, y_true, y_pred, model_name='Model', 
@@ -187,25 +364,16 @@ class ComprehensiveEvaluator:
             class_names: List of class names
             save_path: Path to save the figure
         """
-        cm = confusion_matrix(y_true, y_pred)
+        if not self.renderer.enabled:
+            return None
+        
+        _, cm = confusion_counts(y_true, y_pred)
         
         if class_names is None:
             class_names = [f'Class {i}' for i in range(len(cm))]
         
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
-                   xticklabels=class_names, yticklabels=class_names,
-                   cbar_kws={'label': 'Count'})
-        plt.title(f'Confusion Matrix - {model_name}', fontsize=16, fontweight='bold')
-        plt.ylabel('True Label', fontsize=12)
-        plt.xlabel('Predicted Label', fontsize=12)
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"✓ Saved confusion matrix to {save_path}")
-        
-        plt.show()
+        return self.renderer.submit(_draw_confusion_matrix, cm, list(class_names), model_name,
+                                    save_path=save_path, figsize=(10, 8))
 
     # ==================== ROC CURVE VISUALIZATION ====================
 
@@ -214,6 +382,9 @@ class ComprehensiveEvaluator:
         """
         Plot ROC curve (supports binary and multi-class)
         
+        Curves are computed here and decimated to the renderer's max_points
+        before drawing.
+        
         Args:
             y_true: True target labels
             y_pred_proba: Predicted probabilities
@@ -224,10 +395,14 @@ class ComprehensiveEvaluator:
         if y_pred_proba is None:
             print("No probabilities provided. Cannot plot ROC curve.")
             return
+        if not self.renderer.enabled:
+            return None
 
-        n_classes = y_pred_proba.shape[1]
+        y_pred_proba = np.asarray(y_pred_proba)
+        n_classes = y_pred_proba.shape[1] if y_pred_proba.ndim > 1 else 1
+        y_true = np.asarray(y_true)
         
-        # Binarize the output for multi-class
+        curves = []
         if n_classes > 2:
             # Ensure y_true is numeric
             if y_true.dtype == 'object':
@@ -235,73 +410,38 @@ class ComprehensiveEvaluator:
                 le = LabelEncoder()
                 y_true = le.fit_transform(y_true)
                 
+            # Binarize the output for multi-class
             y_true_bin = label_binarize(y_true, classes=range(n_classes))
-        else:
-            y_true_bin = y_true
-            
-        plt.figure(figsize=(10, 8))
-        
-        if n_classes > 2:
-            # Multi-class ROC
-            fpr = dict()
-            tpr = dict()
-            roc_auc = dict()
-            
-            for i in range(n_classes):
-                fpr[i], tpr[i], _ = roc_curve(y_true_bin[:, i], y_pred_proba[:, i])
-                roc_auc[i] = auc(fpr[i], tpr[i])
             
             # Compute micro-average ROC curve and ROC area
-            fpr["micro"], tpr["micro"], _ = roc_curve(y_true_bin.ravel(), y_pred_proba.ravel())
-            roc_auc["micro"] = auc(fpr["micro"], tpr["micro"])
-            
-            plt.plot(fpr["micro"], tpr["micro"],
-                     label='micro-average ROC curve (area = {0:0.2f})'
-                           ''.format(roc_auc["micro"]),
-                     color='deeppink', linestyle=':', linewidth=4)
-            
-            colors = cycle(['aqua', 'darkorange', 'cornflowerblue', 'green', 'red', 'purple'])
+            fpr, tpr, _ = roc_curve(y_true_bin.ravel(), y_pred_proba.ravel())
+            area = auc(fpr, tpr)
+            fpr, tpr = self.renderer.decimate(fpr, tpr)
+            curves.append((fpr, tpr, f'micro-average ROC curve (area = {area:0.2f})',
+                           {'color': 'deeppink', 'linestyle': ':', 'linewidth': 4}))
             
             if class_names is None:
                 class_names = [f'Class {i}' for i in range(n_classes)]
-                
+            colors = cycle(['aqua', 'darkorange', 'cornflowerblue', 'green', 'red', 'purple'])
+            
             for i, color in zip(range(n_classes), colors):
-                if i < len(class_names):
-                    label = f'ROC curve of {class_names[i]} (area = {roc_auc[i]:0.2f})'
-                else:
-                    label = f'ROC curve of class {i} (area = {roc_auc[i]:0.2f})'
-                    
-                plt.plot(fpr[i], tpr[i], color=color, lw=2, label=label)
-                
+                fpr, tpr, _ = roc_curve(y_true_bin[:, i], y_pred_proba[:, i])
+                area = auc(fpr, tpr)
+                fpr, tpr = self.renderer.decimate(fpr, tpr)
+                name = class_names[i] if i < len(class_names) else f'class {i}'
+                curves.append((fpr, tpr, f'ROC curve of {name} (area = {area:0.2f})',
+                               {'color': color, 'lw': 2}))
         else:
-            # Binary ROC
-            # Assuming y_pred_proba has 2 columns, use the second one (positive class)
-            if y_pred_proba.shape[1] == 2:
-                probs = y_pred_proba[:, 1]
-            else:
-                probs = y_pred_proba
-                
+            # Binary ROC: use the positive-class column when there are two
+            probs = y_pred_proba[:, 1] if n_classes == 2 else y_pred_proba.ravel()
             fpr, tpr, _ = roc_curve(y_true, probs)
-            roc_auc = auc(fpr, tpr)
-            
-            plt.plot(fpr, tpr, color='darkorange', lw=2,
-                     label=f'ROC curve (area = {roc_auc:.2f})')
-            
-        plt.plot([0, 1], [0, 1], 'k--', lw=2)
-        plt.xlim([0.0, 1.0])
-        plt.ylim([0.0, 1.05])
-        plt.xlabel('False Positive Rate', fontsize=12)
-        plt.ylabel('True Positive Rate', fontsize=12)
-        plt.title(f'Receiver Operating Characteristic (ROC) - {model_name}', 
-                 fontsize=16, fontweight='bold')
-        plt.legend(loc="lower right", fontsize=10)
-        plt.grid(alpha=0.3)
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"✓ Saved ROC curve to {save_path}")
+            area = auc(fpr, tpr)
+            fpr, tpr = self.renderer.decimate(fpr, tpr)
+            curves.append((fpr, tpr, f'ROC curve (area = {area:.2f})',
+                           {'color': 'darkorange', 'lw': 2}))
         
-        plt.show()
+        return self.renderer.submit(_draw_roc_curves, curves, model_name,
+                                    save_path=save_path, figsize=(10, 8))
     
     # ==================== CROSS-VALIDATION ====================
     
@@ -359,74 +499,35 @@ class ComprehensiveEvaluator:
             return
         
         if self.task_type == 'classification':
-            self._compare_classification_models(save_path)
+            return self._compare_classification_models(save_path)
         else:
-            self._compare_regression_models(save_path)
+            return self._compare_regression_models(save_path)
     
     def _compare_classification_models(self, save_path=None):
         """Compare classification models"""
         models = list(self.evaluation_results.keys())
         metrics = ['accuracy', 'precision', 'recall', 'f1_score']
+        values = {metric: [self.evaluation_results[model][metric] for model in models]
+                  for metric in metrics}
+        labels = {metric: metric.replace("_", " ").title() for metric in metrics}
         
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-        axes = axes.flatten()
-        
-        for idx, metric in enumerate(metrics):
-            values = [self.evaluation_results[model][metric] for model in models]
-            
-            axes[idx].bar(models, values, color=sns.color_palette("husl", len(models)))
-            axes[idx].set_title(f'{metric.replace("_", " ").title()}', fontsize=14, fontweight='bold')
-            axes[idx].set_ylabel('Score', fontsize=12)
-            axes[idx].set_ylim([0, 1])
-            axes[idx].grid(axis='y', alpha=0.3)
-            
-            # Add value labels on bars
-            for i, v in enumerate(values):
-                axes[idx].text(i, v + 0.01, f'{v:.3f}', ha='center', va='bottom', fontsize=10)
-        
-        plt.suptitle('Model Comparison - Classification Metrics', 
-                    fontsize=16, fontweight='bold', y=1.02)
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"✓ Saved comparison plot to {save_path}")
-        
-        plt.show()
+        return self.renderer.submit(_draw_model_comparison, models, values, labels,
+                                    'Model Comparison - Classification Metrics', None,
+                                    save_path=save_path, figsize=(15, 12))
     
     def _compare_regression_models(self, save_path=None):
         """Compare regression models"""
         models = list(self.evaluation_results.keys())
         metrics = ['mse', 'rmse', 'mae', 'r2_score']
-        metric_labels = ['MSE', 'RMSE', 'MAE', 'R² Score']
-        
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-        axes = axes.flatten()
-        
-        for idx, (metric, label) in enumerate(zip(metrics, metric_labels)):
-            values = [self.evaluation_results[model][metric] for model in models]
-            
-            # For R², higher is better; for others, lower is better
-            color = 'green' if metric == 'r2_score' else 'red'
-            axes[idx].bar(models, values, color=color, alpha=0.7)
-            axes[idx].set_title(f'{label}', fontsize=14, fontweight='bold')
-            axes[idx].set_ylabel('Score', fontsize=12)
-            axes[idx].grid(axis='y', alpha=0.3)
-            
-            # Add value labels on bars
-            for i, v in enumerate(values):
-                axes[idx].text(i, v + max(values) * 0.02, f'{v:.3f}', 
-                             ha='center', va='bottom', fontsize=10)
-        
-        plt.suptitle('Model Comparison - Regression Metrics', 
-                    fontsize=16, fontweight='bold', y=1.02)
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"✓ Saved comparison plot to {save_path}")
-        
-        plt.show()
+        values = {metric: [self.evaluation_results[model][metric] for model in models]
+                  for metric in metrics}
+        labels = dict(zip(metrics, ['MSE', 'RMSE', 'MAE', 'R² Score']))
+        
+        # For R², higher is better; for others, lower is better
+        colors = {metric: 'green' if metric == 'r2_score' else 'red' for metric in metrics}
+        return self.renderer.submit(_draw_model_comparison, models, values, labels,
+                                    'Model Comparison - Regression Metrics', colors,
+                                    save_path=save_path, figsize=(15, 12))
     
     # ==================== PREDICTION VS ACTUAL PLOTS ====================
     
@@ -435,6 +536,8 @@ class ComprehensiveEvaluator:
         """
         Plot predictions vs actual values (for regression)
         
+        Large inputs are sampled down to the renderer's max_scatter_points.
+        
         Args:
             y_true: True target values
             y_pred: Predicted target values
@@ -444,35 +547,16 @@ class ComprehensiveEvaluator:
         if self.task_type != 'regression':
             print("This plot is only for regression tasks.")
             return
+        if not self.renderer.enabled:
+            return None
         
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Scatter plot: predictions vs actual
-        axes[0].scatter(y_true, y_pred, alpha=0.5, s=20)
-        axes[0].plot([y_true.min(), y_true.max()], [y_true.min(), y_true.max()], 
-                    'r--', lw=2, label='Perfect Prediction')
-        axes[0].set_xlabel('Actual Values', fontsize=12)
-        axes[0].set_ylabel('Predicted Values', fontsize=12)
-        axes[0].set_title(f'Predictions vs Actual - {model_name}', fontsize=14, fontweight='bold')
-        axes[0].legend()
-        axes[0].grid(alpha=0.3)
-        
-        # Residual plot
-        residuals = y_true - y_pred
-        axes[1].scatter(y_pred, residuals, alpha=0.5, s=20)
-        axes[1].axhline(y=0, color='r', linestyle='--', lw=2)
-        axes[1].set_xlabel('Predicted Values', fontsize=12)
-        axes[1].set_ylabel('Residuals', fontsize=12)
-        axes[1].set_title(f'Residual Plot - {model_name}', fontsize=14, fontweight='bold')
-        axes[1].grid(alpha=0.3)
-        
-        plt.tight_layout()
+        y_true = np.asarray(y_true, dtype=float)
+        y_pred = np.asarray(y_pred, dtype=float)
+        limits = (y_true.min(), y_true.max())
+        y_true, y_pred = self.renderer.sample(y_true, y_pred)
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"✓ Saved prediction plot to {save_path}")
-        
-        plt.show()
+        return self.renderer.submit(_draw_predictions_vs_actual, y_true, y_pred, limits, model_name,
+                                    save_path=save_path, figsize=(15, 6))
     
     # ==================== FEATURE IMPORTANCE VISUALIZATION ====================
     
@@ -491,25 +575,15 @@ class ComprehensiveEvaluator:
         if not hasattr(model, 'feature_importances_'):
             print("Model does not have feature_importances_ attribute.")
             return
+        if not self.renderer.enabled:
+            return None
         
         importances = model.feature_importances_
         indices = np.argsort(importances)[::-1][:top_n]
         
-        plt.figure(figsize=(10, 8))
-        plt.barh(range(top_n), importances[indices], color='steelblue')
-        plt.yticks(range(top_n), [feature_names[i] for i in indices])
-        plt.xlabel('Feature Importance', fontsize=12)
-        plt.title(f'Top {top_n} Feature Importances - {model_name}', 
-                 fontsize=14, fontweight='bold')
-        plt.gca().invert_yaxis()
-        plt.grid(axis='x', alpha=0.3)
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"✓ Saved feature importance plot to {save_path}")
-        
-        plt.show()
+        return self.renderer.submit(_draw_feature_importance,
+                                    [feature_names[i] for i in indices], importances[indices],
+                                    model_name, save_path=save_path, figsize=(10, 8))
     
     # ==================== SUMMARY REPORT ====================
     
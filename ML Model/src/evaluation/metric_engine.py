@@ -0,0 +1,231 @@
+"""
+Metric Engine Module
+Classification metrics from a single pass over the predictions:
+- One confusion matrix (one bincount) gives per-class precision, recall, F1,
+  support, accuracy, the micro/macro/weighted averages and the text report
+- One sort of the scores (cumulative TP/FP counts at every distinct
+  threshold) gives the precision-recall curve, ROC-AUC and the full
+  threshold sweep in O(n log n)
+
+Values match sklearn.metrics (precision_score, recall_score, f1_score with
+zero_division=0, confusion_matrix, classification_report,
+precision_recall_curve and roc_auc_score).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _divide(numerator, denominator):
+    """numerator / denominator, 0 where the denominator is 0 (sklearn's zero_division=0)"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    result = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+# ==================== CONFUSION-MATRIX METRICS ====================
+
+def confusion_counts(y_true, y_pred, labels=None):
+    """
+    Confusion matrix from one bincount
+
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels
+        labels: Label order (default: sorted union of y_true and y_pred).
+                Samples with a label outside labels are ignored, as in sklearn
+
+    Returns:
+        (labels, cm) with true labels as rows and predictions as columns
+    """
+    y_true = np.asarray(y_true).ravel()
+    y_pred = np.asarray(y_pred).ravel()
+    labels = np.union1d(y_true, y_pred) if labels is None else np.asarray(labels)
+    n_labels = len(labels)
+
+    true_codes, true_known = encode_labels(y_true, labels)
+    pred_codes, pred_known = encode_labels(y_pred, labels)
+    known = true_known & pred_known
+    cm = np.bincount(true_codes[known] * n_labels + pred_codes[known],
+                     minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+    return labels, cm
+
+
+def encode_labels(values, labels):
+    """
+    Position of each value in labels
+
+    Returns:
+        (codes, known) where known is False for values not in labels
+    """
+    order = np.argsort(labels, kind='mergesort')
+    sorted_labels = labels[order]
+    position = np.searchsorted(sorted_labels, values).clip(max=len(labels) - 1)
+    return order[position], sorted_labels[position] == values
+
+
+def metrics_from_confusion(cm):
+    """
+    All classification metrics and averages from a confusion matrix
+
+    Args:
+        cm: Confusion matrix (true labels as rows)
+
+    Returns:
+        Dictionary with accuracy, per-class precision/recall/f1/support and
+        'micro', 'macro' and 'weighted' averages of precision/recall/f1
+    """
+    cm = np.asarray(cm)
+    tp = np.diag(cm).astype(float)
+    pred_sum = cm.sum(axis=0)
+    true_sum = cm.sum(axis=1)
+
+    per_class = {
+        'precision': _divide(tp, pred_sum),
+        'recall': _divide(tp, true_sum),
+        'f1': _divide(2 * tp, true_sum + pred_sum),
+    }
+
+    micro_tp = tp.sum()
+    averages = {
+        'micro': {
+            'precision': float(_divide(micro_tp, pred_sum.sum())),
+            'recall': float(_divide(micro_tp, true_sum.sum())),
+            'f1': float(_divide(2 * micro_tp, true_sum.sum() + pred_sum.sum())),
+        },
+        'macro': {name: float(np.average(values)) for name, values in per_class.items()},
+        'weighted': {
+            name: float(np.average(values, weights=true_sum)) if true_sum.sum() > 0 else 0.0
+            for name, values in per_class.items()
+        },
+    }
+
+    return {
+        'accuracy': float(_divide(micro_tp, cm.sum())),
+        'confusion_matrix': cm,
+        'support': true_sum,
+        **{f'{name}_per_class': values for name, values in per_class.items()},
+        **averages,
+    }
+
+
+def classification_report_text(metrics, target_names, digits=2):
+    """
+    sklearn-formatted classification report from metrics_from_confusion output
+
+    Args:
+        metrics: Output of metrics_from_confusion
+        target_names: Display name per class
+        digits: Number of digits for the scores
+    """
+    headers = ['precision', 'recall', 'f1-score', 'support']
+    width = max(max(len(name) for name in target_names), len('weighted avg'), digits)
+    report = ('{:>{width}s} ' + ' {:>9}' * len(headers)).format('', *headers, width=width) + '\n\n'
+
+    row_fmt = '{:>{width}s} ' + ' {:>9.{digits}f}' * 3 + ' {:>9}\n'
+    rows = zip(target_names, metrics['precision_per_class'], metrics['recall_per_class'],
+               metrics['f1_per_class'], metrics['support'])
+    for row in rows:
+        report += row_fmt.format(*row, width=width, digits=digits)
+    report += '\n'
+
+    total = int(metrics['support'].sum())
+    accuracy_fmt = '{:>{width}s} ' + ' {:>9.{digits}}' * 2 + ' {:>9.{digits}f}' + ' {:>9}\n'
+    report += accuracy_fmt.format('accuracy', '', '', metrics['micro']['f1'], total,
+                                  width=width, digits=digits)
+    for average in ('macro', 'weighted'):
+        values = metrics[average]
+        report += row_fmt.format(f'{average} avg', values['precision'], values['recall'],
+                                 values['f1'], total, width=width, digits=digits)
+    return report
+
+
+# ==================== THRESHOLD METRICS (BINARY) ====================
+
+def binary_curve(y_true, y_score, pos_label=1):
+    """
+    Cumulative true/false positive counts at every distinct score threshold
+
+    One stable sort of the scores; predicting positive for score >= threshold
+    gives tps[i] true and fps[i] false positives at thresholds[i].
+
+    Args:
+        y_true: True labels
+        y_score: Scores or probabilities of the positive class
+        pos_label: Label of the positive class
+
+    Returns:
+        (fps, tps, thresholds), thresholds in decreasing order
+    """
+    y_true = np.asarray(y_true).ravel() == pos_label
+    y_score = np.asarray(y_score).ravel()
+
+    order = np.argsort(y_score, kind='mergesort')[::-1]
+    y_score = y_score[order]
+    y_true = y_true[order]
+
+    distinct = np.where(np.diff(y_score))[0]
+    threshold_idxs = np.r_[distinct, y_true.size - 1]
+    tps = np.cumsum(y_true, dtype=np.float64)[threshold_idxs]
+    fps = 1 + threshold_idxs - tps
+    return fps, tps, y_score[threshold_idxs]
+
+
+def precision_recall_from_curve(fps, tps, thresholds):
+    """
+    Precision-recall curve from binary_curve output
+
+    Returns:
+        (precision, recall, thresholds) as sklearn.metrics.precision_recall_curve
+    """
+    precision = _divide(tps, tps + fps)
+    recall = np.ones_like(tps) if tps[-1] == 0 else tps / tps[-1]
+    return np.hstack((precision[::-1], 1)), np.hstack((recall[::-1], 0)), thresholds[::-1]
+
+
+def best_f1_threshold(precision, recall, thresholds):
+    """
+    Best-F1 point of a precision_recall_from_curve curve
+
+    Returns:
+        (index into precision/recall, threshold)
+    """
+    f1_scores = 2 * (precision * recall) / (precision + recall + 1e-12)
+    best_idx = int(np.argmax(f1_scores))
+    candidates = np.concatenate(([0.0], thresholds))
+    return best_idx, float(candidates[min(best_idx, len(candidates) - 1)])
+
+
+def roc_auc_from_curve(fps, tps):
+    """ROC-AUC from binary_curve output (trapezoidal area, as sklearn.metrics.roc_auc_score)"""
+    if tps[-1] == 0 or fps[-1] == 0:
+        raise ValueError("Only one class present in y_true. ROC AUC score is not defined in that case.")
+    tpr = np.r_[0, tps] / tps[-1]
+    fpr = np.r_[0, fps] / fps[-1]
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+def threshold_sweep(fps, tps, thresholds):
+    """
+    Confusion counts and metrics at every distinct threshold
+
+    Returns:
+        DataFrame (threshold decreasing) with tp, fp, fn, tn, precision,
+        recall, f1 and fpr for predicting positive when score >= threshold
+    """
+    positives = tps[-1]
+    negatives = fps[-1]
+    fn = positives - tps
+    return pd.DataFrame({
+        'threshold': thresholds,
+        'tp': tps,
+        'fp': fps,
+        'fn': fn,
+        'tn': negatives - fps,
+        'precision': _divide(tps, tps + fps),
+        'recall': _divide(tps, positives),
+        'f1': _divide(2 * tps, 2 * tps + fps + fn),
+        'fpr': _divide(fps, negatives),
+    })
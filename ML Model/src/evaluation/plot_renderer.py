@@ -0,0 +1,135 @@
+"""
+Plot Renderer Module
+Headless rendering of evaluation and dashboard plots:
+- Figures are standalone matplotlib Figure objects (no pyplot state, no
+  GUI backend, nothing left open after saving)
+- Immediate mode draws and saves in the calling process; deferred mode
+  queues the plots and render() draws them concurrently in worker processes
+  once metrics are computed
+- Plots can be disabled, and long curves are decimated to max_points
+"""
+
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from matplotlib.figure import Figure
+
+
+def _render(draw, save_path, figsize, dpi, args, kwargs):
+    """Draw one plot on a fresh Figure and save it"""
+    fig = Figure(figsize=figsize)
+    draw(fig, *args, **kwargs)
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    return fig
+
+
+def _render_job(draw, save_path, figsize, dpi, args, kwargs):
+    """Worker entry point: render and report (path, error) instead of raising"""
+    try:
+        _render(draw, save_path, figsize, dpi, args, kwargs)
+        return save_path, None
+    except Exception as e:
+        return save_path, f"{type(e).__name__}: {e}"
+
+
+class PlotRenderer:
+    """Render plots headlessly, immediately or in parallel worker processes"""
+
+    def __init__(self, enabled=True, deferred=False, n_jobs=-1, dpi=300, max_points=2000,
+                 max_scatter_points=20000):
+        """
+        Initialize the PlotRenderer
+
+        Args:
+            enabled: Draw plots at all (False skips them, including their data preparation)
+            deferred: Queue plots until render() instead of drawing them right away
+            n_jobs: Worker processes used by render()
+            dpi: Resolution of saved images
+            max_points: Longest line (ROC curve, time series) drawn; longer ones are decimated
+            max_scatter_points: Most points drawn in a scatter plot; more are sampled
+        """
+        self.enabled = enabled
+        self.deferred = deferred
+        self.n_jobs = n_jobs
+        self.dpi = dpi
+        self.max_points = max_points
+        self.max_scatter_points = max_scatter_points
+        self.pending = []
+
+    def decimate(self, *arrays):
+        """
+        Evenly spaced subset (first and last point kept) of equally long arrays
+
+        Returns:
+            The arrays, cut to at most max_points entries
+        """
+        n = len(arrays[0])
+        if self.max_points is None or n <= self.max_points:
+            return arrays if len(arrays) > 1 else arrays[0]
+        keep = np.unique(np.linspace(0, n - 1, self.max_points).round().astype(int))
+        decimated = tuple(np.asarray(a)[keep] for a in arrays)
+        return decimated if len(decimated) > 1 else decimated[0]
+
+    def sample(self, *arrays, random_state=42):
+        """Random subset of at most max_scatter_points rows of equally long arrays"""
+        n = len(arrays[0])
+        if self.max_scatter_points is None or n <= self.max_scatter_points:
+            return arrays if len(arrays) > 1 else arrays[0]
+        keep = np.sort(np.random.default_rng(random_state).choice(n, self.max_scatter_points,
+                                                                  replace=False))
+        sampled = tuple(np.asarray(a)[keep] for a in arrays)
+        return sampled if len(sampled) > 1 else sampled[0]
+
+    def submit(self, draw, *args, save_path=None, figsize=(12, 8), **kwargs):
+        """
+        Draw a plot now, or queue it in deferred mode
+
+        Args:
+            draw: Module-level function draw(fig, *args, **kwargs) that fills the Figure
+            *args, **kwargs: Plot data passed to draw (keep it small: decimate first)
+            save_path: Image path (required in deferred mode)
+            figsize: Figure size in inches
+
+        Returns:
+            The Figure in immediate mode, save_path when deferred, None when disabled
+        """
+        if not self.enabled:
+            return None
+        if self.deferred:
+            if not save_path:
+                raise ValueError("Deferred plots need a save_path.")
+            self.pending.append((draw, save_path, figsize, self.dpi, args, kwargs))
+            return save_path
+
+        fig = _render(draw, save_path, figsize, self.dpi, args, kwargs)
+        if save_path:
+            print(f"✓ Saved {save_path}")
+        return fig
+
+    def render(self):
+        """
+        Draw every queued plot concurrently in worker processes
+
+        Returns:
+            List of saved paths (failed plots are reported and skipped)
+        """
+        if not self.pending:
+            return []
+        jobs, self.pending = self.pending, []
+
+        start = time.perf_counter()
+        results = Parallel(n_jobs=min(len(jobs), self.n_jobs) if self.n_jobs > 0 else self.n_jobs)(
+            delayed(_render_job)(*job) for job in jobs
+        )
+
+        saved = []
+        for path, error in results:
+            if error is None:
+                saved.append(path)
+                print(f"✓ Saved {path}")
+            else:
+                print(f"Warning: could not render {path}: {error}")
+        print(f"Rendered {len(saved)}/{len(jobs)} plots in {time.perf_counter() - start:.1f}s")
+        return saved
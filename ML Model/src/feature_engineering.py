@@ -3,10 +3,14 @@ Feature Engineering Module
 Handles encoding, temporal features, and geospatial processing
 """
 
+import json
+import os
 import pandas as pd
 import numpy as np
+from scipy import sparse as sp
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from pandas.api.types import is_object_dtype, is_categorical_dtype
+from src.feature_engineering.temporal_features import expand_by_unique_timestamps, hour_in_range
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -23,6 +27,7 @@ class FeatureEngineer:
         """
         self.df = df.copy()
         self.label_encoders = {}
+        self.category_vocabularies = {}
         self.scaler = StandardScaler()
         self.categorical_columns = []
         self.numerical_columns = []
@@ -66,29 +71,49 @@ class FeatureEngineer:
             print(f"Date column '{date_column}' not found.")
             return self.df
         
-        # Extract temporal features
-        self.df['hour'] = self.df[date_column].dt.hour
-        self.df['day_of_week'] = self.df[date_column].dt.dayofweek
-        self.df['day_of_month'] = self.df[date_column].dt.day
-        self.df['month'] = self.df[date_column].dt.month
-        self.df['year'] = self.df[date_column].dt.year
-        self.df['is_weekend'] = (self.df['day_of_week'] >= 5).astype(int)
-        self.df['is_night'] = ((self.df['hour'] >= 20) | (self.df['hour'] < 6)).astype(int)
-        self.df['is_rush_hour'] = ((self.df['hour'] >= 7) & (self.df['hour'] <= 9) | 
-                                   (self.df['hour'] >= 17) & (self.df['hour'] <= 19)).astype(int)
+        # Extract temporal features once per unique hour and broadcast back by code
+        temporal_df = expand_by_unique_timestamps(self.df[date_column], self._temporal_columns)
+        for col in temporal_df.columns:
+            self.df[col] = temporal_df[col]
         
         print(f"Extracted temporal features from {date_column}")
         print(f"New features: hour, day_of_week, day_of_month, month, year, is_weekend, is_night, is_rush_hour")
         
         return self.df
     
-    def encode_categorical_variables(self, columns=None, encoding_type='label'):
+    @staticmethod
+    def _temporal_columns(timestamps):
+        """Derive temporal features for a DatetimeIndex of unique (hour-truncated) timestamps"""
+        hour = timestamps.hour.to_numpy().astype(np.int8)
+        day_of_week = timestamps.dayofweek.to_numpy().astype(np.int8)
+        return {
+            'hour': hour,
+            'day_of_week': day_of_week,
+            'day_of_month': timestamps.day.to_numpy().astype(np.int8),
+            'month': timestamps.month.to_numpy().astype(np.int8),
+            'year': timestamps.year.to_numpy().astype(np.int16),
+            'is_weekend': day_of_week >= 5,
+            'is_night': (hour >= 20) | (hour < 6),
+            'is_rush_hour': hour_in_range(hour, 7, 9) | hour_in_range(hour, 17, 19),
+        }
+    
+    def encode_categorical_variables(self, columns=None, encoding_type='label', sparse=False):
         """
         Encode categorical variables
         
+        Object columns are converted to pandas category dtype once; label encoding
+        uses the category codes directly (int8/int16) and one-hot encoding builds
+        all indicator columns in a single allocation. For label encoding, missing
+        values are their own 'nan' class (as LabelEncoder on astype(str) gave),
+        so label_encoders[col].inverse_transform covers every code; one-hot
+        encoding gives them an all-zero row.
+        The category vocabularies are kept in self.category_vocabularies
+        (see save_category_vocabularies / apply_category_vocabularies).
+        
         Args:
             columns: List of columns to encode. If None, encode all categorical columns
             encoding_type: 'label' (Label Encoding) or 'onehot' (One-Hot Encoding)
+            sparse: For 'onehot', store the indicator columns as sparse arrays
         """
         if columns is None:
             columns = self.categorical_columns.copy()
@@ -97,23 +122,124 @@ class FeatureEngineer:
                 target_col = 'severity' if 'severity' in columns else 'Severity'
                 columns.remove(target_col)
         
+        columns = [col for col in columns if col in self.df.columns]
+        codes = {}
+        for col in columns:
+            if not isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                self.df[col] = self.df[col].astype('category')
+            values = self.df[col]
+            if (encoding_type == 'label' and values.isna().any()
+                    and 'nan' not in values.cat.categories):
+                values = values.cat.add_categories('nan').fillna('nan')
+                if pd.api.types.infer_dtype(values.cat.categories) == 'string':
+                    # Keep LabelEncoder's sorted class order
+                    values = values.cat.reorder_categories(sorted(values.cat.categories))
+            codes[col] = values.cat.codes
+            categories = values.cat.categories
+            self.category_vocabularies[col] = categories.tolist()
+            # LabelEncoder with the same classes, for callers using inverse_transform
+            le = LabelEncoder()
+            le.classes_ = categories.to_numpy()
+            self.label_encoders[col] = le
+        
         if encoding_type == 'label':
+            encoded = {col + '_encoded': codes[col] for col in columns}
+            for name, codes in encoded.items():
+                self.df[name] = codes
             for col in columns:
-                if col in self.df.columns:
-                    le = LabelEncoder()
-                    self.df[col + '_encoded'] = le.fit_transform(self.df[col].astype(str))
-                    self.label_encoders[col] = le
-                    print(f"Label encoded {col}")
+                print(f"Label encoded {col}")
         
-        elif encoding_type == 'onehot':
+        elif encoding_type == 'onehot' and columns:
+            dummies = self._one_hot_block(self.df, columns, self.category_vocabularies, sparse=sparse)
+            self.df = pd.concat([self.df, dummies], axis=1)
             for col in columns:
-                if col in self.df.columns:
-                    dummies = pd.get_dummies(self.df[col], prefix=col, drop_first=True)
-                    self.df = pd.concat([self.df, dummies], axis=1)
-                    print(f"One-hot encoded {col}")
+                print(f"One-hot encoded {col}")
         
         return self.df
     
+    @staticmethod
+    def _one_hot_block(df, columns, vocabularies, sparse=False, drop_first=True):
+        """Build the one-hot indicators for all columns as one bool matrix"""
+        n_rows = len(df)
+        names, row_idx, col_idx = [], [], []
+        offset = 0
+        for col in columns:
+            categories = vocabularies[col][1:] if drop_first else vocabularies[col]
+            codes = df[col].cat.codes.to_numpy().astype(np.int64)
+            if drop_first:
+                codes = codes - 1
+            rows = np.flatnonzero(codes >= 0)
+            row_idx.append(rows)
+            col_idx.append(codes[rows] + offset)
+            names.extend(f"{col}_{category}" for category in categories)
+            offset += len(categories)
+        
+        row_idx = np.concatenate(row_idx)
+        col_idx = np.concatenate(col_idx)
+        if sparse:
+            matrix = sp.csc_matrix((np.ones(len(row_idx), dtype=bool), (row_idx, col_idx)),
+                                   shape=(n_rows, offset))
+            return pd.DataFrame.sparse.from_spmatrix(matrix, index=df.index, columns=names)
+        
+        matrix = np.zeros((n_rows, offset), dtype=bool)
+        matrix[row_idx, col_idx] = True
+        return pd.DataFrame(matrix, index=df.index, columns=names, copy=False)
+    
+    def save_category_vocabularies(self, filepath='models/category_vocabularies.json'):
+        """
+        Save the fitted category vocabularies as JSON
+        
+        Args:
+            filepath: Path to save the vocabularies
+        """
+        if not self.category_vocabularies:
+            raise ValueError("No category vocabularies available. Run encode_categorical_variables first.")
+        os.makedirs(os.path.dirname(filepath) if os.path.dirname(filepath) else '.', exist_ok=True)
+        with open(filepath, 'w') as f:
+            json.dump(self.category_vocabularies, f, indent=2, default=str)
+        print(f"Category vocabularies saved to {filepath}")
+        return filepath
+    
+    @staticmethod
+    def load_category_vocabularies(filepath='models/category_vocabularies.json'):
+        """Load vocabularies saved with save_category_vocabularies"""
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    
+    @staticmethod
+    def apply_category_vocabularies(df, vocabularies, encoding_type='label', sparse=False):
+        """
+        Encode new rows with fitted vocabularies (e.g. at serving time)
+        
+        Values are looked up in each vocabulary, so codes match training;
+        missing values map to the 'nan' class when the vocabulary has one, and
+        unseen (or otherwise missing) values get code -1 (all-zero one-hot row).
+        
+        Args:
+            df: DataFrame with the raw categorical columns
+            vocabularies: Mapping of column -> list of categories
+            encoding_type: 'label' or 'onehot'
+            sparse: For 'onehot', store the indicator columns as sparse arrays
+            
+        Returns:
+            Copy of df with the encoded columns added
+        """
+        df = df.copy()
+        columns = [col for col in vocabularies if col in df.columns]
+        for col in columns:
+            values = df[col]
+            if 'nan' in vocabularies[col]:
+                values = values.astype(object).where(values.notna(), 'nan')
+            df[col] = pd.Categorical(values, categories=vocabularies[col])
+        
+        if encoding_type == 'label':
+            for col in columns:
+                df[col + '_encoded'] = df[col].cat.codes
+        elif encoding_type == 'onehot' and columns:
+            df = pd.concat([df, FeatureEngineer._one_hot_block(df, columns, vocabularies, sparse=sparse)],
+                           axis=1)
+        return df
+    
     def process_geospatial_data(self, lat_col=None, lon_col=None):
         """
         Process geospatial data (latitude, longitude)
@@ -12,23 +12,185 @@ import pandas as pd
 import numpy as np
 from scipy import signal
 from scipy.fft import fft, fftfreq
+from joblib import Parallel, delayed
+from .temporal_features import cyclical_encoding, expand_by_unique_timestamps, hour_in_range
 import warnings
 warnings.filterwarnings('ignore')
 
 
+# ==================== PER-GROUP HELPERS ====================
+
+def _lag_block(frame, columns, lags, group_column=None):
+    """
+    Build lag and difference columns for a frame already ordered by time
+
+    When group_column is given the shift is done per group, so values never
+    leak from one zone/vehicle into the next.
+    """
+    if group_column is not None:
+        source = frame.groupby(group_column, sort=False, dropna=False)[columns]
+    else:
+        source = frame[columns]
+    
+    shifted = {lag: source.shift(lag) for lag in lags}
+    block = {}
+    for col in columns:
+        for lag in lags:
+            block[f'{col}_lag_{lag}'] = shifted[lag][col]
+            if lag == 1:
+                block[f'{col}_diff_1'] = frame[col] - shifted[lag][col]
+    
+    return pd.DataFrame(block, index=frame.index, copy=False)
+
+
+def _rolling_block(frame, sensor_columns, window_sizes, timestamp_column=None,
+                   group_column=None):
+    """
+    Build rolling statistics for a frame sorted by (group, time)
+
+    Results are assigned positionally: grouped rolling returns rows in group
+    order, which matches the frame because it is sorted by group first.
+    """
+    block = {}
+    for sensor_col in sensor_columns:
+        for window_size in window_sizes:
+            # Time-based window when a timestamp is available, else 1 sample per second
+            window = f'{window_size}s' if timestamp_column else window_size
+            if group_column is not None:
+                source = frame.groupby(group_column, sort=False, dropna=False)
+            else:
+                source = frame
+            rolling = source.rolling(window, on=timestamp_column, min_periods=1)[sensor_col]
+            
+            stats = {
+                'mean': rolling.mean(),
+                'std': rolling.std(),
+                'min': rolling.min(),
+                'max': rolling.max(),
+                'median': rolling.median(),
+                # Rate of change across the window
+                'diff': rolling.apply(lambda x: x[-1] - x[0], raw=True),
+            }
+            for name, values in stats.items():
+                block[f'{sensor_col}_rolling_{name}_{window_size}s'] = values.to_numpy()
+    
+    return pd.DataFrame(block, index=frame.index, copy=False)
+
+
+def _apply_per_group(frame, group_column, func, n_jobs, **kwargs):
+    """Run func on each group in parallel and stitch the blocks back in frame order"""
+    groups = frame.groupby(group_column, sort=False, dropna=False)
+    blocks = Parallel(n_jobs=n_jobs)(
+        delayed(func)(group_df, **kwargs) for _, group_df in groups
+    )
+    return pd.concat(blocks).reindex(frame.index)
+
+
 class EnhancedFeatureEngineer:
     """Enhanced feature engineering with advanced transformations"""
     
-    def __init__(self, df):
+    def __init__(self, df, copy=True):
         """
         Initialize the EnhancedFeatureEngineer
         
         Args:
             df: pandas DataFrame with raw data
+            copy: Deep-copy the input. Stages never write into the caller's
+                  columns, so copy=False (shallow copy) is safe and avoids
+                  holding a second copy of the raw data
         """
-        self.df = df.copy()
+        self.df = df.copy(deep=copy)
         self.grid_zones = None
         
+        # Deferred (assemble-once) pipeline state, see create_all_features
+        self._deferred = False
+        self._pending = {}
+        self._row_indexer = None
+        
+    # ==================== COLUMN STORE ====================
+    
+    def _has_column(self, name):
+        """Whether the column exists in the data or among pending feature columns"""
+        return name in self._pending or name in self.df.columns
+    
+    def _column(self, name):
+        """Return a column in the current row order"""
+        if not self._deferred:
+            return self.df[name]
+        if name in self._pending:
+            return self._pending[name]
+        values = self.df[name].array
+        if self._row_indexer is not None:
+            values = values.take(self._row_indexer)
+        return pd.Series(values, name=name)
+    
+    def _frame(self, columns):
+        """Narrow DataFrame with only the requested columns in the current row order"""
+        return pd.DataFrame({col: self._column(col) for col in dict.fromkeys(columns)})
+    
+    def _n_rows(self):
+        if self._deferred and self._row_indexer is not None:
+            return len(self._row_indexer)
+        return len(self.df)
+    
+    def _set_columns(self, columns):
+        """
+        Add or replace feature columns
+        
+        In deferred mode the values are kept in a dict and only assembled into
+        a frame once at the end of the pipeline, instead of growing self.df.
+        """
+        for name, values in columns.items():
+            if np.ndim(values) == 0:
+                values = np.full(self._n_rows(), values)
+            if not self._deferred:
+                self.df[name] = values
+                continue
+            if isinstance(values, pd.Series):
+                values = values.array
+            self._pending[name] = pd.Series(values, name=name)
+    
+    def _take_rows(self, positions, reset_index=True):
+        """Reorder or filter rows by position"""
+        if not self._deferred:
+            self.df = self.df.take(positions)
+            if reset_index:
+                self.df = self.df.reset_index(drop=True)
+            return
+        # Deferred: only compose the row indexer; base data is gathered once in _assemble
+        base = np.arange(len(self.df)) if self._row_indexer is None else self._row_indexer
+        self._row_indexer = base[positions]
+        self._pending = {
+            name: pd.Series(values.array.take(positions), name=name)
+            for name, values in self._pending.items()
+        }
+    
+    def _assemble(self):
+        """
+        Build the output frame in one step from the base data and the pending columns
+        
+        Columns are handed to the constructor without consolidation, so each
+        value is gathered exactly once.
+        """
+        if self._row_indexer is None:
+            index = self.df.index
+        else:
+            index = pd.RangeIndex(len(self._row_indexer))
+        
+        columns = {}
+        for name in self.df.columns:
+            values = self.df[name].array
+            if self._row_indexer is not None:
+                values = values.take(self._row_indexer)
+            columns[name] = values
+        for name, values in self._pending.items():
+            columns[name] = values.array
+        
+        self._deferred = False
+        self._pending = {}
+        self._row_indexer = None
+        return pd.DataFrame(columns, index=index, copy=False)
+    
     # ==================== TEMPORAL FEATURES ====================
     
     def extract_temporal_features(self, timestamp_column=None):
@@ -46,7 +208,7 @@ class EnhancedFeatureEngineer:
             timestamp_candidates = ['timestamp', 'datetime', 'date', 'time', 'Timestamp', 'DateTime']
             timestamp_column = None
             for col in timestamp_candidates:
-                if col in self.df.columns:
+                if self._has_column(col):
                     timestamp_column = col
                     break
             
@@ -56,52 +218,68 @@ class EnhancedFeatureEngineer:
                 if len(datetime_cols) > 0:
                     timestamp_column = datetime_cols[0]
         
-        if timestamp_column is None or timestamp_column not in self.df.columns:
+        if timestamp_column is None or not self._has_column(timestamp_column):
             print("Warning: No timestamp column found. Skipping temporal feature extraction.")
             return self.df
         
         # Ensure datetime format
-        if not pd.api.types.is_datetime64_any_dtype(self.df[timestamp_column]):
-            self.df[timestamp_column] = pd.to_datetime(self.df[timestamp_column], errors='coerce')
-        
-        # Extract basic temporal features
-        self.df['day_of_week'] = self.df[timestamp_column].dt.dayofweek  # 0=Monday, 6=Sunday
-        self.df['hour_of_day'] = self.df[timestamp_column].dt.hour
-        self.df['day_of_month'] = self.df[timestamp_column].dt.day
-        self.df['month'] = self.df[timestamp_column].dt.month
-        self.df['quarter'] = self.df[timestamp_column].dt.quarter
-        self.df['year'] = self.df[timestamp_column].dt.year
-        self.df['week_of_year'] = self.df[timestamp_column].dt.isocalendar().week
-        
-        # Binary temporal features
-        self.df['is_weekend'] = (self.df['day_of_week'] >= 5).astype(int)  # Saturday=5, Sunday=6
-        self.df['is_weekday'] = (self.df['day_of_week'] < 5).astype(int)
-        
-        # Rush hour definition: 7-9 AM and 5-7 PM
-        self.df['is_rush_hour'] = (
-            ((self.df['hour_of_day'] >= 7) & (self.df['hour_of_day'] <= 9)) |
-            ((self.df['hour_of_day'] >= 17) & (self.df['hour_of_day'] <= 19))
-        ).astype(int)
-        
-        # Time of day categories
-        self.df['is_morning'] = ((self.df['hour_of_day'] >= 6) & (self.df['hour_of_day'] < 12)).astype(int)
-        self.df['is_afternoon'] = ((self.df['hour_of_day'] >= 12) & (self.df['hour_of_day'] < 18)).astype(int)
-        self.df['is_evening'] = ((self.df['hour_of_day'] >= 18) & (self.df['hour_of_day'] < 22)).astype(int)
-        self.df['is_night'] = ((self.df['hour_of_day'] >= 22) | (self.df['hour_of_day'] < 6)).astype(int)
-        
-        # Cyclical encoding for periodic features
-        self.df['hour_sin'] = np.sin(2 * np.pi * self.df['hour_of_day'] / 24)
-        self.df['hour_cos'] = np.cos(2 * np.pi * self.df['hour_of_day'] / 24)
-        self.df['day_of_week_sin'] = np.sin(2 * np.pi * self.df['day_of_week'] / 7)
-        self.df['day_of_week_cos'] = np.cos(2 * np.pi * self.df['day_of_week'] / 7)
-        self.df['month_sin'] = np.sin(2 * np.pi * self.df['month'] / 12)
-        self.df['month_cos'] = np.cos(2 * np.pi * self.df['month'] / 12)
+        self._ensure_datetime(timestamp_column)
+        
+        # Features are computed once per unique hour and broadcast back by code
+        temporal_df = expand_by_unique_timestamps(self._column(timestamp_column),
+                                                  self._temporal_columns)
+        self._set_columns(temporal_df)
         
         print(f"✓ Extracted temporal features from '{timestamp_column}'")
         print(f"  Added: day_of_week, hour_of_day, is_weekend, is_rush_hour, and cyclical encodings")
         
         return self.df
     
+    def _ensure_datetime(self, column):
+        """Convert a column to datetime in place if needed"""
+        values = self._column(column)
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            self._set_columns({column: pd.to_datetime(values, errors='coerce')})
+    
+    @staticmethod
+    def _temporal_columns(timestamps):
+        """Derive temporal features for a DatetimeIndex of unique (hour-truncated) timestamps"""
+        day_of_week = timestamps.dayofweek.to_numpy().astype(np.int8)  # 0=Monday, 6=Sunday
+        hour_of_day = timestamps.hour.to_numpy().astype(np.int8)
+        month = timestamps.month.to_numpy().astype(np.int8)
+        
+        hour_sin, hour_cos = cyclical_encoding(hour_of_day, 24)
+        day_of_week_sin, day_of_week_cos = cyclical_encoding(day_of_week, 7)
+        month_sin, month_cos = cyclical_encoding(month, 12)
+        
+        return {
+            # Basic temporal features
+            'day_of_week': day_of_week,
+            'hour_of_day': hour_of_day,
+            'day_of_month': timestamps.day.to_numpy().astype(np.int8),
+            'month': month,
+            'quarter': timestamps.quarter.to_numpy().astype(np.int8),
+            'year': timestamps.year.to_numpy().astype(np.int16),
+            'week_of_year': timestamps.isocalendar().week.to_numpy().astype(np.int8),
+            # Binary temporal features (Saturday=5, Sunday=6)
+            'is_weekend': day_of_week >= 5,
+            'is_weekday': day_of_week < 5,
+            # Rush hour definition: 7-9 AM and 5-7 PM
+            'is_rush_hour': hour_in_range(hour_of_day, 7, 9) | hour_in_range(hour_of_day, 17, 19),
+            # Time of day categories
+            'is_morning': hour_in_range(hour_of_day, 6, 11),
+            'is_afternoon': hour_in_range(hour_of_day, 12, 17),
+            'is_evening': hour_in_range(hour_of_day, 18, 21),
+            'is_night': (hour_of_day >= 22) | (hour_of_day < 6),
+            # Cyclical encoding for periodic features
+            'hour_sin': hour_sin,
+            'hour_cos': hour_cos,
+            'day_of_week_sin': day_of_week_sin,
+            'day_of_week_cos': day_of_week_cos,
+            'month_sin': month_sin,
+            'month_cos': month_cos,
+        }
+    
     # ==================== SPATIAL GRID FEATURES ====================
     
     def create_spatial_grid(self, lat_col=None, lon_col=None, grid_size=0.01, 
@@ -123,81 +301,95 @@ class EnhancedFeatureEngineer:
         if lat_col is None:
             lat_candidates = ['latitude', 'lat', 'Latitude', 'LAT', 'y']
             for col in lat_candidates:
-                if col in self.df.columns:
+                if self._has_column(col):
                     lat_col = col
                     break
         
         if lon_col is None:
             lon_candidates = ['longitude', 'lon', 'lng', 'Longitude', 'LONG', 'LON', 'x']
             for col in lon_candidates:
-                if col in self.df.columns:
+                if self._has_column(col):
                     lon_col = col
                     break
         
-        if lat_col is None or lon_col is None or lat_col not in self.df.columns or lon_col not in self.df.columns:
+        if lat_col is None or lon_col is None or not self._has_column(lat_col) or not self._has_column(lon_col):
             print("Warning: Latitude/Longitude columns not found. Skipping spatial grid creation.")
             return self.df
         
         # Remove invalid coordinates
+        lat = self._column(lat_col)
+        lon = self._column(lon_col)
         valid_mask = (
-            (self.df[lat_col] >= -90) & (self.df[lat_col] <= 90) &
-            (self.df[lon_col] >= -180) & (self.df[lon_col] <= 180)
-        )
-        self.df = self.df[valid_mask].copy()
+            (lat >= -90) & (lat <= 90) &
+            (lon >= -180) & (lon <= 180)
+        ).to_numpy()
+        self._take_rows(np.flatnonzero(valid_mask), reset_index=create_aggregates)
+        lat = self._column(lat_col)
+        lon = self._column(lon_col)
         
         # Create grid indices
-        self.df['grid_lat'] = (self.df[lat_col] / grid_size).astype(int)
-        self.df['grid_lon'] = (self.df[lon_col] / grid_size).astype(int)
-        self.df['grid_zone'] = self.df['grid_lat'].astype(str) + '_' + self.df['grid_lon'].astype(str)
+        grid_lat = (lat / grid_size).astype(int)
+        grid_lon = (lon / grid_size).astype(int)
+        grid_zone = grid_lat.astype(str) + '_' + grid_lon.astype(str)
+        features = {'grid_lat': grid_lat, 'grid_lon': grid_lon, 'grid_zone': grid_zone}
         
         if create_aggregates:
+            # Zone statistics are computed per zone code and broadcast back,
+            # rather than merged in (each merge rebuilt the whole frame)
+            zone_codes, zone_labels = pd.factorize(grid_zone)
+            
             # Calculate grid center coordinates
-            grid_centers = self.df.groupby('grid_zone').agg({
-                lat_col: 'mean',
-                lon_col: 'mean'
-            }).reset_index()
-            grid_centers.columns = ['grid_zone', 'grid_center_lat', 'grid_center_lon']
-            self.df = self.df.merge(grid_centers, on='grid_zone', how='left')
+            grid_centers = pd.DataFrame({
+                'lat': lat.to_numpy(),
+                'lon': lon.to_numpy()
+            }).groupby(zone_codes).mean()
+            features['grid_center_lat'] = grid_centers['lat'].to_numpy()[zone_codes]
+            features['grid_center_lon'] = grid_centers['lon'].to_numpy()[zone_codes]
             
             # Aggregate accident counts per zone
-            zone_counts = self.df.groupby('grid_zone').size().reset_index(name='accident_count_in_zone')
-            self.df = self.df.merge(zone_counts, on='grid_zone', how='left')
+            features['accident_count_in_zone'] = np.bincount(zone_codes)[zone_codes]
             
             # Aggregate severity statistics if severity column exists
-            if severity_col and severity_col in self.df.columns:
-                # Encode severity if categorical
-                if self.df[severity_col].dtype == 'object':
+            if severity_col and self._has_column(severity_col):
+                severity = self._column(severity_col)
+                # Encode severity if categorical (object or category dtype)
+                if not pd.api.types.is_numeric_dtype(severity):
                     severity_map = {'Low': 1, 'Medium': 2, 'High': 3, 'Critical': 3}
-                    self.df['severity_encoded'] = self.df[severity_col].map(severity_map).fillna(1)
+                    severity_encoded = severity.astype(object).map(severity_map).fillna(1)
                 else:
-                    self.df['severity_encoded'] = self.df[severity_col]
+                    severity_encoded = severity
+                features['severity_encoded'] = severity_encoded
                 
-                zone_severity = self.df.groupby('grid_zone').agg({
-                    'severity_encoded': ['mean', 'std', 'min', 'max', 'count']
-                }).reset_index()
-                zone_severity.columns = ['grid_zone', 'zone_avg_severity', 'zone_std_severity', 
-                                        'zone_min_severity', 'zone_max_severity', 'zone_total_accidents']
-                self.df = self.df.merge(zone_severity, on='grid_zone', how='left')
+                zone_severity = pd.Series(severity_encoded.to_numpy()).groupby(zone_codes).agg(
+                    ['mean', 'std', 'min', 'max', 'count']
+                )
+                zone_severity.columns = ['zone_avg_severity', 'zone_std_severity',
+                                         'zone_min_severity', 'zone_max_severity', 'zone_total_accidents']
+                for col in zone_severity.columns:
+                    features[col] = zone_severity[col].to_numpy()[zone_codes]
                 
                 # Fill NaN values
-                self.df['zone_avg_severity'] = self.df['zone_avg_severity'].fillna(1)
-                self.df['zone_std_severity'] = self.df['zone_std_severity'].fillna(0)
+                features['zone_avg_severity'] = np.nan_to_num(features['zone_avg_severity'], nan=1)
+                features['zone_std_severity'] = np.nan_to_num(features['zone_std_severity'], nan=0)
             
             # Calculate distance from grid center
-            self.df['distance_from_grid_center'] = np.sqrt(
-                (self.df[lat_col] - self.df['grid_center_lat'])**2 +
-                (self.df[lon_col] - self.df['grid_center_lon'])**2
+            features['distance_from_grid_center'] = np.sqrt(
+                (lat.to_numpy() - features['grid_center_lat'])**2 +
+                (lon.to_numpy() - features['grid_center_lon'])**2
             )
         
+        self._set_columns(features)
+        
         print(f"✓ Created spatial grid with size {grid_size} degrees")
-        print(f"  Total grid zones: {self.df['grid_zone'].nunique()}")
+        print(f"  Total grid zones: {grid_zone.nunique()}")
         
         return self.df
     
     # ==================== SENSOR TIME-WINDOW FEATURES ====================
     
     def create_sensor_rolling_features(self, sensor_columns, window_sizes=[5, 10], 
-                                      timestamp_column=None, freq='1S'):
+                                      timestamp_column=None, freq='1S',
+                                      group_column=None, n_jobs=1):
         """
         Create time-window features with rolling statistics for sensor data
         
@@ -206,6 +398,9 @@ class EnhancedFeatureEngineer:
             window_sizes: List of window sizes in seconds (e.g., [5, 10])
             timestamp_column: Name of timestamp column for time-based rolling
             freq: Frequency string for resampling (default '1S' for 1 second)
+            group_column: Optional entity column (e.g., 'vehicle_id', 'grid_zone');
+                          windows never span two groups
+            n_jobs: Number of parallel jobs across groups (1 = vectorized, no workers)
         
         Returns:
             DataFrame with rolling statistics features
@@ -213,54 +408,41 @@ class EnhancedFeatureEngineer:
         if timestamp_column is None:
             timestamp_candidates = ['timestamp', 'datetime', 'time']
             for col in timestamp_candidates:
-                if col in self.df.columns:
+                if self._has_column(col):
                     timestamp_column = col
                     break
         
-        if timestamp_column is None or timestamp_column not in self.df.columns:
+        if timestamp_column is None or not self._has_column(timestamp_column):
             print("Warning: No timestamp column found. Using index-based rolling.")
-            use_time_index = False
+            timestamp_column = None
         else:
-            use_time_index = True
-            if not pd.api.types.is_datetime64_any_dtype(self.df[timestamp_column]):
-                self.df[timestamp_column] = pd.to_datetime(self.df[timestamp_column], errors='coerce')
-            self.df = self.df.sort_values(timestamp_column).reset_index(drop=True)
-            self.df = self.df.set_index(timestamp_column)
+            self._ensure_datetime(timestamp_column)
         
         # Find available sensor columns
-        available_sensors = [col for col in sensor_columns if col in self.df.columns]
+        available_sensors = [col for col in sensor_columns if self._has_column(col)]
         if len(available_sensors) == 0:
             print("Warning: No sensor columns found. Skipping rolling features.")
-            if use_time_index:
-                self.df = self.df.reset_index()
             return self.df
         
+        group_column = self._resolve_group_column(group_column)
+        self._sort_by_group_and_time(group_column, timestamp_column)
+        
         print(f"Creating rolling features for sensors: {available_sensors}")
         
-        for sensor_col in available_sensors:
-            for window_size in window_sizes:
-                if use_time_index:
-                    # Time-based rolling window
-                    window_str = f'{window_size}S'
-                    rolling = self.df[sensor_col].rolling(window=window_str, min_periods=1)
-                else:
-                    # Index-based rolling window (assume 1 sample per second)
-                    rolling = self.df[sensor_col].rolling(window=window_size, min_periods=1)
-                
-                # Rolling statistics
-                self.df[f'{sensor_col}_rolling_mean_{window_size}s'] = rolling.mean()
-                self.df[f'{sensor_col}_rolling_std_{window_size}s'] = rolling.std()
-                self.df[f'{sensor_col}_rolling_min_{window_size}s'] = rolling.min()
-                self.df[f'{sensor_col}_rolling_max_{window_size}s'] = rolling.max()
-                self.df[f'{sensor_col}_rolling_median_{window_size}s'] = rolling.median()
-                
-                # Rate of change
-                self.df[f'{sensor_col}_rolling_diff_{window_size}s'] = rolling.apply(lambda x: x.iloc[-1] - x.iloc[0] if len(x) > 1 else 0)
+        frame = self._frame([col for col in (group_column, timestamp_column) if col is not None]
+                            + available_sensors)
+        block_kwargs = dict(sensor_columns=available_sensors, window_sizes=window_sizes,
+                            timestamp_column=timestamp_column)
+        if group_column is not None and n_jobs != 1:
+            rolling_df = _apply_per_group(frame, group_column, _rolling_block, n_jobs, **block_kwargs)
+        else:
+            rolling_df = _rolling_block(frame, group_column=group_column, **block_kwargs)
         
-        if use_time_index:
-            self.df = self.df.reset_index()
+        self._set_columns(rolling_df)
         
         print(f"✓ Created rolling features with windows: {window_sizes} seconds")
+        if group_column is not None:
+            print(f"  Computed per '{group_column}' ({frame[group_column].nunique()} groups)")
         
         return self.df
     
@@ -280,12 +462,11 @@ class EnhancedFeatureEngineer:
         Returns:
             DataFrame with frequency-domain features
         """
-        if timestamp_column and timestamp_column in self.df.columns:
-            if not pd.api.types.is_datetime64_any_dtype(self.df[timestamp_column]):
-                self.df[timestamp_column] = pd.to_datetime(self.df[timestamp_column], errors='coerce')
-            self.df = self.df.sort_values(timestamp_column).reset_index(drop=True)
+        if timestamp_column and self._has_column(timestamp_column):
+            self._ensure_datetime(timestamp_column)
+            self._sort_by_group_and_time(timestamp_column=timestamp_column)
         
-        available_sensors = [col for col in sensor_columns if col in self.df.columns]
+        available_sensors = [col for col in sensor_columns if self._has_column(col)]
         if len(available_sensors) == 0:
             print("Warning: No sensor columns found. Skipping FFT features.")
             return self.df
@@ -294,7 +475,7 @@ class EnhancedFeatureEngineer:
         
         for sensor_col in available_sensors:
             # Remove NaN values for FFT
-            sensor_data = self.df[sensor_col].ffill().bfill().values
+            sensor_data = self._column(sensor_col).ffill().bfill().values
             
             # Apply FFT
             if len(sensor_data) >= n_fft:
@@ -332,8 +513,10 @@ class EnhancedFeatureEngineer:
                 
                 # Pad with NaN for initial values
                 padding = [np.nan] * (n_fft - 1)
-                for key in fft_features[0].keys():
-                    self.df[f'{sensor_col}_fft_{key}'] = padding + [f[key] for f in fft_features]
+                self._set_columns({
+                    f'{sensor_col}_fft_{key}': padding + [f[key] for f in fft_features]
+                    for key in fft_features[0].keys()
+                })
             else:
                 # For short sequences, compute single FFT
                 fft_vals = np.abs(fft(sensor_data))
@@ -345,9 +528,11 @@ class EnhancedFeatureEngineer:
                 spectral_energy = np.sum(fft_vals[1:len(fft_vals)//2]**2)
                 
                 # Fill all rows with same values
-                self.df[f'{sensor_col}_fft_dominant_freq'] = dominant_freq
-                self.df[f'{sensor_col}_fft_dominant_magnitude'] = dominant_magnitude
-                self.df[f'{sensor_col}_fft_spectral_energy'] = spectral_energy
+                self._set_columns({
+                    f'{sensor_col}_fft_dominant_freq': dominant_freq,
+                    f'{sensor_col}_fft_dominant_magnitude': dominant_magnitude,
+                    f'{sensor_col}_fft_spectral_energy': spectral_energy,
+                })
         
         print(f"✓ Extracted frequency-domain features using FFT")
         
@@ -355,7 +540,8 @@ class EnhancedFeatureEngineer:
     
     # ==================== LAG FEATURES ====================
     
-    def create_lag_features(self, columns, lags=[1, 2, 3, 5, 10], timestamp_column=None):
+    def create_lag_features(self, columns, lags=[1, 2, 3, 5, 10], timestamp_column=None,
+                            group_column=None, n_jobs=1):
         """
         Create lag features for time-series prediction
         
@@ -363,39 +549,66 @@ class EnhancedFeatureEngineer:
             columns: List of column names to create lags for
             lags: List of lag periods (e.g., [1, 2, 3] for 1, 2, 3 time steps back)
             timestamp_column: Name of timestamp column for proper ordering
+            group_column: Optional entity column (e.g., 'vehicle_id', 'grid_zone');
+                          lags are taken within each group only
+            n_jobs: Number of parallel jobs across groups (1 = vectorized, no workers)
         
         Returns:
             DataFrame with lag features
         """
-        if timestamp_column and timestamp_column in self.df.columns:
-            if not pd.api.types.is_datetime64_any_dtype(self.df[timestamp_column]):
-                self.df[timestamp_column] = pd.to_datetime(self.df[timestamp_column], errors='coerce')
-            self.df = self.df.sort_values(timestamp_column).reset_index(drop=True)
+        if timestamp_column and self._has_column(timestamp_column):
+            self._ensure_datetime(timestamp_column)
+        else:
+            timestamp_column = None
         
-        available_cols = [col for col in columns if col in self.df.columns]
+        available_cols = [col for col in columns if self._has_column(col)]
         if len(available_cols) == 0:
             print("Warning: No columns found for lag features.")
             return self.df
         
+        group_column = self._resolve_group_column(group_column)
+        self._sort_by_group_and_time(group_column, timestamp_column)
+        
         print(f"Creating lag features for columns: {available_cols}")
         
-        for col in available_cols:
-            for lag in lags:
-                self.df[f'{col}_lag_{lag}'] = self.df[col].shift(lag)
-                
-                # Also create difference features (change from lag period)
-                if lag == 1:
-                    self.df[f'{col}_diff_1'] = self.df[col] - self.df[col].shift(1)
+        frame = self._frame(([group_column] if group_column is not None else []) + available_cols)
+        if group_column is not None and n_jobs != 1:
+            lag_df = _apply_per_group(frame, group_column, _lag_block, n_jobs,
+                                      columns=available_cols, lags=lags)
+        else:
+            lag_df = _lag_block(frame, available_cols, lags, group_column=group_column)
+        
+        self._set_columns(lag_df)
         
         print(f"✓ Created lag features with lags: {lags}")
+        if group_column is not None:
+            print(f"  Computed per '{group_column}' ({frame[group_column].nunique()} groups)")
         
         return self.df
     
+    def _resolve_group_column(self, group_column):
+        """Return group_column if present in the data, warning and returning None otherwise"""
+        if group_column is None:
+            return None
+        if not self._has_column(group_column):
+            print(f"Warning: Group column '{group_column}' not found. Computing over all rows.")
+            return None
+        return group_column
+    
+    def _sort_by_group_and_time(self, group_column=None, timestamp_column=None):
+        """Single stable sort by (group, time) so every group is a contiguous, ordered block"""
+        sort_keys = [col for col in (group_column, timestamp_column) if col is not None]
+        if sort_keys:
+            keys = self._frame(sort_keys)
+            keys.index = pd.RangeIndex(len(keys))
+            order = keys.sort_values(sort_keys, kind='mergesort').index.to_numpy()
+            self._take_rows(order)
+    
     # ==================== COMPREHENSIVE PIPELINE ====================
     
     def create_all_features(self, timestamp_column=None, lat_col=None, lon_col=None,
                            severity_col=None, sensor_columns=None, lag_columns=None,
-                           grid_size=0.01):
+                           grid_size=0.01, group_column=None, n_jobs=1, assemble_once=False):
         """
         Run complete feature engineering pipeline
         
@@ -407,6 +620,12 @@ class EnhancedFeatureEngineer:
             sensor_columns: List of sensor column names
             lag_columns: List of columns for lag features
             grid_size: Size of spatial grid cells
+            group_column: Entity column for per-group rolling/lag features
+                          (e.g., 'vehicle_id' or 'grid_zone')
+            n_jobs: Number of parallel jobs across groups
+            assemble_once: Collect new feature columns in a dict and build the
+                           output frame once at the end (lower peak memory on
+                           large inputs) instead of growing self.df per stage
         
         Returns:
             DataFrame with all engineered features
@@ -415,6 +634,8 @@ class EnhancedFeatureEngineer:
         print("ENHANCED FEATURE ENGINEERING PIPELINE")
         print("="*60)
         
+        self._deferred = assemble_once
+        
         # 1. Temporal features
         self.df = self.extract_temporal_features(timestamp_column)
         
@@ -425,7 +646,9 @@ class EnhancedFeatureEngineer:
         if sensor_columns:
             self.df = self.create_sensor_rolling_features(sensor_columns, 
                                                          window_sizes=[5, 10],
-                                                         timestamp_column=timestamp_column)
+                                                         timestamp_column=timestamp_column,
+                                                         group_column=group_column,
+                                                         n_jobs=n_jobs)
         
         # 4. Frequency-domain features
         if sensor_columns:
@@ -435,7 +658,12 @@ class EnhancedFeatureEngineer:
         # 5. Lag features
         if lag_columns:
             self.df = self.create_lag_features(lag_columns, lags=[1, 2, 3, 5, 10],
-                                             timestamp_column=timestamp_column)
+                                             timestamp_column=timestamp_column,
+                                             group_column=group_column,
+                                             n_jobs=n_jobs)
+        
+        if assemble_once:
+            self.df = self._assemble()
         
         print("\n" + "="*60)
         print(f"Feature engineering complete! Final shape: {self.df.shape}")
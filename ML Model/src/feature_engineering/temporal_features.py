@@ -0,0 +1,81 @@
+"""
+Temporal feature expansion keyed by unique timestamps.
+
+Dispatch and accident logs contain far fewer distinct hours than rows, so
+calendar features are computed once per unique truncated timestamp and then
+broadcast back to every row through integer codes. Columns are emitted in
+compact dtypes (int8/int16 for calendar parts and flags, float32 for
+cyclical encodings).
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+
+def expand_by_unique_timestamps(
+    timestamps: pd.Series,
+    build_features: Callable[[pd.DatetimeIndex], Dict[str, np.ndarray]],
+    resolution: str = "h",
+) -> pd.DataFrame:
+    """
+    Compute temporal features once per unique truncated timestamp.
+
+    Parameters
+    ----------
+    timestamps : pd.Series
+        Datetime series (NaT allowed).
+    build_features : Callable
+        Receives the unique truncated timestamps as a DatetimeIndex and returns
+        a mapping of column name to array. Boolean arrays are treated as 0/1
+        flags; integer and float arrays as calendar values.
+    resolution : str
+        Truncation frequency. Must be at least as fine as the finest feature
+        the builder derives (hourly features need ``"h"`` or finer).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per input row, aligned to ``timestamps.index``. Rows with NaT
+        get 0 for flags and NaN for calendar values (stored as float32).
+    """
+    truncated = timestamps.dt.floor(resolution)
+    codes, uniques = pd.factorize(truncated)
+    features = build_features(pd.DatetimeIndex(uniques))
+
+    missing = codes < 0
+    has_missing = bool(missing.any())
+    # Code -1 marks NaT; route it to a sentinel slot appended to each table.
+    lookup = np.where(missing, len(uniques), codes) if has_missing else codes
+
+    columns = {}
+    for name, values in features.items():
+        values = np.asarray(values)
+        if values.dtype == bool:
+            table = values.astype(np.int8)
+            sentinel = 0
+        elif values.dtype.kind in "iu" and not has_missing:
+            table = values
+            sentinel = None
+        else:
+            table = values.astype(np.float32)
+            sentinel = np.nan
+        if has_missing:
+            table = np.append(table, np.array([sentinel], dtype=table.dtype))
+        columns[name] = table.take(lookup)
+
+    return pd.DataFrame(columns, index=timestamps.index)
+
+
+def hour_in_range(hours: np.ndarray, start: int, end: int) -> np.ndarray:
+    """Boolean mask for ``start <= hour <= end``."""
+    return (hours >= start) & (hours <= end)
+
+
+def cyclical_encoding(values: np.ndarray, period: int) -> tuple:
+    """Return float32 (sin, cos) encodings of a periodic integer feature."""
+    angle = 2 * np.pi * values.astype(np.float32) / period
+    return np.sin(angle).astype(np.float32), np.cos(angle).astype(np.float32)
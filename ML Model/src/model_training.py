@@ -3,12 +3,23 @@ Model Training Module
 Handles Random Forest model training with hyperparameter tuning
 """
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
+from scipy.stats import pearsonr, spearmanr
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
 from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, cross_val_score, train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+from src.model_training.successive_halving import SuccessiveHalvingSearch
+from src.model_training.checkpoint_search import CheckpointSearchCV
+from src.model_training.feature_shards import (
+    predict_shards, scan_shards, shard_columns, train_booster_from_shards
+)
+from src.model_training.trial_store import TrialStore
 import joblib
 import warnings
 warnings.filterwarnings('ignore')
@@ -17,16 +28,21 @@ warnings.filterwarnings('ignore')
 class ModelTrainer:
     """Class for training and tuning Random Forest model"""
     
-    def __init__(self, X, y):
+    def __init__(self, X, y, trial_store=None):
         """
         Initialize the ModelTrainer
         
         Args:
             X: Feature matrix
             y: Target vector
+            trial_store: Optional TrialStore (or path to its SQLite file). Tuning
+                         reuses stored trials and records new ones
         """
         self.X = X
         self.y = y
+        if isinstance(trial_store, str):
+            trial_store = TrialStore(trial_store)
+        self.trial_store = trial_store
         self.X_train = None
         self.X_test = None
         self.y_train = None
@@ -35,6 +51,9 @@ class ModelTrainer:
         self.best_model = None
         self.best_params = None
         self.feature_importance = None
+        self.subsample_report = None
+        self.refit_seconds = None
+        self._refit_future = None
         
     def split_data(self, test_size=0.2, random_state=42):
         """
@@ -90,14 +109,67 @@ class ModelTrainer:
         print(f"\nBaseline XGBoost model trained. Test accuracy: {accuracy:.4f}")
         
         return self.model
+
+    def train_xgboost_from_shards(self, shard_paths, label_col, validation_paths=None,
+                                  feature_cols=None, cache_dir=None, quantile=False):
+        """
+        Train the baseline XGBoost model on on-disk feature shards
+        
+        Features, labels and the evaluation rows all come from the shards,
+        which are read one at a time through an external-memory DMatrix (or a
+        QuantileDMatrix with quantile=True), so no feature matrix is ever held
+        in memory and load_data/split_data are not needed. Labels in label_col
+        must be integer-encoded.
+        
+        Args:
+            shard_paths: Parquet/CSV shards with training rows
+            label_col: Target column in the shards
+            validation_paths: Optional shards to monitor during training and
+                              report accuracy on
+            feature_cols: Feature columns (default: every shard column except label_col)
+            cache_dir: Directory for the external-memory page cache
+            quantile: Build a QuantileDMatrix instead of an external-memory DMatrix
+        """
+        if feature_cols is None:
+            feature_cols = [c for c in shard_columns(shard_paths[0]) if c != label_col]
+        feature_cols = list(feature_cols)
+        _, counts = scan_shards(shard_paths, feature_cols, label_col, fit_scaler=False)
+        n_classes = max(len(counts), max(counts) + 1)
+        
+        self.model = train_booster_from_shards(
+            shard_paths,
+            feature_cols,
+            {'n_estimators': 100, 'random_state': 42, 'n_jobs': -1,
+             'eval_metric': 'mlogloss' if n_classes > 2 else 'logloss'},
+            n_classes=n_classes,
+            label_col=label_col,
+            validation_paths=validation_paths,
+            cache_dir=cache_dir,
+            quantile=quantile
+        )
+        
+        print(f"\nXGBoost model trained on {sum(counts.values())} shard rows.")
+        if validation_paths:
+            y_val, proba = predict_shards(self.model, validation_paths, feature_cols, label_col)
+            accuracy = accuracy_score(y_val, self.model.classes_[np.argmax(proba, axis=1)])
+            print(f"Validation accuracy on {len(y_val)} shard rows: {accuracy:.4f}")
+        
+        return self.model
     
-    def hyperparameter_tuning(self, cv=5, n_jobs=-1):
+    def hyperparameter_tuning(self, cv=5, n_jobs=-1, method='grid', resource='n_estimators',
+                              factor=3, max_fits=None, time_budget=None):
         """
-        Perform hyperparameter tuning using GridSearchCV
+        Perform hyperparameter tuning using grid search or successive halving
         
         Args:
             cv: Number of cross-validation folds
             n_jobs: Number of parallel jobs
+            method: 'grid' (CheckpointSearchCV, warm-started n_estimators) or
+                    'halving' (SuccessiveHalvingSearch)
+            resource: For 'halving', 'n_estimators' or 'n_samples'
+            factor: For 'halving', elimination rate per iteration
+            max_fits: For 'halving', budget on the total number of fits
+            time_budget: For 'halving', budget on wall time in seconds
         """
         print("\n=== Starting Hyperparameter Tuning ===")
         
@@ -113,40 +185,244 @@ class ModelTrainer:
         # Initialize base model
         rf = RandomForestClassifier(random_state=42, n_jobs=-1)
         
-        # Perform grid search
-        grid_search = GridSearchCV(
-            estimator=rf,
-            param_grid=param_grid,
+        if method == 'halving':
+            search = SuccessiveHalvingSearch(
+                estimator=rf,
+                param_grid=param_grid,
+                scoring='f1_macro',
+                cv=cv,
+                resource=resource,
+                factor=factor,
+                max_fits=max_fits,
+                time_budget=time_budget,
+                n_jobs=n_jobs,
+                random_state=42,
+                verbose=1,
+                store=self.trial_store
+            )
+            print("Fitting SuccessiveHalvingSearch...")
+        elif method == 'grid':
+            # Each forest is grown once per fold and scored at every n_estimators value
+            search = CheckpointSearchCV(
+                estimator=rf,
+                param_grid=param_grid,
+                scoring='f1_macro',
+                cv=cv,
+                checkpoint_param='n_estimators',
+                n_jobs=n_jobs,
+                random_state=42,
+                verbose=1,
+                store=self.trial_store
+            )
+            print("Fitting CheckpointSearchCV...")
+        else:
+            raise ValueError(f"Unknown tuning method '{method}'. Use 'grid' or 'halving'.")
+        
+        search.fit(self.X_train, self.y_train)
+        
+        self.best_model = search.best_estimator_
+        self.best_params = search.best_params_
+        
+        print(f"\n=== Hyperparameter Tuning Complete ===")
+        print(f"Best parameters: {self.best_params}")
+        print(f"Best cross-validation score: {search.best_score_:.4f}")
+        
+        return self.best_model, self.best_params
+    
+    def _tuning_rows(self, estimator, param_dist, n_iter, cv, time_budget=None, max_rows='auto',
+                     probe_rows=2000, min_rows=1000, auto_min_rows=50000):
+        """
+        Number of training rows to tune on
+        
+        With a time_budget, one fit of the base estimator on probe_rows rows is
+        timed and the subsample is sized so that n_iter * cv fits of the largest
+        n_estimators in param_dist fit in the budget (fit time is assumed to grow
+        linearly with rows). The result is capped at max_rows and never exceeds
+        the training set, so small data is tuned on in full.
+        
+        max_rows='auto' leaves the size to the budget when there is one and
+        otherwise grows the cap with the square root of the training set
+        (100 * sqrt(n), at least auto_min_rows): 50,000 rows up to 250,000
+        training rows, 100,000 for 1M and about 316,000 for 10M.
+        
+        Returns:
+            (rows, probe) where probe holds the probe timing (or None)
+        """
+        n_train = len(self.X_train)
+        if max_rows == 'auto':
+            # The budget sizes the subsample itself; otherwise grow the cap sublinearly
+            max_rows = (None if time_budget is not None
+                        else max(auto_min_rows, int(100 * np.sqrt(n_train))))
+        rows = n_train if max_rows is None else min(max_rows, n_train)
+        probe = None
+        
+        if time_budget is not None:
+            probe_X, probe_y = self._subsample(min(probe_rows, n_train), random_state=0)
+            start = time.perf_counter()
+            clone(estimator).fit(probe_X, probe_y)
+            probe_seconds = max(time.perf_counter() - start, 1e-3)
+            
+            # Checkpoint searches grow every candidate to its largest n_estimators
+            base_estimators = estimator.get_params().get('n_estimators') or 100
+            scale = max(param_dist.get('n_estimators', [base_estimators])) / base_estimators
+            seconds_per_row = probe_seconds * scale / len(probe_X)
+            budget_rows = int(time_budget / (n_iter * cv * seconds_per_row))
+            rows = min(rows, max(budget_rows, min(min_rows, n_train)))
+            probe = {'rows': len(probe_X), 'seconds': probe_seconds,
+                     'estimated_search_seconds': seconds_per_row * rows * n_iter * cv}
+        
+        return rows, probe
+    
+    def _subsample(self, rows, random_state=42):
+        """Stratified subsample of rows training rows (the full training set if rows covers it)"""
+        if rows >= len(self.X_train):
+            return self.X_train, self.y_train
+        try:
+            X_sub, _, y_sub, _ = train_test_split(self.X_train, self.y_train, train_size=rows,
+                                                  random_state=random_state, stratify=self.y_train)
+        except ValueError:
+            # Classes too rare to stratify at this size
+            X_sub, _, y_sub, _ = train_test_split(self.X_train, self.y_train, train_size=rows,
+                                                  random_state=random_state)
+        return X_sub, y_sub
+    
+    def _fit_full(self, estimator, params):
+        """Fit estimator with params on the full training set"""
+        start = time.perf_counter()
+        model = clone(estimator).set_params(**params).fit(self.X_train, self.y_train)
+        self.refit_seconds = time.perf_counter() - start
+        print(f"Refit on all {len(self.X_train)} training rows finished in {self.refit_seconds:.1f}s")
+        return model
+    
+    def wait_for_refit(self):
+        """
+        Wait for a background full-data refit and make it the best model
+        
+        Returns:
+            The best model (unchanged if no refit is pending)
+        """
+        if self._refit_future is not None:
+            self.best_model = self._refit_future.result()
+            self._refit_future = None
+        return self.best_model
+    
+    def _subsample_correlation(self, search, estimator, cv, n_configs):
+        """
+        Re-score n_configs searched configurations on the full training set
+        
+        Configurations are spread evenly over the subsample ranking so the
+        correlation covers good and bad configurations alike.
+        """
+        results = pd.DataFrame(search.cv_results_).sort_values('mean_test_score', ascending=False)
+        picks = np.unique(np.linspace(0, len(results) - 1, min(n_configs, len(results))).round().astype(int))
+        chosen = results.iloc[picks]
+        
+        full_scores = [
+            cross_val_score(clone(estimator).set_params(**params), self.X_train, self.y_train,
+                            cv=cv, scoring='f1_macro').mean()
+            for params in chosen['params']
+        ]
+        sub_scores = chosen['mean_test_score'].to_numpy()
+        
+        report = {'params': list(chosen['params']), 'subsample_scores': sub_scores,
+                  'full_scores': np.asarray(full_scores), 'spearman': np.nan, 'pearson': np.nan}
+        if len(chosen) > 2:
+            report['spearman'] = spearmanr(sub_scores, full_scores).correlation
+            report['pearson'] = pearsonr(sub_scores, full_scores)[0]
+        
+        print(f"\nSubsample vs full-data CV score ({len(chosen)} configurations):")
+        for sub, full in zip(sub_scores, full_scores):
+            print(f"  subsample {sub:.4f}  full {full:.4f}")
+        print(f"Spearman: {report['spearman']:.3f}  Pearson: {report['pearson']:.3f}")
+        return report
+    
+    def _tune_on_subsample(self, estimator, param_dist, n_iter, cv, n_jobs, max_rows,
+                           time_budget, background_refit, correlation_configs):
+        """
+        Randomized search on a data-size-aware subsample, then refit on all training rows
+        
+        See randomized_hyperparameter_tuning for the arguments.
+        """
+        rows, probe = self._tuning_rows(estimator, param_dist, n_iter, cv, time_budget, max_rows)
+        X_sub, y_sub = self._subsample(rows)
+        subsampled = len(X_sub) < len(self.X_train)
+        print(f"Tuning on {len(X_sub)} of {len(self.X_train)} training rows")
+        if probe is not None:
+            print(f"Probe fit on {probe['rows']} rows took {probe['seconds']:.2f}s; "
+                  f"estimated search time {probe['estimated_search_seconds']:.0f}s")
+        
+        # Perform random search, growing each sampled model once per fold. In
+        # background mode the winner is also fit on the subsample so evaluation
+        # has a model to work with until the full refit is done.
+        rand_search = CheckpointSearchCV(
+            estimator=estimator,
+            param_grid=param_dist,
+            n_iter=n_iter,
             cv=cv,
             scoring='f1_macro',
+            checkpoint_param='n_estimators',
             n_jobs=n_jobs,
-            verbose=1
+            verbose=2,
+            random_state=42,
+            refit=not subsampled or background_refit,
+            store=self.trial_store
         )
         
-        print("Fitting GridSearchCV...")
-        grid_search.fit(self.X_train, self.y_train)
-        
-        self.best_model = grid_search.best_estimator_
-        self.best_params = grid_search.best_params_
-        
-        print(f"\n=== Hyperparameter Tuning Complete ===")
-        print(f"Best parameters: {self.best_params}")
-        print(f"Best cross-validation score: {grid_search.best_score_:.4f}")
+        print("Fitting randomized CheckpointSearchCV...")
+        rand_search.fit(X_sub, y_sub)
+        self.best_params = rand_search.best_params_
         
-        return self.best_model, self.best_params
+        self.wait_for_refit()
+        if not subsampled:
+            self.best_model = rand_search.best_estimator_
+        elif background_refit:
+            self.best_model = rand_search.best_estimator_
+            executor = ThreadPoolExecutor(max_workers=1)
+            self._refit_future = executor.submit(self._fit_full, estimator, self.best_params)
+            executor.shutdown(wait=False)
+            print("Refitting best parameters on the full training set in the background "
+                  "(call wait_for_refit() for the full-data model)")
+        else:
+            self.best_model = self._fit_full(estimator, self.best_params)
+        
+        self.subsample_report = {'rows': len(X_sub), 'total_rows': len(self.X_train),
+                                 'probe': probe, 'best_subsample_score': rand_search.best_score_}
+        if subsampled and correlation_configs:
+            self.subsample_report.update(
+                self._subsample_correlation(rand_search, estimator, cv, correlation_configs))
+        
+        return rand_search
     
-    def randomized_hyperparameter_tuning(self, n_iter=30, cv=3, n_jobs=-1):
+    def randomized_hyperparameter_tuning(self, n_iter=30, cv=3, n_jobs=-1, max_rows='auto',
+                                         time_budget=None, background_refit=False,
+                                         correlation_configs=0):
         """
-        Perform hyperparameter tuning using RandomizedSearchCV for Random Forest
+        Perform randomized hyperparameter search for Random Forest
+        
+        The search runs on a stratified subsample of the training set and the
+        winning configuration is then refit on all training rows.
+        
+        Args:
+            n_iter: Number of sampled configurations
+            cv: Number of cross-validation folds
+            n_jobs: Number of parallel jobs
+            max_rows: Largest subsample to tune on (None for no cap). 'auto' sizes
+                      it from time_budget if given, else from the training set
+                      size (see _tuning_rows)
+            time_budget: Optional search budget in seconds; sizes the subsample
+                         from a timed probe fit
+            background_refit: Refit on the full training set in a background
+                              thread; best_model is the subsample fit until
+                              wait_for_refit() is called
+            correlation_configs: Number of searched configurations to re-score
+                                 with CV on the full training set, reporting how
+                                 subsample scores correlate with full-data scores
         """
         print("\n=== Starting Randomized Hyperparameter Tuning (Random Forest) ===")
         
         # Initialize base model
         rf = RandomForestClassifier(random_state=42, n_jobs=-1)
         
-        # Take a small random subset for tuning
-        X_sub, _, y_sub, _ = train_test_split(self.X_train, self.y_train, train_size=50000, random_state=42, stratify=self.y_train)
-        
         # Define parameter distribution
         param_dist = {
             'n_estimators': [100, 200, 300],
@@ -156,23 +432,8 @@ class ModelTrainer:
             'max_features': ['sqrt', 'log2', None]
         }
         
-        # Perform random search
-        rand_search = RandomizedSearchCV(
-            estimator=rf,
-            param_distributions=param_dist,
-            n_iter=n_iter,
-            cv=cv,
-            scoring='f1_macro',
-            n_jobs=n_jobs,
-            verbose=2,
-            random_state=42
-        )
-        
-        print("Fitting RandomizedSearchCV...")
-        rand_search.fit(X_sub, y_sub)
-        
-        self.best_model = rand_search.best_estimator_
-        self.best_params = rand_search.best_params_
+        rand_search = self._tune_on_subsample(rf, param_dist, n_iter, cv, n_jobs, max_rows,
+                                              time_budget, background_refit, correlation_configs)
         
         print(f"\n=== Randomized Hyperparameter Tuning Complete ===")
         print(f"Best parameters: {self.best_params}")
@@ -180,18 +441,20 @@ class ModelTrainer:
         
         return self.best_model, self.best_params
 
-    def randomized_hyperparameter_tuning_xgboost(self, n_iter=30, cv=3, n_jobs=-1):
+    def randomized_hyperparameter_tuning_xgboost(self, n_iter=30, cv=3, n_jobs=-1, max_rows='auto',
+                                                 time_budget=None, background_refit=False,
+                                                 correlation_configs=0):
         """
-        Perform hyperparameter tuning using RandomizedSearchCV for XGBoost
+        Perform randomized hyperparameter search for XGBoost
+        
+        Tunes on a subsample and refits on all training rows; the arguments
+        are those of randomized_hyperparameter_tuning.
         """
         print("\n=== Starting Randomized Hyperparameter Tuning (XGBoost) ===")
         
         # Initialize base model
         xgb = XGBClassifier(random_state=42, n_jobs=-1, eval_metric='logloss')
         
-        # Take a small random subset for tuning
-        X_sub, _, y_sub, _ = train_test_split(self.X_train, self.y_train, train_size=50000, random_state=42, stratify=self.y_train)
-        
         # Define parameter distribution
         param_dist = {
             'n_estimators': [100, 200, 300],
@@ -202,23 +465,8 @@ class ModelTrainer:
             'gamma': [0, 0.1, 0.2]
         }
         
-        # Perform random search
-        rand_search = RandomizedSearchCV(
-            estimator=xgb,
-            param_distributions=param_dist,
-            n_iter=n_iter,
-            cv=cv,
-            scoring='f1_macro',
-            n_jobs=n_jobs,
-            verbose=2,
-            random_state=42
-        )
-        
-        print("Fitting RandomizedSearchCV (XGBoost)...")
-        rand_search.fit(X_sub, y_sub)
-        
-        self.best_model = rand_search.best_estimator_
-        self.best_params = rand_search.best_params_
+        rand_search = self._tune_on_subsample(xgb, param_dist, n_iter, cv, n_jobs, max_rows,
+                                              time_budget, background_refit, correlation_configs)
         
         print(f"\n=== Randomized Hyperparameter Tuning Complete (XGBoost) ===")
         print(f"Best parameters: {self.best_params}")
@@ -310,6 +558,8 @@ class ModelTrainer:
         import os
         os.makedirs(os.path.dirname(filepath) if os.path.dirname(filepath) else '.', exist_ok=True)
         
+        # Save the full-data refit, not the subsample model it replaces
+        self.wait_for_refit()
         model_to_save = self.best_model if self.best_model is not None else self.model
         
         if model_to_save is None:
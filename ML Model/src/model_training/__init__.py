@@ -4,6 +4,13 @@ Model training and tuning modules
 
 from .enhanced_model_tuning import EnhancedModelTuner
 from .accelerometer_accident_detector import AccelerometerAccidentDetector
+from .successive_halving import SuccessiveHalvingSearch
+from .checkpoint_search import CheckpointSearchCV
+from .feature_shards import BoosterClassifier, FeatureShardIter
+from .trial_store import TrialStore
+from .tpe_search import TPESearchCV
 
-__all__ = ['EnhancedModelTuner', 'AccelerometerAccidentDetector']
+__all__ = ['EnhancedModelTuner', 'AccelerometerAccidentDetector', 'SuccessiveHalvingSearch',
+           'CheckpointSearchCV', 'BoosterClassifier', 'FeatureShardIter', 'TrialStore',
+           'TPESearchCV']
 
@@ -4,34 +4,66 @@ Training utilities for the real-time accelerometer accident detector.
 The pipeline:
 1. Windows raw accelerometer streams via `AccelerometerFeatureEngineer`.
 2. Extracts statistical, derived, and spectral features.
-3. Fits an XGBoost classifier tuned for high recall without sacrificing precision.
+3. Fits an XGBoost classifier tuned for high recall without sacrificing precision,
+   optionally early-stopped on a vehicle-grouped validation split.
 4. Provides evaluation summaries, threshold optimisation, and export helpers.
 """
 
 from __future__ import annotations
 
 import json
+import os
+import warnings
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import joblib
 import numpy as np
+from joblib import Parallel, delayed
 import pandas as pd
-from sklearn.metrics import (
-    classification_report,
-    confusion_matrix,
-    precision_recall_curve,
-    roc_auc_score,
+import xgboost as xgb
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import (
+    GroupShuffleSplit,
+    StratifiedGroupKFold,
+    StratifiedKFold,
+    TimeSeriesSplit,
+    train_test_split,
 )
-from sklearn.model_selection import StratifiedKFold, train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from xgboost import XGBClassifier
 
+from src.evaluation.bootstrap import bootstrap_metrics
+from src.evaluation.metric_engine import (
+    best_f1_threshold,
+    binary_curve,
+    confusion_counts,
+    metrics_from_confusion,
+    precision_recall_from_curve,
+    roc_auc_from_curve,
+)
 from src.feature_engineering.accelerometer_feature_engineer import (
     AccelerometerFeatureEngineer,
 )
+from src.model_training.feature_shards import (
+    BoosterClassifier,
+    native_params,
+    predict_shards,
+    scan_shards,
+    shard_columns,
+    train_booster_from_shards,
+)
+
+# Window columns produced by the feature engineer that are not model inputs
+NON_FEATURE_COLS = {
+    "label",
+    "vehicle_id",
+    "window_index",
+    "window_start_ts",
+    "window_end_ts",
+}
 
 
 @dataclass
@@ -42,6 +74,7 @@ class TrainingArtifacts:
     feature_columns: list
     metrics: Dict[str, float]
     threshold: float
+    best_iteration: Optional[int] = None
 
 
 class AccelerometerAccidentDetector:
@@ -60,8 +93,32 @@ class AccelerometerAccidentDetector:
         Overrides for XGBoost hyperparameters.
     target_recall : float
         Minimum recall to prioritise when selecting thresholds.
+    early_stopping_rounds : Optional[int]
+        Stop boosting when the last ``eval_metric`` has not improved on the
+        validation split for this many rounds. ``None`` trains all
+        ``n_estimators`` trees.
+    validation_size : float
+        Share of the training windows held out (grouped by vehicle) for early
+        stopping.
+    scale_features : bool
+        Wrap the model in a StandardScaler pipeline. Tree splits do not depend
+        on feature scale, so ``False`` gives a scaler-free tree pipeline that
+        skips a full-matrix copy at training and at every inference call, and
+        trains from a QuantileDMatrix sketched on the training rows (per fold
+        in ``cross_validate``) and reused for the early-stopping split.
+    bootstrap_replicates : int
+        When positive, ``fit`` and ``fit_shards`` add bootstrap confidence
+        intervals of the test metrics (precision, recall, F1, ROC-AUC and the
+        F1-optimal threshold) under ``metrics["confidence_intervals"]``.
     random_state : int
         Random seed for reproducibility.
+
+    Split strategies (``fit`` and ``cross_validate``)
+    -------------------------------------------------
+    ``"group"`` (default) keeps every window of a vehicle (or event) on one
+    side of the split, so overlapping windows cannot leak into the test set.
+    ``"time"`` tests on the latest windows and drops training windows that
+    overlap the cut-off. ``"stratified"`` is the previous row-level split.
     """
 
     def __init__(
@@ -72,6 +129,10 @@ class AccelerometerAccidentDetector:
         label_col: str = "accident",
         model_params: Optional[Dict] = None,
         target_recall: float = 0.9,
+        early_stopping_rounds: Optional[int] = None,
+        validation_size: float = 0.15,
+        scale_features: bool = True,
+        bootstrap_replicates: int = 0,
         random_state: int = 42,
     ) -> None:
         self.feature_engineer = AccelerometerFeatureEngineer(
@@ -83,6 +144,10 @@ class AccelerometerAccidentDetector:
         self.random_state = random_state
         self.target_recall = target_recall
         self.label_col = label_col
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_size = validation_size
+        self.scale_features = scale_features
+        self.bootstrap_replicates = bootstrap_replicates
         self.model_params = model_params or {
             "n_estimators": 600,
             "learning_rate": 0.05,
@@ -110,8 +175,17 @@ class AccelerometerAccidentDetector:
         severity_col: Optional[str] = "event_severity",
         metadata_cols=None,
         test_size: float = 0.2,
+        split_strategy: str = "group",
+        group_col: str = "vehicle_id",
     ) -> TrainingArtifacts:
-        """Train the detector and persist artifacts in memory."""
+        """
+        Train the detector and persist artifacts in memory.
+
+        ``split_strategy`` picks the hold-out split used for metrics and
+        threshold selection: ``"group"`` by ``group_col`` of the engineered
+        windows (``vehicle_id``, or e.g. ``event_id_last`` when ``event_id`` is
+        passed in ``metadata_cols``), ``"time"`` or ``"stratified"``.
+        """
 
         features_df = self.feature_engineer.transform(
             df=df,
@@ -123,82 +197,332 @@ class AccelerometerAccidentDetector:
         )
         self.last_features_ = features_df.copy()
 
-        non_feature_cols = {
-            "label",
-            "vehicle_id",
-            "window_index",
-            "window_start_ts",
-            "window_end_ts",
-        }
-        feature_cols = [col for col in features_df.columns if col not in non_feature_cols]
+        feature_cols = [
+            col
+            for col in features_df.columns
+            if col not in NON_FEATURE_COLS and col != group_col
+        ]
 
         X = features_df[feature_cols].values
         y = features_df["label"].values
+        groups = features_df[group_col].values if group_col in features_df else None
 
-        X_train, X_test, y_train, y_test = train_test_split(
-            X,
-            y,
-            test_size=test_size,
-            stratify=y,
-            random_state=self.random_state,
-        )
-
-        model_params = self._apply_class_weight(y_train)
-        pipe = Pipeline(
-            steps=[
-                ("scaler", StandardScaler()),
-                ("model", XGBClassifier(**model_params)),
-            ]
+        train_idx, test_idx = self._holdout_split(
+            features_df, y, groups, test_size, split_strategy
         )
-        pipe.fit(X_train, y_train)
+        X_train, X_test = X[train_idx], X[test_idx]
+        y_train, y_test = y[train_idx], y[test_idx]
+        groups_train = groups[train_idx] if groups is not None else None
+
+        if self.scale_features:
+            scaler = StandardScaler().fit(X_train)
+            model = self._fit_model(scaler.transform(X_train), y_train, groups_train)
+            pipe = Pipeline(steps=[("scaler", scaler), ("model", model)])
+        else:
+            model = self._fit_model(X_train, y_train, groups_train)
+            pipe = Pipeline(steps=[("model", model)])
 
         y_pred = pipe.predict(X_test)
         y_proba = pipe.predict_proba(X_test)[:, 1]
 
-        metrics = self._collect_metrics(y_test, y_pred, y_proba)
-        threshold_info = self._optimise_threshold(y_test, y_proba)
+        # One sort of the scores serves ROC-AUC and the threshold search
+        curve = binary_curve(y_test, y_proba)
+        metrics = self._collect_metrics(y_test, y_pred, curve)
+        threshold_info = self._optimise_threshold(curve)
         metrics.update(threshold_info)
+        if self.bootstrap_replicates:
+            metrics["confidence_intervals"] = self.confidence_intervals(y_test, y_pred, y_proba)
+        metrics["split_strategy"] = split_strategy
+        metrics["n_train_windows"] = int(len(train_idx))
+        metrics["n_test_windows"] = int(len(test_idx))
+        best_iteration = self._best_iteration(model)
+        if best_iteration is not None:
+            metrics["best_iteration"] = best_iteration
+            metrics["n_trees"] = best_iteration + 1
 
         self.artifacts = TrainingArtifacts(
             pipeline=pipe,
             feature_columns=feature_cols,
             metrics=metrics,
             threshold=threshold_info["optimal_threshold"],
+            best_iteration=best_iteration,
         )
         return self.artifacts
 
     # ------------------------------------------------------------------ #
-    # Evaluation + CV
+    # Out-of-core fitting on feature shards
     # ------------------------------------------------------------------ #
-    def cross_validate(
-        self, X: np.ndarray, y: np.ndarray, n_splits: int = 5
-    ) -> Dict[str, float]:
-        """Perform stratified cross-validation on already engineered features."""
+    def write_feature_shards(
+        self,
+        frames: Iterable[pd.DataFrame],
+        out_dir: str | Path,
+        sensor_cols=None,
+        timestamp_col: str = "timestamp",
+        vehicle_id_col: str = "vehicle_id",
+        severity_col: Optional[str] = "event_severity",
+        metadata_cols=None,
+    ) -> List[Path]:
+        """
+        Engineer window features for each raw frame and write one Parquet shard per frame.
+
+        Frames should not split a vehicle's stream mid-window (e.g. one file
+        per vehicle per day). Only one frame is held in memory at a time.
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for index, frame in enumerate(frames):
+            features_df = self.feature_engineer.transform(
+                df=frame,
+                sensor_cols=sensor_cols or ("accel_x", "accel_y", "accel_z"),
+                timestamp_col=timestamp_col,
+                vehicle_id_col=vehicle_id_col,
+                severity_col=severity_col,
+                metadata_cols=metadata_cols,
+            )
+            path = out_dir / f"features_{index:05d}.parquet"
+            features_df.to_parquet(path, index=False)
+            paths.append(path)
+        return paths
+
+    def fit_shards(
+        self,
+        train_paths: Sequence[str | Path],
+        test_paths: Sequence[str | Path],
+        validation_paths: Optional[Sequence[str | Path]] = None,
+        feature_cols: Optional[Sequence[str]] = None,
+        scale: Optional[bool] = None,
+        cache_dir: Optional[str | Path] = None,
+        quantile: bool = False,
+    ) -> TrainingArtifacts:
+        """
+        Train on on-disk feature shards with bounded memory.
+
+        Shards are assigned to train/validation/test by the caller; split
+        them by vehicle or by time so overlapping windows stay on one side.
+        A first pass fits the scaler with ``partial_fit`` and counts labels
+        for ``scale_pos_weight`` (``scale`` defaults to ``scale_features``). XGBoost then reads the shards through an
+        external-memory DMatrix cached in ``cache_dir`` (or a QuantileDMatrix
+        with ``quantile=True``). Test metrics are computed shard by shard.
+        ``validation_paths`` are used for early stopping when
+        ``early_stopping_rounds`` is set.
+        """
+        if feature_cols is None:
+            feature_cols = [
+                col for col in shard_columns(train_paths[0]) if col not in NON_FEATURE_COLS
+            ]
+        feature_cols = list(feature_cols)
+
+        if scale is None:
+            scale = self.scale_features
+        scaler, counts = scan_shards(train_paths, feature_cols, fit_scaler=scale)
+        params = self._class_weight_params(counts.get(1, 0), sum(counts.values()))
+        if self.early_stopping_rounds is not None:
+            params["early_stopping_rounds"] = self.early_stopping_rounds
+
+        model = train_booster_from_shards(
+            train_paths,
+            feature_cols,
+            params,
+            scaler=scaler,
+            validation_paths=validation_paths,
+            cache_dir=cache_dir,
+            quantile=quantile,
+        )
+        steps = [("scaler", scaler)] if scaler is not None else []
+        pipe = Pipeline(steps=steps + [("model", model)])
 
-        skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=self.random_state)
-        auc_scores: list = []
-        recall_scores: list = []
+        y_test, proba = predict_shards(pipe, test_paths, feature_cols)
+        y_proba = proba[:, 1]
+        y_pred = (y_proba >= 0.5).astype(int)
 
-        for train_idx, val_idx in skf.split(X, y):
-            X_train, X_val = X[train_idx], X[val_idx]
-            y_train, y_val = y[train_idx], y[val_idx]
+        # One sort of the scores serves ROC-AUC and the threshold search
+        curve = binary_curve(y_test, y_proba)
+        metrics = self._collect_metrics(y_test, y_pred, curve)
+        threshold_info = self._optimise_threshold(curve)
+        metrics.update(threshold_info)
+        if self.bootstrap_replicates:
+            metrics["confidence_intervals"] = self.confidence_intervals(y_test, y_pred, y_proba)
+        metrics["n_train_windows"] = int(sum(counts.values()))
+        metrics["n_test_windows"] = int(len(y_test))
+        best_iteration = self._best_iteration(model)
+        if best_iteration is not None:
+            metrics["best_iteration"] = best_iteration
+            metrics["n_trees"] = best_iteration + 1
 
-            params = self._apply_class_weight(y_train)
-            model = XGBClassifier(**params)
-            model.fit(X_train, y_train)
-            y_proba = model.predict_proba(X_val)[:, 1]
-            y_pred = (y_proba >= 0.5).astype(int)
+        self.artifacts = TrainingArtifacts(
+            pipeline=pipe,
+            feature_columns=feature_cols,
+            metrics=metrics,
+            threshold=threshold_info["optimal_threshold"],
+            best_iteration=best_iteration,
+        )
+        return self.artifacts
 
-            auc_scores.append(roc_auc_score(y_val, y_proba))
-            true_positives = np.sum((y_pred == 1) & (y_val == 1))
-            recall_scores.append(true_positives / max(1, np.sum(y_val == 1)))
+    # ------------------------------------------------------------------ #
+    # Evaluation + CV
+    # ------------------------------------------------------------------ #
+    def cross_validate(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        n_splits: int = 5,
+        groups: Optional[np.ndarray] = None,
+        n_jobs: int = 1,
+        threads_per_fold: Optional[int] = None,
+        split_strategy: str = "group",
+        times: Optional[np.ndarray] = None,
+        end_times: Optional[np.ndarray] = None,
+    ) -> Dict[str, float]:
+        """
+        Perform cross-validation on already engineered features.
+
+        ``split_strategy="group"`` (default) uses StratifiedGroupKFold over
+        ``groups`` (e.g. the ``vehicle_id`` column of the windows); without
+        ``groups`` it falls back to StratifiedKFold with a warning.
+        ``"time"`` uses TimeSeriesSplit over windows ordered by ``times``
+        (e.g. ``window_start_ts``) and drops training windows whose
+        ``end_times`` (e.g. ``window_end_ts``) reach the start of the
+        validation fold. ``"stratified"`` is a plain StratifiedKFold.
+
+        With early stopping, each fold holds out part of its training windows
+        (grouped by ``groups`` when given) to pick the number of trees.
+
+        ``n_jobs`` folds run concurrently (-1 = one per fold, up to the core
+        count) and each fold's XGBoost uses ``threads_per_fold`` threads
+        (default: cores // concurrent folds). Fold splits and seeds do not
+        depend on scheduling, so for a given ``threads_per_fold`` the scores
+        equal the serial (``n_jobs=1``) run.
+        """
+
+        folds = self._cv_folds(X, y, n_splits, groups, split_strategy, times, end_times)
+        n_cores = os.cpu_count() or 1
+        n_parallel = min(n_splits, n_cores if n_jobs in (None, -1) else max(1, n_jobs))
+        if threads_per_fold is None:
+            threads_per_fold = max(1, n_cores // n_parallel)
+
+        # XGBoost releases the GIL while training, so threads avoid copying X per fold
+        fold_results = Parallel(n_jobs=n_parallel, prefer="threads")(
+            delayed(self._score_fold)(
+                X, y, train_idx, val_idx,
+                groups[train_idx] if groups is not None else None,
+                threads_per_fold,
+            )
+            for train_idx, val_idx in folds
+        )
+        auc_scores = [fold["auc"] for fold in fold_results]
+        recall_scores = [fold["recall"] for fold in fold_results]
+        best_iterations = [
+            fold["best_iteration"] for fold in fold_results if fold["best_iteration"] is not None
+        ]
 
-        return {
+        results = {
             "cv_auc_mean": float(np.mean(auc_scores)),
             "cv_auc_std": float(np.std(auc_scores)),
             "cv_recall_mean": float(np.mean(recall_scores)),
             "cv_recall_std": float(np.std(recall_scores)),
         }
+        if best_iterations:
+            results["cv_best_iteration_mean"] = float(np.mean(best_iterations))
+        return results
+
+    def _cv_folds(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        n_splits: int,
+        groups: Optional[np.ndarray],
+        split_strategy: str,
+        times: Optional[np.ndarray],
+        end_times: Optional[np.ndarray],
+    ) -> list:
+        """(train_idx, val_idx) pairs for the requested split strategy."""
+        if split_strategy == "group" and groups is None:
+            warnings.warn(
+                "cross_validate(split_strategy='group') needs groups; "
+                "falling back to StratifiedKFold, which leaks overlapping windows."
+            )
+            split_strategy = "stratified"
+
+        if split_strategy == "group":
+            splitter = StratifiedGroupKFold(
+                n_splits=n_splits, shuffle=True, random_state=self.random_state
+            )
+            return list(splitter.split(X, y, groups))
+        if split_strategy == "time":
+            if times is None or end_times is None:
+                raise ValueError(
+                    "cross_validate(split_strategy='time') needs times (window starts) "
+                    "and end_times (window ends)."
+                )
+            order = np.argsort(times, kind="stable")
+            folds = []
+            for train_pos, val_pos in TimeSeriesSplit(n_splits=n_splits).split(order):
+                train_idx, val_idx = order[train_pos], order[val_pos]
+                # Drop training windows that overlap the first validation window
+                cutoff = times[val_idx].min()
+                folds.append((train_idx[end_times[train_idx] < cutoff], val_idx))
+            return folds
+        if split_strategy == "stratified":
+            splitter = StratifiedKFold(
+                n_splits=n_splits, shuffle=True, random_state=self.random_state
+            )
+            return list(splitter.split(X, y))
+        raise ValueError(
+            f"Unknown split_strategy '{split_strategy}'. Use 'group', 'time' or 'stratified'."
+        )
+
+    def _score_fold(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        train_idx: np.ndarray,
+        val_idx: np.ndarray,
+        groups_train: Optional[np.ndarray],
+        n_threads: int,
+    ) -> Dict:
+        """Fit one cross-validation fold and score it on its validation windows."""
+        X_train, X_val = X[train_idx], X[val_idx]
+        y_train, y_val = y[train_idx], y[val_idx]
+
+        model = self._fit_model(X_train, y_train, groups_train, n_threads=n_threads)
+        y_proba = model.predict_proba(X_val)[:, 1]
+        y_pred = (y_proba >= 0.5).astype(int)
+
+        true_positives = np.sum((y_pred == 1) & (y_val == 1))
+        return {
+            "auc": roc_auc_score(y_val, y_proba),
+            "recall": true_positives / max(1, np.sum(y_val == 1)),
+            "best_iteration": self._best_iteration(model),
+        }
+
+    def confidence_intervals(
+        self,
+        y_true: np.ndarray,
+        y_pred: np.ndarray,
+        y_proba: np.ndarray,
+        n_replicates: Optional[int] = None,
+        confidence: float = 0.95,
+        n_jobs: int = -1,
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Bootstrap confidence intervals of the accident-class metrics.
+
+        Returns ``{metric: {"estimate", "low", "high"}}`` for precision,
+        recall, F1, accuracy, ROC-AUC and the F1-optimal threshold.
+        """
+        result = bootstrap_metrics(
+            y_true,
+            y_pred,
+            y_proba,
+            n_replicates=n_replicates or self.bootstrap_replicates or 1000,
+            confidence=confidence,
+            average="binary",
+            pos_label=1,
+            n_jobs=n_jobs,
+            random_state=self.random_state,
+        )
+        return result.intervals()
 
     # ------------------------------------------------------------------ #
     # Persistence
@@ -218,10 +542,161 @@ class AccelerometerAccidentDetector:
     # ------------------------------------------------------------------ #
     # Helpers
     # ------------------------------------------------------------------ #
+    def _fit_model(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        groups: Optional[np.ndarray] = None,
+        n_threads: Optional[int] = None,
+    ):
+        """Fit the classifier, early-stopped on a held-out split when enabled."""
+        thread_params = {"n_jobs": n_threads} if n_threads is not None else {}
+        if not self.scale_features:
+            return self._fit_booster(X, y, groups, thread_params)
+        if self.early_stopping_rounds is None:
+            model = XGBClassifier(**{**self._apply_class_weight(y), **thread_params})
+            model.fit(X, y)
+            return model
+
+        train_idx, val_idx = self._validation_split(y, groups)
+        params = {**self._apply_class_weight(y[train_idx]), **thread_params}
+        params["early_stopping_rounds"] = self.early_stopping_rounds
+        model = XGBClassifier(**params)
+        model.fit(
+            X[train_idx],
+            y[train_idx],
+            eval_set=[(X[val_idx], y[val_idx])],
+            verbose=False,
+        )
+        return model
+
+    def _fit_booster(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        groups: Optional[np.ndarray],
+        thread_params: Dict,
+    ) -> BoosterClassifier:
+        """Train from QuantileDMatrices; the validation split reuses the training quantile cuts."""
+        train_idx = np.arange(len(y))
+        evals = []
+        if self.early_stopping_rounds is not None:
+            train_idx, val_idx = self._validation_split(y, groups)
+        params = {**self._apply_class_weight(y[train_idx]), **thread_params}
+        dtrain = self._quantile_dmatrix(X[train_idx], y[train_idx])
+        if self.early_stopping_rounds is not None:
+            params["early_stopping_rounds"] = self.early_stopping_rounds
+            dvalid = self._quantile_dmatrix(X[val_idx], y[val_idx], ref=dtrain)
+            evals = [(dvalid, "validation")]
+
+        booster_params, num_boost_round, early_stopping_rounds = native_params(params, 2)
+        booster = xgb.train(
+            booster_params,
+            dtrain,
+            num_boost_round=num_boost_round,
+            evals=evals,
+            early_stopping_rounds=early_stopping_rounds,
+            verbose_eval=False,
+        )
+        return BoosterClassifier(booster=booster, params=params).fit_from_booster(n_features=X.shape[1])
+
+    def _quantile_dmatrix(
+        self,
+        X: np.ndarray,
+        y: Optional[np.ndarray] = None,
+        ref: Optional[xgb.QuantileDMatrix] = None,
+    ) -> xgb.QuantileDMatrix:
+        return xgb.QuantileDMatrix(
+            X, label=y, ref=ref, max_bin=self.model_params.get("max_bin", 256)
+        )
+
+    def _holdout_split(
+        self,
+        features_df: pd.DataFrame,
+        y: np.ndarray,
+        groups: Optional[np.ndarray],
+        test_size: float,
+        split_strategy: str,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Train/test window indices for ``fit``."""
+        indices = np.arange(len(y))
+        if split_strategy == "group":
+            if groups is None or len(np.unique(groups)) < 2:
+                warnings.warn(
+                    "Fewer than two groups for split_strategy='group'; "
+                    "falling back to a stratified split, which leaks overlapping windows."
+                )
+                split_strategy = "stratified"
+            else:
+                n_tries = 100
+                splitter = GroupShuffleSplit(
+                    n_splits=n_tries, test_size=test_size, random_state=self.random_state
+                )
+                # Take the first split whose train and test sides both contain accidents
+                for train_idx, test_idx in splitter.split(indices, y, groups):
+                    if len(np.unique(y[train_idx])) > 1 and len(np.unique(y[test_idx])) > 1:
+                        return train_idx, test_idx
+                raise ValueError(
+                    f"No group split out of {n_tries} has both classes in train and test; "
+                    "accidents are concentrated in too few groups. Use more groups, a "
+                    "larger test_size or split_strategy='time'."
+                )
+
+        if split_strategy == "time":
+            starts = features_df["window_start_ts"].to_numpy()
+            ends = features_df["window_end_ts"].to_numpy()
+            position = min(int(len(starts) * (1 - test_size)), len(starts) - 1)
+            cutoff = np.sort(starts)[position]
+            test_idx = indices[starts >= cutoff]
+            # Drop training windows that overlap the first test window
+            train_idx = indices[ends < cutoff]
+            if len(np.unique(y[train_idx])) < 2 or len(np.unique(y[test_idx])) < 2:
+                raise ValueError(
+                    "The time split does not have both classes in train and test; "
+                    "accidents are concentrated in too short a period. Use a different "
+                    "test_size or split_strategy='group'."
+                )
+            return train_idx, test_idx
+        if split_strategy == "stratified":
+            train_idx, test_idx = train_test_split(
+                indices, test_size=test_size, stratify=y, random_state=self.random_state
+            )
+            return train_idx, test_idx
+        raise ValueError(
+            f"Unknown split_strategy '{split_strategy}'. Use 'group', 'time' or 'stratified'."
+        )
+
+    def _validation_split(
+        self, y: np.ndarray, groups: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices of the early-stopping split, keeping each vehicle on one side."""
+        if groups is not None and len(np.unique(groups)) > 1:
+            splitter = GroupShuffleSplit(
+                n_splits=1, test_size=self.validation_size, random_state=self.random_state
+            )
+            return next(splitter.split(np.zeros(len(y)), y, groups))
+        return train_test_split(
+            np.arange(len(y)),
+            test_size=self.validation_size,
+            stratify=y if len(np.unique(y)) > 1 else None,
+            random_state=self.random_state,
+        )
+
+    def _best_iteration(self, model) -> Optional[int]:
+        """Best boosting round (0-based) found by early stopping, or None when it was off."""
+        if self.early_stopping_rounds is None:
+            return None
+        if isinstance(model, BoosterClassifier):
+            return model.best_iteration
+        # predict()/predict_proba() already limit themselves to rounds 0..best_iteration
+        return int(model.best_iteration)
+
     def _apply_class_weight(self, y: np.ndarray) -> Dict:
+        return self._class_weight_params(y.sum(), len(y))
+
+    def _class_weight_params(self, pos: int, total: int) -> Dict:
         params = dict(self.model_params)
-        pos = y.sum()
-        neg = len(y) - pos
+        neg = total - pos
         if pos == 0:
             params["scale_pos_weight"] = 1.0
         else:
@@ -230,27 +705,24 @@ class AccelerometerAccidentDetector:
         return params
 
     def _collect_metrics(
-        self, y_true: np.ndarray, y_pred: np.ndarray, y_proba: np.ndarray
+        self, y_true: np.ndarray, y_pred: np.ndarray, curve: Tuple[np.ndarray, ...]
     ) -> Dict[str, float]:
-        report = classification_report(
-            y_true, y_pred, target_names=["normal", "accident"], output_dict=True
-        )
-        cm = confusion_matrix(y_true, y_pred).tolist()
+        _, cm = confusion_counts(y_true, y_pred, labels=[0, 1])
+        report = metrics_from_confusion(cm)
+        fps, tps, _ = curve
         return {
-            "accuracy": float(report["accuracy"]),
-            "precision": float(report["accident"]["precision"]),
-            "recall": float(report["accident"]["recall"]),
-            "f1": float(report["accident"]["f1-score"]),
-            "roc_auc": float(roc_auc_score(y_true, y_proba)),
-            "confusion_matrix": cm,
+            "accuracy": report["accuracy"],
+            "precision": float(report["precision_per_class"][1]),
+            "recall": float(report["recall_per_class"][1]),
+            "f1": float(report["f1_per_class"][1]),
+            "roc_auc": roc_auc_from_curve(fps, tps),
+            "confusion_matrix": cm.tolist(),
         }
 
-    def _optimise_threshold(self, y_true: np.ndarray, y_proba: np.ndarray) -> Dict[str, float]:
-        precision, recall, thresholds = precision_recall_curve(y_true, y_proba)
-        f1_scores = 2 * (precision * recall) / (precision + recall + 1e-12)
+    def _optimise_threshold(self, curve: Tuple[np.ndarray, ...]) -> Dict[str, float]:
+        precision, recall, thresholds = precision_recall_from_curve(*curve)
+        best_idx, optimal_threshold = best_f1_threshold(precision, recall, thresholds)
         threshold_candidates = np.concatenate(([0.0], thresholds))
-        best_idx = int(np.argmax(f1_scores))
-        optimal_threshold = float(threshold_candidates[min(best_idx, len(threshold_candidates) - 1)])
 
         target_idx = np.where(recall >= self.target_recall)[0]
         if target_idx.size:
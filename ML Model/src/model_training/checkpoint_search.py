@@ -0,0 +1,241 @@
+"""
+Checkpoint Search Module
+Grid/randomized search that scores every n_estimators value from one fit.
+
+Candidates that differ only in the checkpoint parameter (n_estimators) share
+a single model per fold: forests are grown with warm_start and boosted models
+are fitted once to the largest value and scored on the first k rounds
+(iteration_range). Scores are identical to fitting each value from scratch.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, ClassifierMixin, RegressorMixin, clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+
+
+def _supports_warm_start(estimator):
+    return 'warm_start' in estimator.get_params()
+
+
+def _supports_iteration_range(estimator):
+    return hasattr(estimator, 'get_booster')
+
+
+class _FirstRounds(BaseEstimator):
+    """Read-only view of a fitted boosted model restricted to its first n_rounds"""
+
+    def __init__(self, model=None, n_rounds=None):
+        self.model = model
+        self.n_rounds = n_rounds
+
+    def __getattr__(self, name):
+        # Delegate fitted attributes (classes_, n_features_in_, ...) to the model
+        if name in ('model', 'n_rounds') or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def predict(self, X):
+        return self.model.predict(X, iteration_range=(0, self.n_rounds))
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X, iteration_range=(0, self.n_rounds))
+
+
+class _FirstRoundsClassifier(ClassifierMixin, _FirstRounds):
+    pass
+
+
+class _FirstRoundsRegressor(RegressorMixin, _FirstRounds):
+    pass
+
+
+def _checkpoint_scores(estimator, params, checkpoint_param, checkpoints, X, y,
+                       train_idx, test_idx, scorer):
+    """Fit one model per fold and score it at every checkpoint (ascending)"""
+    X_train = X.iloc[train_idx] if hasattr(X, 'iloc') else X[train_idx]
+    y_train = y.iloc[train_idx] if hasattr(y, 'iloc') else y[train_idx]
+    X_test = X.iloc[test_idx] if hasattr(X, 'iloc') else X[test_idx]
+    y_test = y.iloc[test_idx] if hasattr(y, 'iloc') else y[test_idx]
+
+    model = clone(estimator).set_params(**params)
+    scores = []
+    if _supports_warm_start(model):
+        model.set_params(warm_start=True)
+        for value in checkpoints:
+            model.set_params(**{checkpoint_param: value})
+            model.fit(X_train, y_train)
+            scores.append(scorer(model, X_test, y_test))
+    elif _supports_iteration_range(model):
+        model.set_params(**{checkpoint_param: checkpoints[-1]})
+        model.fit(X_train, y_train)
+        view = _FirstRoundsClassifier if is_classifier(model) else _FirstRoundsRegressor
+        for value in checkpoints:
+            scores.append(scorer(view(model, value), X_test, y_test))
+    else:
+        for value in checkpoints:
+            model = clone(estimator).set_params(**params, **{checkpoint_param: value})
+            model.fit(X_train, y_train)
+            scores.append(scorer(model, X_test, y_test))
+    return scores
+
+
+class CheckpointSearchCV:
+    """
+    Grid or randomized search sharing one fit across n_estimators values
+
+    Candidates come from ParameterGrid(param_grid), or from ParameterSampler
+    when n_iter is set (the same candidates RandomizedSearchCV would draw with
+    the same random_state). They are grouped by all parameters except the
+    checkpoint parameter, and each group is fitted once per fold.
+
+    With a TrialStore, groups whose candidates are all stored are not
+    refitted, and each group is saved as soon as all its folds finish.
+
+    Attributes set by fit():
+        best_params_, best_score_, best_estimator_ (if refit), cv_results_,
+        n_fits_, n_reused_, elapsed_
+    """
+
+    def __init__(self, estimator, param_grid, scoring=None, cv=5, n_iter=None,
+                 checkpoint_param='n_estimators', n_jobs=-1, random_state=None,
+                 refit=True, verbose=1, store=None):
+        """
+        Initialize the CheckpointSearchCV
+
+        Args:
+            estimator: Unfitted forest (warm_start) or XGBoost-style estimator
+            param_grid: Dict of parameter -> list of values
+            scoring: Scoring name or callable (as in GridSearchCV)
+            cv: Number of folds or a CV splitter
+            n_iter: Number of sampled candidates. None searches the full grid
+            checkpoint_param: Parameter scored from one fit per group
+            n_jobs: Number of parallel (group, fold) fits
+            random_state: Random seed for candidate sampling
+            refit: Refit the best parameters on all data
+            verbose: Verbosity level
+            store: Optional TrialStore to reuse and record scored candidates
+        """
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_iter = n_iter
+        self.checkpoint_param = checkpoint_param
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.refit = refit
+        self.verbose = verbose
+        self.store = store
+
+    def _candidates(self):
+        if self.n_iter is None:
+            return list(ParameterGrid(self.param_grid))
+        return list(ParameterSampler(self.param_grid, n_iter=self.n_iter,
+                                     random_state=self.random_state))
+
+    def _groups(self, candidates):
+        """Map (other params) -> sorted checkpoint values"""
+        default = self.estimator.get_params()[self.checkpoint_param]
+        groups = {}
+        for params in candidates:
+            other = {k: v for k, v in params.items() if k != self.checkpoint_param}
+            key = tuple(sorted(other.items(), key=lambda item: item[0]))
+            groups.setdefault(key, set()).add(params.get(self.checkpoint_param, default))
+        return [(dict(key), sorted(values)) for key, values in groups.items()]
+
+    def fit(self, X, y):
+        """
+        Run the search on X, y
+
+        Args:
+            X: Feature matrix
+            y: Target vector
+        """
+        start = time.perf_counter()
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        cv = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        splits = list(cv.split(X, y))
+
+        candidates = self._candidates()
+        groups = self._groups(candidates)
+
+        def group_configs(g):
+            params, checkpoints = groups[g]
+            return [self.store.config(self.estimator, {**params, self.checkpoint_param: value})
+                    for value in checkpoints]
+
+        # group index -> scores of shape (folds, checkpoints)
+        group_scores = {}
+        pending = list(range(len(groups)))
+        if self.store is not None:
+            context = self.store.context(self.estimator, X, y, cv, self.scoring)
+            pending = []
+            for g in range(len(groups)):
+                configs = group_configs(g)
+                found = self.store.lookup(context, configs)
+                if len(found) == len(configs):
+                    group_scores[g] = np.column_stack([found[c] for c in range(len(configs))])
+                else:
+                    pending.append(g)
+        self.n_reused_ = len(groups) - len(pending)
+
+        if self.verbose:
+            print(f"Fitting {len(splits)} folds for each of {len(pending)} groups "
+                  f"({len(candidates)} candidates, {self.n_reused_} groups reused), "
+                  f"totalling {len(pending) * len(splits)} fits")
+
+        fold_scores = Parallel(n_jobs=self.n_jobs, return_as='generator')(
+            delayed(_checkpoint_scores)(self.estimator, groups[g][0], self.checkpoint_param,
+                                        groups[g][1], X, y, train_idx, test_idx, scorer)
+            for g in pending
+            for train_idx, test_idx in splits
+        )
+        buffer = []
+        for i, scores in enumerate(fold_scores):
+            buffer.append(scores)
+            if len(buffer) == len(splits):
+                g = pending[i // len(splits)]
+                group_scores[g] = np.asarray(buffer, dtype=float)
+                buffer = []
+                if self.store is not None:
+                    self.store.save(context, group_configs(g), group_scores[g].T)
+        self.n_fits_ = len(pending) * len(splits)
+
+        # Collect scores per candidate in the original candidate order
+        scores_by_key = {}
+        for g, (params, checkpoints) in enumerate(groups):
+            per_fold = group_scores[g]
+            for c, value in enumerate(checkpoints):
+                key = tuple(sorted({**params, self.checkpoint_param: value}.items(),
+                                   key=lambda item: item[0]))
+                scores_by_key[key] = per_fold[:, c]
+
+        default = self.estimator.get_params()[self.checkpoint_param]
+        results = {'params': [], 'mean_test_score': [], 'std_test_score': []}
+        for params in candidates:
+            full = {**params, self.checkpoint_param: params.get(self.checkpoint_param, default)}
+            scores = scores_by_key[tuple(sorted(full.items(), key=lambda item: item[0]))]
+            results['params'].append(params)
+            results['mean_test_score'].append(float(scores.mean()))
+            results['std_test_score'].append(float(scores.std()))
+        means = np.asarray(results['mean_test_score'])
+        results['rank_test_score'] = (pd.Series(means).rank(method='min', ascending=False)
+                                      .astype(int).to_numpy())
+
+        best = int(np.argmax(means))
+        self.cv_results_ = results
+        self.best_index_ = best
+        self.best_params_ = candidates[best]
+        self.best_score_ = float(means[best])
+
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            self.best_estimator_.fit(X, y)
+
+        self.elapsed_ = time.perf_counter() - start
+        return self
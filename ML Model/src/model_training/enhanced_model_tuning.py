@@ -2,8 +2,9 @@
 Enhanced Model Tuning Module
 Implements hyperparameter optimization for:
 - Random Forest models
-- Gradient Boosting models
-Uses GridSearchCV and RandomizedSearchCV with 5-fold cross-validation
+- Gradient Boosting models (LightGBM or HistGradientBoosting)
+- XGBoost models
+Uses GridSearchCV, RandomizedSearchCV, successive halving or TPE search with 5-fold cross-validation
 """
 
 import pandas as pd
@@ -11,6 +12,7 @@ import numpy as np
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.ensemble import GradientBoostingClassifier, GradientBoostingRegressor
 from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+from xgboost import XGBClassifier, XGBRegressor
 
 # Optional LightGBM (faster for large datasets). Import if available.
 try:
@@ -24,7 +26,12 @@ except Exception:
 from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, cross_val_score
 from sklearn.model_selection import train_test_split, StratifiedKFold, KFold
 from sklearn.metrics import make_scorer, f1_score, mean_squared_error
+from .successive_halving import SuccessiveHalvingSearch
+from .checkpoint_search import CheckpointSearchCV
+from .trial_store import TrialStore
+from .tpe_search import TPESearchCV
 import joblib
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -32,7 +39,7 @@ warnings.filterwarnings('ignore')
 class EnhancedModelTuner:
     """Enhanced model tuning with comprehensive hyperparameter optimization"""
     
-    def __init__(self, X, y, task_type='classification', random_state=42):
+    def __init__(self, X, y, task_type='classification', random_state=42, trial_store=None):
         """
         Initialize the EnhancedModelTuner
         
@@ -41,11 +48,16 @@ class EnhancedModelTuner:
             y: Target vector
             task_type: 'classification' or 'regression'
             random_state: Random seed for reproducibility
+            trial_store: Optional TrialStore (or path to its SQLite file). Checkpoint and
+                         halving searches reuse stored trials and record new ones
         """
         self.X = X
         self.y = y
         self.task_type = task_type
         self.random_state = random_state
+        if isinstance(trial_store, str):
+            trial_store = TrialStore(trial_store)
+        self.trial_store = trial_store
         
         self.X_train = None
         self.X_test = None
@@ -58,6 +70,15 @@ class EnhancedModelTuner:
         self.gb_best_params = None
         self.rf_best_score = None
         self.gb_best_score = None
+        self.rf_search_seconds = None
+        self.gb_search_seconds = None
+        self.rf_search = None
+        self.gb_search = None
+        self.xgb_search = None
+        self.xgb_model = None
+        self.xgb_best_params = None
+        self.xgb_best_score = None
+        self.xgb_search_seconds = None
         
     def split_data(self, test_size=0.2):
         """Split data into training and testing sets"""
@@ -79,15 +100,27 @@ class EnhancedModelTuner:
     
     # ==================== RANDOM FOREST TUNING ====================
     
-    def tune_random_forest(self, method='grid', cv=5, n_jobs=-1, verbose=1):
+    def tune_random_forest(self, method='grid', cv=5, n_jobs=-1, verbose=1,
+                           resource='n_estimators', factor=3, max_fits=None, time_budget=None,
+                           share_checkpoints=True, n_trials=50):
         """
         Tune Random Forest hyperparameters
         
         Args:
-            method: 'grid' for GridSearchCV or 'random' for RandomizedSearchCV
+            method: 'grid' for GridSearchCV, 'random' for RandomizedSearchCV,
+                    'halving' for successive halving (SuccessiveHalvingSearch) or
+                    'tpe' for model-based search with pruning (TPESearchCV)
             cv: Number of cross-validation folds
             n_jobs: Number of parallel jobs
             verbose: Verbosity level
+            resource: For 'halving', 'n_estimators' or 'n_samples'
+            factor: For 'halving', elimination rate per iteration
+            max_fits: For 'halving', budget on the total number of fits
+            time_budget: For 'halving', budget on wall time in seconds
+            share_checkpoints: For 'grid' and 'random', grow each forest once per fold
+                               with warm_start and score every n_estimators value
+                               from it (CheckpointSearchCV)
+            n_trials: For 'tpe', number of configurations to try
         
         Returns:
             Best model and parameters
@@ -96,12 +129,15 @@ class EnhancedModelTuner:
         print("RANDOM FOREST HYPERPARAMETER TUNING")
         print("="*60)
         
+        self._check_method(method)
+        model_jobs = self._model_n_jobs(n_jobs)
+        
         # Select appropriate model based on task type
         if self.task_type == 'classification':
-            base_model = RandomForestClassifier(random_state=self.random_state, n_jobs=n_jobs)
+            base_model = RandomForestClassifier(random_state=self.random_state, n_jobs=model_jobs)
             scoring = 'f1_macro'  # F1-score for classification
         else:
-            base_model = RandomForestRegressor(random_state=self.random_state, n_jobs=n_jobs)
+            base_model = RandomForestRegressor(random_state=self.random_state, n_jobs=model_jobs)
             scoring = 'neg_mean_squared_error'  # MSE for regression
         
         # Define parameter grid
@@ -114,12 +150,25 @@ class EnhancedModelTuner:
         }
         
         # Select CV strategy
-        if self.task_type == 'classification':
-            cv_strategy = StratifiedKFold(n_splits=cv, shuffle=True, random_state=self.random_state)
-        else:
-            cv_strategy = KFold(n_splits=cv, shuffle=True, random_state=self.random_state)
+        cv_strategy = self._cv_strategy(cv)
         
-        if method == 'grid':
+        if method in ('grid', 'random') and share_checkpoints:
+            n_iter = None if method == 'grid' else 50
+            print(f"Using {'grid' if n_iter is None else 'randomized'} search with warm-started "
+                  f"n_estimators checkpoints and {cv}-fold cross-validation...")
+            search = CheckpointSearchCV(
+                estimator=base_model,
+                param_grid=param_grid,
+                scoring=scoring,
+                cv=cv_strategy,
+                n_iter=n_iter,
+                checkpoint_param='n_estimators',
+                n_jobs=n_jobs,
+                random_state=self.random_state,
+                verbose=verbose,
+                store=self.trial_store
+            )
+        elif method == 'grid':
             print(f"Using GridSearchCV with {cv}-fold cross-validation...")
             search = GridSearchCV(
                 estimator=base_model,
@@ -130,7 +179,27 @@ class EnhancedModelTuner:
                 verbose=verbose,
                 return_train_score=True
             )
-        else:  # randomized
+        elif method == 'halving':
+            print(f"Using successive halving (resource={resource}, factor={factor}) "
+                  f"with {cv}-fold cross-validation...")
+            search = SuccessiveHalvingSearch(
+                estimator=base_model,
+                param_grid=param_grid,
+                scoring=scoring,
+                cv=cv_strategy,
+                resource=resource,
+                factor=factor,
+                max_fits=max_fits,
+                time_budget=time_budget,
+                n_jobs=n_jobs,
+                random_state=self.random_state,
+                verbose=verbose,
+                store=self.trial_store
+            )
+        elif method == 'tpe':
+            search = self._tpe_search(base_model, param_grid, scoring, cv_strategy, cv,
+                                      n_trials, n_jobs, verbose)
+        else:  # random
             print(f"Using RandomizedSearchCV with {cv}-fold cross-validation...")
             n_iter = 50  # Number of parameter settings to sample
             search = RandomizedSearchCV(
@@ -146,7 +215,10 @@ class EnhancedModelTuner:
             )
         
         print("Fitting model...")
+        start = time.perf_counter()
         search.fit(self.X_train, self.y_train)
+        self.rf_search_seconds = time.perf_counter() - start
+        self.rf_search = search
         
         self.rf_model = search.best_estimator_
         self.rf_best_params = search.best_params_
@@ -155,28 +227,31 @@ class EnhancedModelTuner:
         print(f"\n✓ Random Forest tuning complete!")
         print(f"  Best parameters: {self.rf_best_params}")
         print(f"  Best CV score: {self.rf_best_score:.4f}")
+        print(f"  Search time: {self.rf_search_seconds:.1f}s")
         
-        # Display top 5 parameter combinations
-        results_df = pd.DataFrame(search.cv_results_)
-        top_results = results_df.nlargest(5, 'mean_test_score')[['params', 'mean_test_score', 'std_test_score']]
-        print(f"\n  Top 5 parameter combinations:")
-        for idx, row in top_results.iterrows():
-            print(f"    Score: {row['mean_test_score']:.4f} (+/- {row['std_test_score']*2:.4f})")
-            print(f"    Params: {row['params']}")
+        self._print_top_results(search, method)
         
         return self.rf_model, self.rf_best_params
     
     # ==================== GRADIENT BOOSTING TUNING ====================
     
-    def tune_gradient_boosting(self, method='grid', cv=5, n_jobs=-1, verbose=1):
+    def tune_gradient_boosting(self, method='grid', cv=5, n_jobs=-1, verbose=1, n_trials=50,
+                               factor=3, max_fits=None, time_budget=None):
         """
         Tune Gradient Boosting hyperparameters
         
         Args:
-            method: 'grid' for GridSearchCV or 'random' for RandomizedSearchCV
+            method: 'grid' or 'random' (CheckpointSearchCV over the boosting rounds),
+                    'halving' for successive halving over the boosting rounds
+                    (SuccessiveHalvingSearch) or 'tpe' for model-based search
+                    with pruning (TPESearchCV)
             cv: Number of cross-validation folds
-            n_jobs: Number of parallel jobs
+            n_jobs: Number of parallel fits (the model itself then uses one thread)
             verbose: Verbosity level
+            n_trials: For 'tpe', number of configurations to try
+            factor: For 'halving', elimination rate per iteration
+            max_fits: For 'halving', budget on the total number of fits
+            time_budget: For 'halving', budget on wall time in seconds
         
         Returns:
             Best model and parameters
@@ -185,12 +260,228 @@ class EnhancedModelTuner:
         print("GRADIENT BOOSTING HYPERPARAMETER TUNING")
         print("="*60)
         
+        self._check_method(method)
+        model_jobs = self._model_n_jobs(n_jobs)
+        
         # Prefer LightGBM if available (faster and scalable). Otherwise use HistGradientBoosting.
+        rounds_param = 'n_estimators'
         if lgb_available:
             if self.task_type == 'classification':
-                base_model = LGBMClassifier(random_state=self.random_state, n_jobs=n_jobs)
+                base_model = LGBMClassifier(random_state=self.random_state, n_jobs=model_jobs)
                 scoring = 'f1_macro'
             else:
-                base_model = LGBMRegressor(random_state=self.random_state, n_jobs=n_jobs)
+                base_model = LGBMRegressor(random_state=self.random_state, n_jobs=model_jobs)
                 scoring = 'neg_mean_squared_error'
-
+            param_grid = {
+                'n_estimators': [100, 200, 300],
+                'learning_rate': [0.01, 0.05, 0.1, 0.2],
+                'num_leaves': [15, 31, 63],
+                'max_depth': [-1, 5, 10],
+                'min_child_samples': [10, 20, 40],
+                'colsample_bytree': [0.8, 1.0]
+            }
+        else:
+            rounds_param = 'max_iter'
+            if self.task_type == 'classification':
+                base_model = HistGradientBoostingClassifier(random_state=self.random_state)
+                scoring = 'f1_macro'
+            else:
+                base_model = HistGradientBoostingRegressor(random_state=self.random_state)
+                scoring = 'neg_mean_squared_error'
+            param_grid = {
+                'max_iter': [100, 200, 300],
+                'learning_rate': [0.01, 0.05, 0.1, 0.2],
+                'max_leaf_nodes': [15, 31, 63],
+                'max_depth': [None, 5, 10],
+                'min_samples_leaf': [10, 20, 40],
+                'l2_regularization': [0.0, 1.0]
+            }
+        
+        search = self._build_search(base_model, param_grid, scoring, method, cv, n_jobs,
+                                    verbose, n_trials, rounds_param, factor, max_fits,
+                                    time_budget)
+        
+        print("Fitting model...")
+        start = time.perf_counter()
+        search.fit(self.X_train, self.y_train)
+        self.gb_search_seconds = time.perf_counter() - start
+        self.gb_search = search
+        
+        self.gb_model = search.best_estimator_
+        self.gb_best_params = search.best_params_
+        self.gb_best_score = search.best_score_
+        
+        print(f"\n✓ Gradient Boosting tuning complete!")
+        print(f"  Model: {type(base_model).__name__}")
+        print(f"  Best parameters: {self.gb_best_params}")
+        print(f"  Best CV score: {self.gb_best_score:.4f}")
+        print(f"  Search time: {self.gb_search_seconds:.1f}s")
+        self._print_top_results(search, method)
+        
+        return self.gb_model, self.gb_best_params
+    
+    # ==================== XGBOOST TUNING ====================
+    
+    def tune_xgboost(self, method='grid', cv=5, n_jobs=-1, verbose=1, n_trials=50,
+                     factor=3, max_fits=None, time_budget=None):
+        """
+        Tune XGBoost hyperparameters
+        
+        Args:
+            method: 'grid' or 'random' (CheckpointSearchCV, every n_estimators value
+                    scored from one fit), 'halving' for successive halving over
+                    n_estimators (SuccessiveHalvingSearch) or 'tpe' for
+                    model-based search with pruning (TPESearchCV)
+            cv: Number of cross-validation folds
+            n_jobs: Number of parallel fits (XGBoost itself then uses one thread)
+            verbose: Verbosity level
+            n_trials: For 'tpe', number of configurations to try
+            factor: For 'halving', elimination rate per iteration
+            max_fits: For 'halving', budget on the total number of fits
+            time_budget: For 'halving', budget on wall time in seconds
+        
+        Returns:
+            Best model and parameters
+        """
+        print("\n" + "="*60)
+        print("XGBOOST HYPERPARAMETER TUNING")
+        print("="*60)
+        
+        self._check_method(method)
+        model_jobs = self._model_n_jobs(n_jobs)
+        
+        if self.task_type == 'classification':
+            base_model = XGBClassifier(random_state=self.random_state, n_jobs=model_jobs,
+                                       tree_method='hist')
+            scoring = 'f1_macro'
+        else:
+            base_model = XGBRegressor(random_state=self.random_state, n_jobs=model_jobs,
+                                      tree_method='hist')
+            scoring = 'neg_mean_squared_error'
+        
+        param_grid = {
+            'n_estimators': [100, 200, 300],
+            'max_depth': [3, 6, 10],
+            'learning_rate': [0.01, 0.05, 0.1, 0.3],
+            'subsample': [0.6, 0.8, 1.0],
+            'colsample_bytree': [0.6, 0.8, 1.0],
+            'gamma': [0, 0.1, 0.2]
+        }
+        
+        search = self._build_search(base_model, param_grid, scoring, method, cv, n_jobs,
+                                    verbose, n_trials, 'n_estimators', factor, max_fits,
+                                    time_budget)
+        
+        print("Fitting model...")
+        start = time.perf_counter()
+        search.fit(self.X_train, self.y_train)
+        self.xgb_search_seconds = time.perf_counter() - start
+        self.xgb_search = search
+        
+        self.xgb_model = search.best_estimator_
+        self.xgb_best_params = search.best_params_
+        self.xgb_best_score = search.best_score_
+        
+        print(f"\n✓ XGBoost tuning complete!")
+        print(f"  Best parameters: {self.xgb_best_params}")
+        print(f"  Best CV score: {self.xgb_best_score:.4f}")
+        print(f"  Search time: {self.xgb_search_seconds:.1f}s")
+        self._print_top_results(search, method)
+        
+        return self.xgb_model, self.xgb_best_params
+    
+    # ==================== HELPERS ====================
+    
+    def _cv_strategy(self, cv):
+        """Stratified folds for classification, shuffled folds for regression"""
+        if self.task_type == 'classification':
+            return StratifiedKFold(n_splits=cv, shuffle=True, random_state=self.random_state)
+        return KFold(n_splits=cv, shuffle=True, random_state=self.random_state)
+    
+    METHODS = ('grid', 'random', 'halving', 'tpe')
+    
+    def _check_method(self, method):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown tuning method '{method}'. Expected one of {self.METHODS}")
+    
+    @staticmethod
+    def _model_n_jobs(n_jobs):
+        """Threads per model: one while the search runs fits in parallel, to avoid oversubscription"""
+        return n_jobs if n_jobs == 1 else 1
+    
+    def _build_search(self, base_model, param_grid, scoring, method, cv, n_jobs, verbose, n_trials,
+                      rounds_param='n_estimators', factor=3, max_fits=None, time_budget=None):
+        """
+        CheckpointSearchCV ('grid'/'random'), SuccessiveHalvingSearch ('halving') or
+        TPESearchCV ('tpe') for base_model, all recording trials in the trial store
+        
+        rounds_param is the boosting-rounds parameter: scored from one fit per
+        group by CheckpointSearchCV and used as the halving resource.
+        """
+        self._check_method(method)
+        cv_strategy = self._cv_strategy(cv)
+        if method in ('grid', 'random'):
+            n_iter = None if method == 'grid' else 50
+            print(f"Using {'grid' if n_iter is None else 'randomized'} search with shared "
+                  f"{rounds_param} checkpoints and {cv}-fold cross-validation...")
+            return CheckpointSearchCV(
+                estimator=base_model,
+                param_grid=param_grid,
+                scoring=scoring,
+                cv=cv_strategy,
+                n_iter=n_iter,
+                checkpoint_param=rounds_param,
+                n_jobs=n_jobs,
+                random_state=self.random_state,
+                verbose=verbose,
+                store=self.trial_store
+            )
+        if method == 'halving':
+            print(f"Using successive halving (resource={rounds_param}, factor={factor}) "
+                  f"with {cv}-fold cross-validation...")
+            return SuccessiveHalvingSearch(
+                estimator=base_model,
+                param_grid=param_grid,
+                scoring=scoring,
+                cv=cv_strategy,
+                resource=rounds_param,
+                factor=factor,
+                max_fits=max_fits,
+                time_budget=time_budget,
+                n_jobs=n_jobs,
+                random_state=self.random_state,
+                verbose=verbose,
+                store=self.trial_store
+            )
+        return self._tpe_search(base_model, param_grid, scoring, cv_strategy, cv,
+                                n_trials, n_jobs, verbose)
+    
+    def _tpe_search(self, base_model, param_grid, scoring, cv_strategy, cv, n_trials, n_jobs,
+                    verbose):
+        print(f"Using TPE search ({n_trials} trials, first-fold pruning) "
+              f"with {cv}-fold cross-validation...")
+        return TPESearchCV(
+            estimator=base_model,
+            param_grid=param_grid,
+            scoring=scoring,
+            cv=cv_strategy,
+            n_trials=n_trials,
+            n_jobs=n_jobs,
+            random_state=self.random_state,
+            verbose=verbose,
+            store=self.trial_store
+        )
+    
+    def _print_top_results(self, search, method):
+        """Display the top 5 parameter combinations of a fitted search"""
+        if method in ('halving', 'tpe'):
+            top_results = search.top_results(5)
+        else:
+            results_df = pd.DataFrame(search.cv_results_)
+            top_results = results_df.nlargest(5, 'mean_test_score')[['params', 'mean_test_score', 'std_test_score']]
+        print(f"\n  Top 5 parameter combinations:")
+        for idx, row in top_results.iterrows():
+            print(f"    Score: {row['mean_test_score']:.4f} (+/- {row['std_test_score']*2:.4f})")
+            print(f"    Params: {row['params']}")
+        if method == 'tpe':
+            print(f"  Fits: {search.n_fits_} ({search.n_pruned_} trials pruned after the first fold)")
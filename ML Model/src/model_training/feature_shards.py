@@ -0,0 +1,317 @@
+"""
+Out-of-core training on engineered feature shards.
+
+Window features for long fleet recordings are written to many Parquet/CSV
+shards. These helpers train XGBoost on them without building the full
+feature matrix in memory:
+
+1. `scan_shards` makes one pass over the shards to count labels and fit a
+   StandardScaler with `partial_fit` (the streaming equivalent of the
+   pipeline's scaler).
+2. `FeatureShardIter` feeds one shard at a time into an external-memory
+   `xgboost.DMatrix` (pages cached on disk) or a `QuantileDMatrix`.
+3. `train_booster_from_shards` trains a Booster and wraps it in
+   `BoosterClassifier`, which drops into the existing sklearn Pipeline.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.preprocessing import StandardScaler
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+# sklearn-style XGBClassifier parameters that xgb.train takes under another name
+_NATIVE_PARAM_NAMES = {"random_state": "seed", "n_jobs": "nthread"}
+# XGBClassifier parameters that are not booster parameters
+_TRAIN_ARGS = ("n_estimators", "early_stopping_rounds")
+
+
+def read_shard(path: str | Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read one feature shard (Parquet or CSV), projecting to ``columns``."""
+    path = str(path)
+    columns = list(columns) if columns is not None else None
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def shard_columns(path: str | Path) -> List[str]:
+    """Column names of a shard without reading its data."""
+    path = str(path)
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def scan_shards(
+    paths: Sequence[str | Path],
+    feature_cols: Sequence[str],
+    label_col: str = "label",
+    fit_scaler: bool = True,
+) -> Tuple[Optional[StandardScaler], Dict[int, int]]:
+    """
+    One pass over the shards: label counts and a streaming-fitted scaler.
+
+    Only one shard is held in memory at a time. Returns ``(scaler, counts)``
+    where ``scaler`` is None when ``fit_scaler`` is False.
+    """
+    scaler = StandardScaler() if fit_scaler else None
+    counts: Dict[int, int] = {}
+    for path in paths:
+        shard = read_shard(path, [*feature_cols, label_col])
+        labels, label_counts = np.unique(shard[label_col].to_numpy(), return_counts=True)
+        for label, count in zip(labels, label_counts):
+            counts[int(label)] = counts.get(int(label), 0) + int(count)
+        if scaler is not None:
+            scaler.partial_fit(shard[list(feature_cols)].to_numpy(dtype=np.float32))
+    return scaler, counts
+
+
+class FeatureShardIter(xgb.DataIter):
+    """XGBoost data iterator yielding one (optionally scaled) shard per batch."""
+
+    def __init__(
+        self,
+        paths: Sequence[str | Path],
+        feature_cols: Sequence[str],
+        label_col: str = "label",
+        scaler: Optional[StandardScaler] = None,
+        cache_prefix: Optional[str] = None,
+    ) -> None:
+        self.paths = list(paths)
+        self.feature_cols = list(feature_cols)
+        self.label_col = label_col
+        self.scaler = scaler
+        self._position = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> int:
+        if self._position == len(self.paths):
+            return 0
+        shard = read_shard(self.paths[self._position], [*self.feature_cols, self.label_col])
+        X = shard[self.feature_cols].to_numpy(dtype=np.float32)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        input_data(data=X, label=shard[self.label_col].to_numpy())
+        self._position += 1
+        return 1
+
+    def reset(self) -> None:
+        self._position = 0
+
+
+def shard_dmatrix(
+    paths: Sequence[str | Path],
+    feature_cols: Sequence[str],
+    label_col: str = "label",
+    scaler: Optional[StandardScaler] = None,
+    cache_dir: Optional[str | Path] = None,
+    quantile: bool = False,
+    ref: Optional[xgb.DMatrix] = None,
+) -> xgb.DMatrix:
+    """
+    Build a DMatrix over the shards.
+
+    ``quantile=False`` builds an external-memory DMatrix whose pages are cached
+    under ``cache_dir`` (required; the caller owns and removes it).
+    ``quantile=True`` builds a QuantileDMatrix, which keeps only the compressed
+    histogram index in memory (about one byte per value).
+    """
+    if quantile:
+        shard_iter = FeatureShardIter(paths, feature_cols, label_col, scaler)
+        return xgb.QuantileDMatrix(shard_iter, ref=ref)
+    if cache_dir is None:
+        raise ValueError("An external-memory DMatrix needs a cache_dir for its pages.")
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    shard_iter = FeatureShardIter(
+        paths, feature_cols, label_col, scaler, cache_prefix=os.path.join(cache_dir, "cache")
+    )
+    return xgb.DMatrix(shard_iter)
+
+
+def native_params(params: Dict, n_classes: int) -> Tuple[Dict, int, Optional[int]]:
+    """Split XGBClassifier parameters into booster params, rounds and early stopping."""
+    booster_params = {
+        _NATIVE_PARAM_NAMES.get(key, key): value
+        for key, value in params.items()
+        if key not in _TRAIN_ARGS and value is not None
+    }
+    if n_classes > 2:
+        booster_params.setdefault("objective", "multi:softprob")
+        booster_params["num_class"] = n_classes
+    else:
+        booster_params.setdefault("objective", "binary:logistic")
+    return booster_params, int(params.get("n_estimators", 100)), params.get("early_stopping_rounds")
+
+
+def train_booster_from_shards(
+    train_paths: Sequence[str | Path],
+    feature_cols: Sequence[str],
+    params: Dict,
+    n_classes: int = 2,
+    label_col: str = "label",
+    scaler: Optional[StandardScaler] = None,
+    validation_paths: Optional[Sequence[str | Path]] = None,
+    cache_dir: Optional[str | Path] = None,
+    quantile: bool = False,
+) -> "BoosterClassifier":
+    """
+    Train XGBoost on shards and return it as a fitted BoosterClassifier.
+
+    ``params`` uses XGBClassifier names (n_estimators, random_state, ...).
+    When ``early_stopping_rounds`` is set, ``validation_paths`` are required
+    and the model keeps the best iteration. Without ``cache_dir`` the
+    external-memory pages go to a temporary directory removed after training.
+    """
+    if cache_dir is None and not quantile:
+        with tempfile.TemporaryDirectory(prefix="xgb_shards_") as tmp_dir:
+            return train_booster_from_shards(
+                train_paths, feature_cols, params, n_classes, label_col, scaler,
+                validation_paths, cache_dir=tmp_dir, quantile=quantile,
+            )
+
+    booster_params, num_boost_round, early_stopping_rounds = native_params(params, n_classes)
+    dtrain = shard_dmatrix(train_paths, feature_cols, label_col, scaler, cache_dir, quantile)
+
+    evals = []
+    if validation_paths:
+        valid_cache = Path(cache_dir) / "validation" if cache_dir else None
+        dvalid = shard_dmatrix(
+            validation_paths, feature_cols, label_col, scaler, valid_cache, quantile,
+            ref=dtrain if quantile else None,
+        )
+        evals = [(dvalid, "validation")]
+    elif early_stopping_rounds is not None:
+        raise ValueError("early_stopping_rounds needs validation_paths.")
+
+    booster = xgb.train(
+        booster_params,
+        dtrain,
+        num_boost_round=num_boost_round,
+        evals=evals,
+        early_stopping_rounds=early_stopping_rounds if evals else None,
+        verbose_eval=False,
+    )
+    return BoosterClassifier(booster=booster, n_classes=n_classes, params=params).fit_from_booster(
+        n_features=len(feature_cols)
+    )
+
+
+def predict_shards(
+    pipeline,
+    paths: Iterable[str | Path],
+    feature_cols: Sequence[str],
+    label_col: str = "label",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Labels and predicted probabilities over shards, one shard in memory at a time."""
+    labels: List[np.ndarray] = []
+    probas: List[np.ndarray] = []
+    for path in paths:
+        shard = read_shard(path, [*feature_cols, label_col])
+        labels.append(shard[label_col].to_numpy())
+        probas.append(pipeline.predict_proba(shard[list(feature_cols)].to_numpy(dtype=np.float32)))
+    return np.concatenate(labels), np.concatenate(probas)
+
+
+class BoosterClassifier(ClassifierMixin, BaseEstimator):
+    """
+    sklearn-compatible classifier around a Booster trained with xgb.train.
+
+    Either wraps an already trained ``booster`` (``fit_from_booster``) or
+    trains one in ``fit`` from ``params`` (XGBClassifier names), so clones
+    refit with the same hyperparameters in cross_val_score and searches.
+    Predictions use only the trees up to ``best_iteration`` when early
+    stopping found one, like XGBClassifier does.
+    """
+
+    def __init__(
+        self,
+        booster: Optional[xgb.Booster] = None,
+        n_classes: int = 2,
+        params: Optional[Dict] = None,
+    ) -> None:
+        self.booster = booster
+        self.n_classes = n_classes
+        self.params = params
+
+    def _set_fitted(self, booster: xgb.Booster, classes: np.ndarray, n_features: int) -> "BoosterClassifier":
+        self.booster_ = booster
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        best_iteration = getattr(booster, "best_iteration", None)
+        self.best_iteration = int(best_iteration) if best_iteration is not None else None
+        return self
+
+    def fit_from_booster(self, n_features: int) -> "BoosterClassifier":
+        """Set the fitted attributes for the wrapped, already trained booster."""
+        return self._set_fitted(self.booster, np.arange(self.n_classes), n_features)
+
+    def fit(self, X, y, eval_set: Optional[Sequence[Tuple]] = None) -> "BoosterClassifier":
+        """
+        Train a new booster with xgb.train from a QuantileDMatrix of ``X``.
+
+        ``eval_set`` is a list of ``(X, y)`` pairs; the last one drives early
+        stopping when ``params`` sets ``early_stopping_rounds``.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        classes, y_encoded = np.unique(np.asarray(y), return_inverse=True)
+        booster_params, num_boost_round, early_stopping_rounds = native_params(
+            dict(self.params or {}), max(2, len(classes))
+        )
+        max_bin = booster_params.get("max_bin", 256)
+        dtrain = xgb.QuantileDMatrix(X, label=y_encoded, max_bin=max_bin)
+        evals = [
+            (
+                xgb.QuantileDMatrix(
+                    np.asarray(X_eval, dtype=np.float32),
+                    label=np.searchsorted(classes, np.asarray(y_eval)),
+                    ref=dtrain,
+                    max_bin=max_bin,
+                ),
+                f"validation_{i}",
+            )
+            for i, (X_eval, y_eval) in enumerate(eval_set or [])
+        ]
+        booster = xgb.train(
+            booster_params,
+            dtrain,
+            num_boost_round=num_boost_round,
+            evals=evals,
+            early_stopping_rounds=early_stopping_rounds if evals else None,
+            verbose_eval=False,
+        )
+        return self._set_fitted(booster, classes, X.shape[1])
+
+    def predict_proba(self, X) -> np.ndarray:
+        iteration_range = (0, self.best_iteration + 1) if self.best_iteration is not None else (0, 0)
+        # Shards are fed without feature names, so predict on plain arrays
+        X = np.asarray(X, dtype=np.float32)
+        proba = self.booster_.inplace_predict(X, iteration_range=iteration_range)
+        if proba.ndim == 1:
+            proba = np.column_stack([1.0 - proba, proba])
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        """Normalised gain importances, as XGBClassifier reports them."""
+        scores = self.booster_.get_score(importance_type="gain")
+        importances = np.zeros(self.n_features_in_, dtype=np.float32)
+        for name, score in scores.items():
+            importances[int(name.lstrip("f"))] = score
+        total = importances.sum()
+        return importances / total if total > 0 else importances
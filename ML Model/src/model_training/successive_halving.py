@@ -0,0 +1,280 @@
+"""
+Successive Halving Search Module
+Budgeted hyperparameter search that evaluates many configurations on a small
+resource (few trees or few samples) and only promotes the best 1/factor of
+them to the next, larger resource level
+"""
+
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
+
+
+def _fit_and_score(estimator, params, X, y, train_idx, test_idx, scorer):
+    """Fit a clone of estimator with params on one fold and score it"""
+    model = clone(estimator).set_params(**params)
+    X_train = X.iloc[train_idx] if hasattr(X, 'iloc') else X[train_idx]
+    y_train = y.iloc[train_idx] if hasattr(y, 'iloc') else y[train_idx]
+    X_test = X.iloc[test_idx] if hasattr(X, 'iloc') else X[test_idx]
+    y_test = y.iloc[test_idx] if hasattr(y, 'iloc') else y[test_idx]
+    model.fit(X_train, y_train)
+    return scorer(model, X_test, y_test)
+
+
+class SuccessiveHalvingSearch:
+    """
+    Successive halving over a parameter grid with an optional fit/time budget
+
+    The resource is either an estimator parameter (e.g. 'n_estimators') or
+    'n_samples' (size of the training subset). Each iteration scores all
+    surviving candidates with cross-validation and keeps the top 1/factor;
+    the resource grows by factor per iteration until max_resources.
+
+    With a TrialStore, candidates already scored at an iteration's resource
+    are not refitted, and each candidate is saved as soon as its folds finish.
+
+    Attributes set by fit():
+        best_params_, best_score_, best_estimator_ (if refit), cv_results_,
+        n_fits_, n_reused_, n_iterations_, elapsed_
+    """
+
+    def __init__(self, estimator, param_grid, scoring=None, cv=5, resource='n_estimators',
+                 factor=3, min_resources=None, max_resources=None, n_candidates=None,
+                 max_fits=None, time_budget=None, n_jobs=-1, random_state=None,
+                 refit=True, verbose=1, store=None):
+        """
+        Initialize the SuccessiveHalvingSearch
+
+        Args:
+            estimator: Unfitted scikit-learn compatible estimator
+            param_grid: Dict of parameter -> list of values. If resource is an
+                        estimator parameter listed here, its values are ignored
+                        (its maximum becomes the default max_resources)
+            scoring: Scoring name or callable (as in GridSearchCV)
+            cv: Number of folds or a CV splitter
+            resource: Estimator parameter used as resource or 'n_samples'
+            factor: Elimination rate and resource growth per iteration
+            min_resources: Lower bound on the resource of the first iteration.
+                           None uses 50 rows per fold ('n_samples') or 10
+            max_resources: Resource of the last iteration. None uses the largest
+                           grid value (estimator parameter) or all samples
+            n_candidates: Number of sampled candidates. None uses the full grid,
+                          unless max_fits is set, in which case it is derived from it
+            max_fits: Budget on the total number of model fits
+            time_budget: Budget on wall time in seconds. An iteration is only
+                         started if its estimated duration fits in the remaining time;
+                         the first iteration and the final refit always run
+            n_jobs: Number of parallel (candidate, fold) fits
+            random_state: Random seed for candidate sampling and subsampling
+            refit: Refit the best parameters on all data with max_resources
+            verbose: Verbosity level
+            store: Optional TrialStore to reuse and record scored candidates
+        """
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.resource = resource
+        self.factor = factor
+        self.min_resources = min_resources
+        self.max_resources = max_resources
+        self.n_candidates = n_candidates
+        self.max_fits = max_fits
+        self.time_budget = time_budget
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.refit = refit
+        self.verbose = verbose
+        self.store = store
+
+    def _candidates(self, n_splits):
+        """Build the initial list of parameter dicts"""
+        grid = {k: v for k, v in self.param_grid.items() if k != self.resource}
+        n_grid = len(ParameterGrid(grid))
+
+        n_candidates = self.n_candidates
+        if n_candidates is None and self.max_fits is not None:
+            # Total fits are about n0 * n_splits * (1 + 1/f + 1/f^2 + ...) <= max_fits
+            n_candidates = int(self.max_fits * (self.factor - 1) / (self.factor * n_splits))
+            n_candidates = max(n_candidates, 1)
+
+        if n_candidates is None or n_candidates >= n_grid:
+            return list(ParameterGrid(grid))
+        return list(ParameterSampler(grid, n_iter=n_candidates, random_state=self.random_state))
+
+    def _resource_schedule(self, n_candidates, n_samples, n_splits):
+        """Resources per iteration, ending at max_resources"""
+        if self.max_resources is not None:
+            max_resources = self.max_resources
+        elif self.resource == 'n_samples':
+            max_resources = n_samples
+        elif self.resource in self.param_grid:
+            max_resources = max(self.param_grid[self.resource])
+        else:
+            raise ValueError(f"max_resources is required for resource '{self.resource}'")
+
+        n_iterations = max(1, math.ceil(math.log(max(n_candidates, 1), self.factor)) + 1)
+        min_resources = self.min_resources
+        if min_resources is None:
+            # Keep the first iteration meaningful: enough rows per fold, or enough
+            # trees/iterations for scores to rank candidates
+            floor = 50 * n_splits if self.resource == 'n_samples' else 10
+            min_resources = min(max_resources, floor)
+        max_iterations = int(math.log(max_resources / min_resources, self.factor)) + 1
+        n_iterations = max(1, min(n_iterations, max_iterations))
+
+        # Anchor the schedule at max_resources and divide down by factor
+        resources = [max(max_resources / self.factor ** (n_iterations - 1 - i), min_resources)
+                     for i in range(n_iterations)]
+        return [max(1, int(round(r))) for r in resources]
+
+    def _iteration_data(self, X, y, n_resources, order):
+        """Training data and extra params for one iteration"""
+        if self.resource == 'n_samples':
+            idx = np.sort(order[:n_resources])
+            X_iter = X.iloc[idx] if hasattr(X, 'iloc') else X[idx]
+            y_iter = y.iloc[idx] if hasattr(y, 'iloc') else y[idx]
+            return X_iter, y_iter, {}
+        return X, y, {self.resource: n_resources}
+
+    def _trial_extra(self, n_resources):
+        """Key fields that identify the training subset of an 'n_samples' iteration"""
+        if self.resource == 'n_samples':
+            return {'n_samples': n_resources, 'subsample_seed': self.random_state}
+        return {}
+
+    def _score_candidates(self, candidates, extra, X_iter, y_iter, splits, scorer,
+                          context, n_resources):
+        """Fold scores (candidates x folds), reusing and recording stored trials"""
+        n_splits = len(splits)
+        scores = np.full((len(candidates), n_splits), np.nan)
+        configs = None
+        pending = list(range(len(candidates)))
+        if self.store is not None:
+            configs = [self.store.config(self.estimator, {**params, **extra},
+                                         self._trial_extra(n_resources))
+                       for params in candidates]
+            for i, fold_scores in self.store.lookup(context, configs).items():
+                scores[i] = fold_scores
+            pending = [i for i in range(len(candidates)) if np.isnan(scores[i]).any()]
+
+        results = Parallel(n_jobs=self.n_jobs, return_as='generator')(
+            delayed(_fit_and_score)(self.estimator, {**candidates[i], **extra}, X_iter, y_iter,
+                                    train_idx, test_idx, scorer)
+            for i in pending
+            for train_idx, test_idx in splits
+        )
+        buffer = []
+        for k, score in enumerate(results):
+            buffer.append(score)
+            if len(buffer) == n_splits:
+                i = pending[k // n_splits]
+                scores[i] = buffer
+                buffer = []
+                if self.store is not None:
+                    self.store.save(context, [configs[i]], [scores[i]])
+        return scores, len(pending)
+
+    def fit(self, X, y):
+        """
+        Run successive halving on X, y
+
+        Args:
+            X: Feature matrix
+            y: Target vector
+        """
+        start = time.perf_counter()
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        cv = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        n_splits = cv.get_n_splits(X, y)
+
+        candidates = self._candidates(n_splits)
+        resources = self._resource_schedule(len(candidates), len(X), n_splits)
+        order = np.random.RandomState(self.random_state).permutation(len(X))
+
+        context = None
+        if self.store is not None:
+            context = self.store.context(self.estimator, X, y, cv, self.scoring)
+
+        results = {'iter': [], 'n_resources': [], 'params': [],
+                   'mean_test_score': [], 'std_test_score': []}
+        self.n_fits_ = 0
+        self.n_reused_ = 0
+        self.n_iterations_ = 0
+        fit_seconds_per_resource = None
+        best_params, best_score = None, None
+
+        for iteration, n_resources in enumerate(resources):
+            n_fits = len(candidates) * n_splits
+            if self.max_fits is not None and self.n_fits_ + n_fits > self.max_fits and iteration > 0:
+                if self.verbose:
+                    print(f"  Stopping: iteration {iteration} needs {n_fits} fits, "
+                          f"budget leaves {self.max_fits - self.n_fits_}")
+                break
+            if self.time_budget is not None and fit_seconds_per_resource is not None:
+                estimate = fit_seconds_per_resource * n_resources * len(candidates)
+                remaining = self.time_budget - (time.perf_counter() - start)
+                if estimate > remaining:
+                    if self.verbose:
+                        print(f"  Stopping: iteration {iteration} needs ~{estimate:.1f}s, "
+                              f"{max(remaining, 0):.1f}s left in time budget")
+                    break
+
+            X_iter, y_iter, extra = self._iteration_data(X, y, n_resources, order)
+            splits = list(cv.split(X_iter, y_iter))
+            iter_start = time.perf_counter()
+            scores, n_fitted = self._score_candidates(candidates, extra, X_iter, y_iter, splits,
+                                                      scorer, context, n_resources)
+            iter_seconds = time.perf_counter() - iter_start
+            if n_fitted:
+                fit_seconds_per_resource = iter_seconds / (n_resources * n_fitted)
+            self.n_fits_ += n_fitted * n_splits
+            self.n_reused_ += len(candidates) - n_fitted
+            self.n_iterations_ = iteration + 1
+            means = scores.mean(axis=1)
+            stds = scores.std(axis=1)
+            for params, mean, std in zip(candidates, means, stds):
+                results['iter'].append(iteration)
+                results['n_resources'].append(n_resources)
+                results['params'].append({**params, **extra})
+                results['mean_test_score'].append(mean)
+                results['std_test_score'].append(std)
+
+            ranking = np.argsort(-means, kind='mergesort')
+            best_params = {**candidates[ranking[0]], **extra}
+            best_score = float(means[ranking[0]])
+            if self.verbose:
+                print(f"  Iteration {iteration}: {len(candidates)} candidates x {n_splits} folds, "
+                      f"{self.resource}={n_resources}, best score {best_score:.4f} "
+                      f"({iter_seconds:.1f}s)")
+
+            n_keep = max(1, math.ceil(len(candidates) / self.factor))
+            candidates = [candidates[i] for i in ranking[:n_keep]]
+
+        self.cv_results_ = results
+        self.best_params_ = best_params
+        self.best_score_ = best_score
+
+        if self.refit:
+            final_params = {k: v for k, v in best_params.items() if k != self.resource}
+            if self.resource != 'n_samples':
+                final_params[self.resource] = resources[-1]
+            self.best_estimator_ = clone(self.estimator).set_params(**final_params)
+            self.best_estimator_.fit(X, y)
+            self.best_params_ = final_params
+
+        self.elapsed_ = time.perf_counter() - start
+        return self
+
+    def top_results(self, n=5):
+        """Top n candidates of the last completed iteration"""
+        results = pd.DataFrame(self.cv_results_)
+        last = results[results['iter'] == results['iter'].max()]
+        return last.nlargest(n, 'mean_test_score')[['params', 'n_resources',
+                                                     'mean_test_score', 'std_test_score']]
@@ -0,0 +1,227 @@
+"""
+TPE Search Module
+Model-based (Tree-structured Parzen Estimator) search over a discrete
+parameter grid, with per-fold reporting and pruning of clearly bad trials
+after their first fold
+"""
+
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, check_cv
+
+from .successive_halving import _fit_and_score
+
+
+class TPESearchCV:
+    """
+    TPE search over a parameter grid with first-fold pruning
+
+    The first n_startup_trials configurations are drawn at random from the
+    grid. Afterwards, completed and pruned trials are split into the best
+    gamma share ("good") and the rest ("bad"); each parameter gets a smoothed
+    categorical density per side, and the next trial is the sampled
+    configuration with the highest l(x) / g(x). Every trial scores its first
+    fold alone; if that score is below the prune_quantile of the first-fold
+    scores of completed trials, the remaining folds are skipped.
+
+    Attributes set by fit():
+        best_params_, best_score_, best_estimator_ (if refit), cv_results_,
+        n_fits_, n_pruned_, n_reused_, elapsed_
+    """
+
+    def __init__(self, estimator, param_grid, scoring=None, cv=5, n_trials=50,
+                 n_startup_trials=10, gamma=0.25, n_ei_candidates=24, prune=True,
+                 prune_quantile=0.5, n_jobs=-1, random_state=None, refit=True,
+                 verbose=1, store=None):
+        """
+        Initialize the TPESearchCV
+
+        Args:
+            estimator: Unfitted scikit-learn compatible estimator
+            param_grid: Dict of parameter -> list of values
+            scoring: Scoring name or callable (as in GridSearchCV)
+            cv: Number of folds or a CV splitter
+            n_trials: Number of configurations to try (capped at the grid size)
+            n_startup_trials: Random trials before the TPE model is used
+            gamma: Share of trials treated as "good"
+            n_ei_candidates: Configurations sampled from l(x) per proposal
+            prune: Skip the remaining folds of trials whose first fold is clearly bad
+            prune_quantile: First-fold quantile of completed trials a trial must reach
+            n_jobs: Number of parallel fold fits after the first fold
+            random_state: Random seed for sampling
+            refit: Refit the best parameters on all data
+            verbose: Verbosity level (2 prints every fold score)
+            store: Optional TrialStore to reuse and record completed trials
+        """
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_trials = n_trials
+        self.n_startup_trials = n_startup_trials
+        self.gamma = gamma
+        self.n_ei_candidates = n_ei_candidates
+        self.prune = prune
+        self.prune_quantile = prune_quantile
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.refit = refit
+        self.verbose = verbose
+        self.store = store
+
+    def _random_config(self, rng, seen):
+        """Random unseen configuration as a tuple of value indices"""
+        sizes = [len(values) for values in self._values]
+        for _ in range(100):
+            config = tuple(int(rng.integers(size)) for size in sizes)
+            if config not in seen:
+                return config
+        # Dense sampling failed; pick among the unseen configurations directly
+        unseen = [c for c in np.ndindex(*sizes) if c not in seen]
+        return tuple(int(i) for i in unseen[rng.integers(len(unseen))])
+
+    def _tpe_config(self, rng, seen, trials):
+        """Unseen configuration maximising l(x) / g(x) among samples from l(x)"""
+        ranked = sorted(trials, key=lambda t: t['rank_score'], reverse=True)
+        n_good = max(1, math.ceil(self.gamma * len(ranked)))
+        good, bad = ranked[:n_good], ranked[n_good:]
+
+        log_ratio = []
+        good_densities = []
+        for p, values in enumerate(self._values):
+            # Counts with a +1 prior so unseen values keep some probability
+            good_density = np.ones(len(values))
+            bad_density = np.ones(len(values))
+            for t in good:
+                good_density[t['config'][p]] += 1
+            for t in bad:
+                bad_density[t['config'][p]] += 1
+            good_density /= good_density.sum()
+            bad_density /= bad_density.sum()
+            good_densities.append(good_density)
+            log_ratio.append(np.log(good_density) - np.log(bad_density))
+
+        best, best_value = None, -np.inf
+        for _ in range(self.n_ei_candidates):
+            config = tuple(int(rng.choice(len(density), p=density)) for density in good_densities)
+            if config in seen:
+                continue
+            value = sum(log_ratio[p][i] for p, i in enumerate(config))
+            if value > best_value:
+                best, best_value = config, value
+        return best if best is not None else self._random_config(rng, seen)
+
+    def _params(self, config):
+        return {name: self._values[p][i] for p, (name, i) in enumerate(zip(self._names, config))}
+
+    def fit(self, X, y):
+        """
+        Run the search on X, y
+
+        Args:
+            X: Feature matrix
+            y: Target vector
+        """
+        start = time.perf_counter()
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        cv = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        splits = list(cv.split(X, y))
+        rng = np.random.default_rng(self.random_state)
+
+        self._names = sorted(self.param_grid)
+        self._values = [list(self.param_grid[name]) for name in self._names]
+        n_trials = min(self.n_trials, len(ParameterGrid(self.param_grid)))
+        context = None
+        if self.store is not None:
+            context = self.store.context(self.estimator, X, y, cv, self.scoring)
+
+        trials = []
+        seen = set()
+        self.n_fits_ = 0
+        self.n_pruned_ = 0
+        self.n_reused_ = 0
+        for number in range(n_trials):
+            if len(trials) < self.n_startup_trials:
+                config = self._random_config(rng, seen)
+            else:
+                config = self._tpe_config(rng, seen, trials)
+            seen.add(config)
+            params = self._params(config)
+
+            stored = None
+            if self.store is not None:
+                store_config = self.store.config(self.estimator, params)
+                stored = self.store.lookup(context, [store_config]).get(0)
+
+            if stored is not None:
+                fold_scores, state = list(stored), 'complete'
+                self.n_reused_ += 1
+            else:
+                train_idx, test_idx = splits[0]
+                fold_scores = [_fit_and_score(self.estimator, params, X, y,
+                                              train_idx, test_idx, scorer)]
+                self.n_fits_ += 1
+                state = 'complete'
+                completed_first = [t['fold_scores'][0] for t in trials if t['state'] == 'complete']
+                if (self.prune and len(completed_first) >= max(1, self.n_startup_trials)
+                        and fold_scores[0] < np.quantile(completed_first, self.prune_quantile)):
+                    state = 'pruned'
+                    self.n_pruned_ += 1
+                else:
+                    fold_scores += Parallel(n_jobs=self.n_jobs)(
+                        delayed(_fit_and_score)(self.estimator, params, X, y,
+                                                train_idx, test_idx, scorer)
+                        for train_idx, test_idx in splits[1:]
+                    )
+                    self.n_fits_ += len(splits) - 1
+                    if self.store is not None:
+                        self.store.save(context, [store_config], [fold_scores])
+
+            mean = float(np.mean(fold_scores))
+            trials.append({
+                'number': number,
+                'config': config,
+                'params': params,
+                'state': state,
+                'fold_scores': fold_scores,
+                'mean_test_score': mean,
+                'std_test_score': float(np.std(fold_scores)),
+                # Pruned trials only count through their (bad) first fold
+                'rank_score': mean if state == 'complete' else fold_scores[0],
+                'n_fits': self.n_fits_,
+            })
+            if self.verbose > 1:
+                folds = ', '.join(f"{s:.4f}" for s in fold_scores)
+                print(f"  Trial {number} [{state}] folds: {folds}")
+            elif self.verbose:
+                print(f"  Trial {number} [{state}] score {mean:.4f}")
+
+        completed = [t for t in trials if t['state'] == 'complete']
+        best = max(completed, key=lambda t: t['mean_test_score'])
+        self.cv_results_ = {
+            key: [t[key] for t in trials]
+            for key in ('number', 'params', 'state', 'fold_scores',
+                        'mean_test_score', 'std_test_score', 'n_fits')
+        }
+        self.best_params_ = best['params']
+        self.best_score_ = best['mean_test_score']
+
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            self.best_estimator_.fit(X, y)
+
+        self.elapsed_ = time.perf_counter() - start
+        return self
+
+    def top_results(self, n=5):
+        """Top n completed trials"""
+        results = pd.DataFrame(self.cv_results_)
+        completed = results[results['state'] == 'complete']
+        return completed.nlargest(n, 'mean_test_score')[['params', 'mean_test_score',
+                                                         'std_test_score']]
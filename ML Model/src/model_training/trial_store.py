@@ -0,0 +1,156 @@
+"""
+Trial Store Module
+Persistent store of cross-validated tuning trials (SQLite, output/ by default)
+
+Each trial is keyed by the estimator class and its effective parameters, a
+fingerprint of the training data, the CV scheme and the scoring. Searches
+look trials up before fitting, so an interrupted search resumes where it
+stopped and a new search reuses every configuration already scored on the
+same data.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_PATH = 'output/tuning_trials.sqlite'
+
+# Parameters that change speed or logging but not the fitted model
+_IGNORED_PARAMS = {'n_jobs', 'nthread', 'verbose', 'verbosity', 'warm_start'}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    key TEXT PRIMARY KEY,
+    estimator TEXT NOT NULL,
+    params TEXT NOT NULL,
+    data_fingerprint TEXT NOT NULL,
+    cv_scheme TEXT NOT NULL,
+    scoring TEXT NOT NULL,
+    mean_test_score REAL NOT NULL,
+    std_test_score REAL NOT NULL,
+    fold_scores TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+
+def data_fingerprint(X, y):
+    """Stable hash of the feature matrix and target (values, dtypes and column names)"""
+    digest = hashlib.sha1()
+    for part in (X, y):
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+            if isinstance(part, pd.DataFrame):
+                schema = list(zip(part.columns, part.dtypes))
+            else:
+                schema = [(part.name, part.dtype)]
+            digest.update(repr([(str(n), str(t)) for n, t in schema]).encode())
+        else:
+            array = np.ascontiguousarray(part)
+            digest.update(repr((array.shape, str(array.dtype))).encode())
+            digest.update(array.tobytes() if array.dtype != object else repr(array.tolist()).encode())
+    return digest.hexdigest()
+
+
+def _to_json(value):
+    return json.dumps(value, sort_keys=True, default=repr)
+
+
+class TrialStore:
+    """SQLite-backed store of (configuration, data, CV scheme) -> CV scores"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        """
+        Initialize the TrialStore
+
+        Args:
+            path: SQLite file; created (with its directory) if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def context(estimator, X, y, cv, scoring):
+        """Search-wide part of the trial key: estimator class, data, CV scheme and scoring"""
+        return {
+            'estimator': type(estimator).__name__,
+            'data_fingerprint': data_fingerprint(X, y),
+            'cv_scheme': repr(cv),
+            'scoring': repr(scoring),
+        }
+
+    @staticmethod
+    def config(estimator, params, extra=None):
+        """Effective parameters of estimator with params applied, minus speed/logging options"""
+        config = {**estimator.get_params(deep=False), **params, **(extra or {})}
+        return {k: v for k, v in config.items() if k not in _IGNORED_PARAMS}
+
+    @staticmethod
+    def key(context, config):
+        payload = _to_json({**context, 'params': config})
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def lookup(self, context, configs):
+        """Map config index -> (fold scores) for configs already in the store"""
+        keys = [self.key(context, config) for config in configs]
+        found = {}
+        with self._connect() as conn:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, fold_scores FROM trials WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                found.update({key: json.loads(scores) for key, scores in rows})
+        return {i: np.asarray(found[key], dtype=float) for i, key in enumerate(keys) if key in found}
+
+    def save(self, context, configs, fold_scores):
+        """Store the fold scores of each config (one row per config)"""
+        rows = []
+        now = time.time()
+        for config, scores in zip(configs, fold_scores):
+            scores = np.asarray(scores, dtype=float)
+            rows.append((
+                self.key(context, config), context['estimator'], _to_json(config),
+                context['data_fingerprint'], context['cv_scheme'], context['scoring'],
+                float(scores.mean()), float(scores.std()), _to_json(scores.tolist()), now,
+            ))
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def best_trials(self, n=10, estimator=None, data_fingerprint=None):
+        """Top n trials by mean test score as a DataFrame"""
+        query = ("SELECT estimator, mean_test_score, std_test_score, params, "
+                 "data_fingerprint, cv_scheme, scoring, created_at FROM trials")
+        filters, args = [], []
+        if estimator:
+            filters.append("estimator = ?")
+            args.append(estimator)
+        if data_fingerprint:
+            filters.append("data_fingerprint LIKE ?")
+            args.append(f"{data_fingerprint}%")
+        if filters:
+            query += " WHERE " + " AND ".join(filters)
+        query += " ORDER BY mean_test_score DESC LIMIT ?"
+        args.append(int(n))
+        with self._connect() as conn:
+            trials = pd.read_sql_query(query, conn, params=args)
+        trials['created_at'] = pd.to_datetime(trials['created_at'], unit='s')
+        return trials
@@ -3,6 +3,7 @@ Visualization and integration modules
 """
 
 from .visualization_integration import VisualizationDashboard, PredictionAPI
+from .hotspot_tiles import HotspotPyramid
 
-__all__ = ['VisualizationDashboard', 'PredictionAPI']
+__all__ = ['VisualizationDashboard', 'PredictionAPI', 'HotspotPyramid']
 
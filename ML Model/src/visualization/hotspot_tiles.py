@@ -0,0 +1,216 @@
+"""
+Hotspot Tiles Module
+Pre-computed multi-resolution accident hotspot pyramid for map dashboards:
+- Accidents are counted per Web Mercator grid cell at every zoom level
+  (optionally per hour of week), with a count per severity level
+- The finest level is aggregated from the raw rows once; every coarser level
+  is aggregated from the level below, so building costs one pass over the data
+- Levels are stored sorted by cell column, so a bbox/zoom/time query is a
+  binary search plus a few masks over the cells in view (milliseconds)
+- The pyramid is saved as one compressed .npz file
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+def _tile_xy(lat, lon, zoom):
+    """Web Mercator (slippy map) cell column and row of each point at zoom"""
+    n = 2 ** zoom
+    lat = np.clip(np.asarray(lat, dtype=float), -85.05112878, 85.05112878)
+    x = np.floor((np.asarray(lon, dtype=float) + 180.0) / 360.0 * n)
+    y = np.floor((1.0 - np.arcsinh(np.tan(np.radians(lat))) / np.pi) / 2.0 * n)
+    return np.clip(x, 0, n - 1).astype(np.int64), np.clip(y, 0, n - 1).astype(np.int64)
+
+
+def _tile_center(x, y, zoom):
+    """Latitude and longitude of the center of cells (x, y) at zoom"""
+    n = 2 ** zoom
+    lon = (np.asarray(x) + 0.5) / n * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (np.asarray(y) + 0.5) / n))))
+    return lat, lon
+
+
+def _aggregate(x, y, hour, counts):
+    """
+    Sum counts rows sharing (x, y, hour)
+
+    Returns:
+        (x, y, hour, counts) per distinct cell, sorted by x, y, hour
+    """
+    keys = np.column_stack([x, y] if hour is None else [x, y, hour])
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    summed = np.zeros((len(unique), counts.shape[1]), dtype=np.int64)
+    np.add.at(summed, inverse, counts)
+    return (unique[:, 0], unique[:, 1], None if hour is None else unique[:, 2], summed)
+
+
+class HotspotPyramid:
+    """Accident counts per map cell, per zoom level (and optionally per hour of week)"""
+
+    def __init__(self, levels, severity_levels, min_zoom, max_zoom, cell_detail, by_hour_of_week):
+        """
+        Initialize the HotspotPyramid (use build() or load())
+
+        Args:
+            levels: {zoom: {'x', 'y', 'hour' (or None), 'counts'}} arrays per level
+            severity_levels: Severity label of each counts column
+            min_zoom, max_zoom: Map zoom levels covered
+            cell_detail: Cells per map tile side are 2 ** cell_detail
+            by_hour_of_week: Whether cells are split by hour of week (0 = Monday 00h)
+        """
+        self.levels = levels
+        self.severity_levels = list(severity_levels)
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.cell_detail = cell_detail
+        self.by_hour_of_week = by_hour_of_week
+
+    @classmethod
+    def build(cls, df, lat_col, lon_col, severity_col=None, timestamp_col=None,
+              min_zoom=3, max_zoom=16, cell_detail=3, by_hour_of_week=False):
+        """
+        Build the pyramid from accident rows
+
+        Args:
+            df: DataFrame with accident data
+            lat_col, lon_col: Coordinate columns
+            severity_col: Severity column (optional; counts per severity level)
+            timestamp_col: Timestamp column (required for by_hour_of_week)
+            min_zoom, max_zoom: Map zoom levels to pre-compute
+            cell_detail: Cells per map tile side are 2 ** cell_detail (3 gives 32px cells)
+            by_hour_of_week: Also split every cell by hour of week
+
+        Returns:
+            HotspotPyramid
+        """
+        lat = pd.to_numeric(df[lat_col], errors='coerce').to_numpy(dtype=float)
+        lon = pd.to_numeric(df[lon_col], errors='coerce').to_numpy(dtype=float)
+        valid = np.isfinite(lat) & np.isfinite(lon)
+
+        hour = None
+        if by_hour_of_week:
+            if not timestamp_col:
+                raise ValueError("by_hour_of_week needs a timestamp column.")
+            timestamps = pd.to_datetime(df[timestamp_col], errors='coerce')
+            valid &= timestamps.notna().to_numpy()
+            hour = (timestamps.dt.dayofweek * 24 + timestamps.dt.hour).to_numpy()[valid].astype(np.int64)
+
+        if severity_col:
+            codes, severity_levels = pd.factorize(df[severity_col].astype(str)[valid], sort=True)
+            severity_levels = list(severity_levels)
+        else:
+            codes, severity_levels = np.zeros(valid.sum(), dtype=np.int64), ['all']
+        counts = np.zeros((len(codes), len(severity_levels)), dtype=np.int64)
+        counts[np.arange(len(codes)), codes] = 1
+
+        # Finest level from the rows, each coarser level from the one below
+        x, y = _tile_xy(lat[valid], lon[valid], max_zoom + cell_detail)
+        levels = {}
+        for zoom in range(max_zoom, min_zoom - 1, -1):
+            if zoom < max_zoom:
+                x, y = x // 2, y // 2
+            x, y, hour, counts = _aggregate(x, y, hour, counts)
+            levels[zoom] = {'x': x, 'y': y, 'hour': hour, 'counts': counts}
+
+        return cls(levels, severity_levels, min_zoom, max_zoom, cell_detail, by_hour_of_week)
+
+    def save(self, path):
+        """Save the pyramid to a compressed .npz file"""
+        arrays = {}
+        for zoom, level in self.levels.items():
+            arrays[f'z{zoom}_x'] = level['x'].astype(np.uint32)
+            arrays[f'z{zoom}_y'] = level['y'].astype(np.uint32)
+            arrays[f'z{zoom}_counts'] = level['counts'].astype(np.uint32)
+            if level['hour'] is not None:
+                arrays[f'z{zoom}_hour'] = level['hour'].astype(np.uint8)
+        meta = {
+            'severity_levels': self.severity_levels,
+            'min_zoom': self.min_zoom,
+            'max_zoom': self.max_zoom,
+            'cell_detail': self.cell_detail,
+            'by_hour_of_week': self.by_hour_of_week,
+        }
+        np.savez_compressed(path, meta=np.array(json.dumps(meta)), **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Load a pyramid saved with save()"""
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            levels = {}
+            for zoom in range(meta['min_zoom'], meta['max_zoom'] + 1):
+                hour_key = f'z{zoom}_hour'
+                levels[zoom] = {
+                    'x': data[f'z{zoom}_x'].astype(np.int64),
+                    'y': data[f'z{zoom}_y'].astype(np.int64),
+                    'hour': data[hour_key].astype(np.int64) if hour_key in data.files else None,
+                    'counts': data[f'z{zoom}_counts'].astype(np.int64),
+                }
+        return cls(levels, meta['severity_levels'], meta['min_zoom'], meta['max_zoom'],
+                   meta['cell_detail'], meta['by_hour_of_week'])
+
+    def query(self, zoom, bbox=None, severities=None, days=None, hours=None):
+        """
+        Hotspot cells in view
+
+        Args:
+            zoom: Map zoom level (clamped to the pre-computed range)
+            bbox: (min_lon, min_lat, max_lon, max_lat) or None for everything
+            severities: Severity labels to count (default: all)
+            days: Days of week to include (0 = Monday; needs by_hour_of_week)
+            hours: Hours of day to include (needs by_hour_of_week)
+
+        Returns:
+            DataFrame with x, y, lat, lon (cell center), count and one
+            count column per selected severity level, cells with no matching
+            accidents dropped
+        """
+        zoom = int(min(max(zoom, self.min_zoom), self.max_zoom))
+        cell_zoom = zoom + self.cell_detail
+        level = self.levels[zoom]
+        x, y, hour, counts = level['x'], level['y'], level['hour'], level['counts']
+
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            x_lo, y_hi = _tile_xy(min_lat, min_lon, cell_zoom)
+            x_hi, y_lo = _tile_xy(max_lat, max_lon, cell_zoom)
+            start, stop = np.searchsorted(x, [x_lo, x_hi + 1])
+            in_rows = (y[start:stop] >= y_lo) & (y[start:stop] <= y_hi)
+            rows = np.flatnonzero(in_rows) + start
+        else:
+            rows = np.arange(len(x))
+
+        if days is not None or hours is not None:
+            if hour is None:
+                raise ValueError("This pyramid was built without by_hour_of_week.")
+            selected = hour[rows]
+            mask = np.ones(len(rows), dtype=bool)
+            if days is not None:
+                mask &= np.isin(selected // 24, list(days))
+            if hours is not None:
+                mask &= np.isin(selected % 24, list(hours))
+            rows = rows[mask]
+
+        columns = list(range(len(self.severity_levels)))
+        if severities is not None:
+            wanted = {str(s) for s in severities}
+            columns = [i for i, label in enumerate(self.severity_levels) if label in wanted]
+
+        x, y, cell_counts = x[rows], y[rows], counts[np.ix_(rows, columns)]
+        if hour is not None and len(rows):
+            # Rows are sorted by cell, so each cell's hours are one contiguous run
+            starts = np.flatnonzero(np.r_[True, (np.diff(x) != 0) | (np.diff(y) != 0)])
+            x, y = x[starts], y[starts]
+            cell_counts = np.add.reduceat(cell_counts, starts, axis=0)
+
+        lat, lon = _tile_center(x, y, cell_zoom)
+        result = pd.DataFrame({'x': x, 'y': y, 'lat': lat, 'lon': lon,
+                               'count': cell_counts.sum(axis=1)})
+        for i, column in enumerate(columns):
+            result[f'severity_{self.severity_levels[column]}'] = cell_counts[:, i]
+        return result[result['count'] > 0].reset_index(drop=True)
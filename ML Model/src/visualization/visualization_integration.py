@@ -10,16 +10,17 @@ Creates interactive dashboard system with:
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
 import warnings
+from src.evaluation.plot_renderer import PlotRenderer
+from src.visualization.hotspot_tiles import HotspotPyramid
 warnings.filterwarnings('ignore')
 
 # Try to import optional dependencies
 try:
     import folium
-    from folium.plugins import HeatMap, MarkerCluster
+    from folium.plugins import HeatMap, FastMarkerCluster
     FOLIUM_AVAILABLE = True
 except ImportError:
     FOLIUM_AVAILABLE = False
@@ -42,10 +43,105 @@ except ImportError:
     print("Warning: flask not available. Install with: pip install flask")
 
 
+def _draw_demand_time_series(fig, index, values, rolling_avg, window_size, distribution, frequency):
+    """Draw the demand chart (module-level so PlotRenderer can run it in a worker process)"""
+    axes = fig.subplots(2, 1)
+    
+    # Time series plot
+    axes[0].plot(index, values, linewidth=2, color='steelblue')
+    axes[0].set_title(f'Accident Demand Over Time ({frequency})', fontsize=14, fontweight='bold')
+    axes[0].set_xlabel('Time', fontsize=12)
+    axes[0].set_ylabel('Number of Accidents', fontsize=12)
+    axes[0].grid(alpha=0.3)
+    
+    if rolling_avg is not None:
+        axes[0].plot(*rolling_avg, linewidth=2, color='red', linestyle='--',
+                     label=f'{window_size}-period average')
+        axes[0].legend()
+    
+    if frequency == 'H':
+        axes[1].bar(distribution.index, distribution.values, color='coral', alpha=0.7)
+        axes[1].set_title('Accident Distribution by Hour of Day', fontsize=14, fontweight='bold')
+        axes[1].set_xlabel('Hour of Day', fontsize=12)
+        axes[1].set_ylabel('Number of Accidents', fontsize=12)
+        axes[1].grid(axis='y', alpha=0.3)
+    elif frequency == 'D':
+        axes[1].bar(range(7), distribution.values, color='coral', alpha=0.7)
+        axes[1].set_xticks(range(7))
+        axes[1].set_xticklabels(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+        axes[1].set_title('Accident Distribution by Day of Week', fontsize=14, fontweight='bold')
+        axes[1].set_ylabel('Number of Accidents', fontsize=12)
+        axes[1].grid(axis='y', alpha=0.3)
+    
+    fig.tight_layout()
+
+
+# Leaflet callback drawing one [lat, lon, color, popup] row as a circle marker
+_CIRCLE_MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+                                {radius: 5, color: row[2], fill: true, fillColor: row[2]});
+    marker.bindPopup(row[3]);
+    return marker;
+}
+"""
+
+
+def _grid_bins(lat, lon, cell_size):
+    """
+    Points aggregated into square grid cells of cell_size degrees
+    
+    Returns:
+        (lat, lon, count) per occupied cell, positioned at the cell's centroid
+    """
+    row = np.floor(lat / cell_size).astype(np.int64)
+    col = np.floor(lon / cell_size).astype(np.int64)
+    row -= row.min()
+    col -= col.min()
+    _, inverse, counts = np.unique(row * (col.max() + 1) + col, return_inverse=True,
+                                   return_counts=True)
+    inverse = inverse.ravel()
+    return (np.bincount(inverse, weights=lat) / counts,
+            np.bincount(inverse, weights=lon) / counts,
+            counts.astype(float))
+
+
+def _heat_weights(counts):
+    """
+    HeatMap intensities in (0, 1] for per-cell accident counts
+    
+    Leaflet.heat clamps intensities at max=1, so raw counts would saturate
+    every cell; a log scale keeps a cell with thousands of accidents
+    distinguishable from one with a handful.
+    """
+    counts = np.asarray(counts, dtype=float)
+    return np.log1p(counts) / np.log1p(max(counts.max(initial=0), 1))
+
+
+def _heat_points(lat, lon, max_points, cell_size=None):
+    """
+    HeatMap data: the raw [lat, lon] points, or [lat, lon, weight] grid bins
+    when there are more than max_points (the cell size doubles until the
+    occupied cells fit; weights are log-scaled counts)
+    """
+    if max_points is None or len(lat) <= max_points:
+        return np.column_stack([lat, lon]).tolist()
+    
+    if cell_size is None:
+        span = max(np.ptp(lat), np.ptp(lon), 1e-6)
+        cell_size = span / np.sqrt(max_points)
+    while True:
+        bin_lat, bin_lon, counts = _grid_bins(lat, lon, cell_size)
+        if len(counts) <= max_points:
+            return np.column_stack([bin_lat, bin_lon, _heat_weights(counts)]).tolist()
+        cell_size *= 2
+
+
 class VisualizationDashboard:
     """Interactive dashboard for accident data visualization"""
     
-    def __init__(self, df, lat_col=None, lon_col=None, timestamp_col=None, severity_col=None):
+    def __init__(self, df, lat_col=None, lon_col=None, timestamp_col=None, severity_col=None,
+                 renderer=None, hotspots=None):
         """
         Initialize the VisualizationDashboard
         
@@ -55,8 +151,13 @@ class VisualizationDashboard:
             lon_col: Name of longitude column
             timestamp_col: Name of timestamp column
             severity_col: Name of severity column
+            renderer: PlotRenderer for matplotlib charts (default: headless, immediate)
+            hotspots: Pre-computed HotspotPyramid (or path to one) used by the
+                      heatmaps when no date range is given
         """
-        self.df = df.copy()
+        self.df = df
+        self.renderer = renderer or PlotRenderer()
+        self.hotspots = HotspotPyramid.load(hotspots) if isinstance(hotspots, str) else hotspots
         
         # Auto-detect columns
         self.lat_col = lat_col or self._detect_column(['latitude', 'lat', 'Latitude', 'LAT', 'y'])
@@ -64,10 +165,24 @@ class VisualizationDashboard:
         self.timestamp_col = timestamp_col or self._detect_column(['timestamp', 'datetime', 'date', 'time'])
         self.severity_col = severity_col or self._detect_column(['severity', 'Severity', 'SEVERITY'])
         
-        # Ensure timestamp is datetime
+        # Ensure timestamp is datetime, and keep the rows sorted by it (missing
+        # timestamps last) so date ranges are contiguous slices
+        self._times = None
         if self.timestamp_col and self.timestamp_col in self.df.columns:
             if not pd.api.types.is_datetime64_any_dtype(self.df[self.timestamp_col]):
-                self.df[self.timestamp_col] = pd.to_datetime(self.df[self.timestamp_col], errors='coerce')
+                self.df = self.df.assign(**{
+                    self.timestamp_col: pd.to_datetime(self.df[self.timestamp_col], errors='coerce')
+                })
+            self.df = self.df.sort_values(self.timestamp_col, kind='stable', na_position='last')
+            timestamps = self.df[self.timestamp_col]
+            self._times = timestamps.iloc[:int(timestamps.notna().sum())]
+        else:
+            self.df = self.df.copy()
+        
+        # Severity category index: one integer code per row
+        self._severity_codes = None
+        if self.severity_col and self.severity_col in self.df.columns:
+            self._severity_codes, self._severity_levels = pd.factorize(self.df[self.severity_col])
     
     def _detect_column(self, candidates):
         """Auto-detect column from candidates"""
@@ -78,8 +193,35 @@ class VisualizationDashboard:
     
     # ==================== HEATMAP VISUALIZATIONS ====================
     
+    def build_hotspots(self, save_path=None, **kwargs):
+        """
+        Pre-compute the hotspot pyramid used by the heatmaps
+        
+        Args:
+            save_path: Optional .npz path to save the pyramid to
+            **kwargs: Passed to HotspotPyramid.build (min_zoom, max_zoom,
+                      cell_detail, by_hour_of_week)
+        
+        Returns:
+            HotspotPyramid
+        """
+        self.hotspots = HotspotPyramid.build(self.df, self.lat_col, self.lon_col,
+                                             severity_col=self.severity_col,
+                                             timestamp_col=self.timestamp_col, **kwargs)
+        if save_path:
+            self.hotspots.save(save_path)
+            print(f"✓ Saved hotspot pyramid to {save_path}")
+        return self.hotspots
+    
+    def _hotspot_cells(self, severity_filter, date_range, zoom):
+        """Pre-computed cells for the heatmap, or None when they cannot answer the filter"""
+        if self.hotspots is None or date_range:
+            return None
+        return self.hotspots.query(zoom, severities=severity_filter)
+    
     def create_heatmap_folium(self, severity_filter=None, date_range=None, 
-                              save_path='accident_heatmap.html'):
+                              save_path='accident_heatmap.html', max_heat_points=50000,
+                              cell_size=None, max_markers=1000):
         """
         Create heatmap using folium
         
@@ -87,6 +229,10 @@ class VisualizationDashboard:
             severity_filter: List of severity levels to include (e.g., ['High', 'Critical'])
             date_range: Tuple of (start_date, end_date) for filtering
             save_path: Path to save HTML file
+            max_heat_points: Most heatmap points embedded; larger inputs are
+                             aggregated into count-weighted grid bins
+            cell_size: Initial grid cell size in degrees (default: from the data extent)
+            max_markers: Most individual accident markers shown
         """
         if not FOLIUM_AVAILABLE:
             print("Error: folium is not installed. Install with: pip install folium")
@@ -99,37 +245,34 @@ class VisualizationDashboard:
             print("No data to visualize after filtering.")
             return None
         
+        lat = df_filtered[self.lat_col].to_numpy(dtype=float)
+        lon = df_filtered[self.lon_col].to_numpy(dtype=float)
+        valid = np.isfinite(lat) & np.isfinite(lon)
+        if not valid.any():
+            print("No data to visualize after filtering.")
+            return None
+        
         # Calculate center of map
-        center_lat = df_filtered[self.lat_col].mean()
-        center_lon = df_filtered[self.lon_col].mean()
+        center_lat = lat[valid].mean()
+        center_lon = lon[valid].mean()
         
         # Create map
         m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
         
-        # Prepare heatmap data
-        heat_data = [[row[self.lat_col], row[self.lon_col]] 
-                     for idx, row in df_filtered.iterrows()]
-        
-        # Add heatmap
+        # Add heatmap: pre-computed hotspot cells when available, otherwise grid
+        # bins weighted by log-scaled count once there are more than max_heat_points
+        cells = self._hotspot_cells(severity_filter, date_range, zoom=12)
+        if cells is not None:
+            heat_data = np.column_stack([cells['lat'], cells['lon'],
+                                         _heat_weights(cells['count'])]).tolist()
+        else:
+            heat_data = _heat_points(lat[valid], lon[valid], max_heat_points, cell_size)
         HeatMap(heat_data, radius=15, blur=10, max_zoom=1).add_to(m)
         
-        # Add marker cluster for individual accidents
-        marker_cluster = MarkerCluster().add_to(m)
-        for idx, row in df_filtered.head(1000).iterrows():  # Limit to 1000 for performance
-            severity = row.get(self.severity_col, 'Unknown') if self.severity_col else 'Unknown'
-            popup_text = f"Severity: {severity}"
-            if self.timestamp_col:
-                popup_text += f"<br>Time: {row[self.timestamp_col]}"
-            
-            color = self._get_severity_color(severity)
-            folium.CircleMarker(
-                location=[row[self.lat_col], row[self.lon_col]],
-                radius=5,
-                popup=popup_text,
-                color=color,
-                fill=True,
-                fillColor=color
-            ).add_to(marker_cluster)
+        # Add one clustered marker layer for individual accidents
+        markers = df_filtered[valid].head(max_markers)
+        if len(markers):
+            self._marker_layer(markers, with_time=True).add_to(m)
         
         # Save map
         m.save(save_path)
@@ -150,6 +293,29 @@ class VisualizationDashboard:
             print("Error: plotly is not installed. Install with: pip install plotly")
             return None
         
+        # Pre-computed hotspot cells, weighted by accident count
+        cells = self._hotspot_cells(severity_filter, date_range, zoom=11)
+        if cells is not None:
+            if len(cells) == 0:
+                print("No data to visualize after filtering.")
+                return None
+            weights = cells['count']
+            fig = px.density_mapbox(
+                cells,
+                lat='lat',
+                lon='lon',
+                z='count',
+                radius=10,
+                center=dict(lat=np.average(cells['lat'], weights=weights),
+                            lon=np.average(cells['lon'], weights=weights)),
+                zoom=11,
+                mapbox_style="open-street-map",
+                title="Accident Hotspots Heatmap"
+            )
+            fig.write_html(save_path)
+            print(f"✓ Saved plotly heatmap to {save_path}")
+            return fig
+        
         # Filter data
         df_filtered = self._filter_data(severity_filter, date_range)
         
@@ -178,7 +344,7 @@ class VisualizationDashboard:
     # ==================== AMBULANCE LOCATIONS & ROUTES ====================
     
     def plot_ambulance_locations(self, ambulance_locations, accident_locations=None,
-                                save_path='ambulance_map.html'):
+                                save_path='ambulance_map.html', max_markers=5000):
         """
         Plot ambulance locations and nearby accidents
         
@@ -186,6 +352,7 @@ class VisualizationDashboard:
             ambulance_locations: DataFrame with columns [lat, lon, ambulance_id] or list of tuples
             accident_locations: DataFrame with accident locations (optional)
             save_path: Path to save HTML file
+            max_markers: Most accident markers shown
         """
         if not FOLIUM_AVAILABLE:
             print("Error: folium is not installed.")
@@ -204,26 +371,19 @@ class VisualizationDashboard:
         # Create map
         m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
         
-        # Add ambulance locations
-        for idx, row in ambulance_df.iterrows():
+        # Add ambulance locations (few, so one icon marker each)
+        ids = ambulance_df['ambulance_id'] if 'ambulance_id' in ambulance_df.columns else ambulance_df.index
+        for lat, lon, ambulance_id in zip(ambulance_df['lat'].to_numpy(), ambulance_df['lon'].to_numpy(),
+                                          ids.to_numpy()):
             folium.Marker(
-                location=[row['lat'], row['lon']],
-                popup=f"Ambulance {row.get('ambulance_id', idx)}",
+                location=[lat, lon],
+                popup=f"Ambulance {ambulance_id}",
                 icon=folium.Icon(color='green', icon='ambulance', prefix='fa')
             ).add_to(m)
         
         # Add accident locations if provided
-        if accident_locations is not None:
-            for idx, row in accident_locations.iterrows():
-                severity = row.get(self.severity_col, 'Unknown') if self.severity_col else 'Unknown'
-                color = self._get_severity_color(severity)
-                folium.CircleMarker(
-                    location=[row[self.lat_col], row[self.lon_col]],
-                    radius=5,
-                    popup=f"Severity: {severity}",
-                    color=color,
-                    fill=True
-                ).add_to(m)
+        if accident_locations is not None and len(accident_locations):
+            self._marker_layer(accident_locations.head(max_markers)).add_to(m)
         
         m.save(save_path)
         print(f"✓ Saved ambulance map to {save_path}")
@@ -284,6 +444,9 @@ class VisualizationDashboard:
         """
         Plot time-series chart for demand prediction
         
+        The series is aggregated here and decimated to the renderer's
+        max_points before drawing.
+        
         Args:
             frequency: Time frequency ('H' for hourly, 'D' for daily, 'W' for weekly)
             severity_filter: List of severity levels to include
@@ -292,6 +455,8 @@ class VisualizationDashboard:
         if not self.timestamp_col or self.timestamp_col not in self.df.columns:
             print("Error: Timestamp column not found.")
             return None
+        if not self.renderer.enabled:
+            return None
         
         # Filter data
         df_filtered = self._filter_data(severity_filter, date_range=None)
@@ -301,77 +466,86 @@ class VisualizationDashboard:
             return None
         
         # Resample by frequency
-        df_filtered = df_filtered.set_index(self.timestamp_col)
-        demand_series = df_filtered.resample(frequency).size()
-        
-        # Create plot
-        fig, axes = plt.subplots(2, 1, figsize=(15, 10))
-        
-        # Time series plot
-        axes[0].plot(demand_series.index, demand_series.values, linewidth=2, color='steelblue')
-        axes[0].set_title(f'Accident Demand Over Time ({frequency})', fontsize=14, fontweight='bold')
-        axes[0].set_xlabel('Time', fontsize=12)
-        axes[0].set_ylabel('Number of Accidents', fontsize=12)
-        axes[0].grid(alpha=0.3)
+        timestamps = df_filtered[self.timestamp_col]
+        demand_series = pd.Series(1, index=pd.DatetimeIndex(timestamps)).resample(frequency).size()
         
         # Rolling average
+        rolling_avg = None
         window_size = min(24, len(demand_series) // 10)  # Adaptive window
         if window_size > 1:
             rolling_avg = demand_series.rolling(window=window_size, center=True).mean()
-            axes[0].plot(rolling_avg.index, rolling_avg.values, 
-                        linewidth=2, color='red', linestyle='--', label=f'{window_size}-period average')
-            axes[0].legend()
         
         # Distribution by hour/day
+        distribution = None
         if frequency == 'H':
-            df_filtered['hour'] = df_filtered.index.hour
-            hourly_dist = df_filtered.groupby('hour').size()
-            axes[1].bar(hourly_dist.index, hourly_dist.values, color='coral', alpha=0.7)
-            axes[1].set_title('Accident Distribution by Hour of Day', fontsize=14, fontweight='bold')
-            axes[1].set_xlabel('Hour of Day', fontsize=12)
-            axes[1].set_ylabel('Number of Accidents', fontsize=12)
-            axes[1].grid(axis='y', alpha=0.3)
+            distribution = timestamps.dt.hour.value_counts().sort_index()
         elif frequency == 'D':
-            df_filtered['day_of_week'] = df_filtered.index.dayofweek
-            day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-            daily_dist = df_filtered.groupby('day_of_week').size()
-            axes[1].bar(range(7), [daily_dist.get(i, 0) for i in range(7)], 
-                       color='coral', alpha=0.7)
-            axes[1].set_xticks(range(7))
-            axes[1].set_xticklabels(day_names)
-            axes[1].set_title('Accident Distribution by Day of Week', fontsize=14, fontweight='bold')
-            axes[1].set_ylabel('Number of Accidents', fontsize=12)
-            axes[1].grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"✓ Saved time-series plot to {save_path}")
-        plt.show()
+            distribution = timestamps.dt.dayofweek.value_counts().reindex(range(7), fill_value=0)
+        
+        index, values = self.renderer.decimate(demand_series.index.to_numpy(), demand_series.to_numpy())
+        if rolling_avg is not None:
+            rolling_avg = self.renderer.decimate(rolling_avg.index.to_numpy(), rolling_avg.to_numpy())
+        
+        return self.renderer.submit(_draw_demand_time_series, index, values, rolling_avg, window_size,
+                                    distribution, frequency, save_path=save_path, figsize=(15, 10))
     
     # ==================== FILTERING ====================
     
     def _filter_data(self, severity_filter=None, date_range=None):
-        """Filter data by severity and date range"""
-        df_filtered = self.df.copy()
+        """
+        Filter data by severity and date range
         
-        # Filter by severity
-        if severity_filter and self.severity_col and self.severity_col in df_filtered.columns:
-            df_filtered = df_filtered[df_filtered[self.severity_col].isin(severity_filter)]
+        A date range is two binary searches over the timestamp-sorted rows and
+        gives a slice of self.df (a view, not a copy); a severity filter is a
+        mask over the precomputed severity codes of that slice only. The result
+        shares data with self.df, so callers must not modify it.
+        """
+        start, stop = 0, len(self.df)
         
         # Filter by date range
-        if date_range and self.timestamp_col and self.timestamp_col in df_filtered.columns:
+        if date_range and self._times is not None:
             start_date, end_date = date_range
-            if isinstance(start_date, str):
-                start_date = pd.to_datetime(start_date)
-            if isinstance(end_date, str):
-                end_date = pd.to_datetime(end_date)
-            df_filtered = df_filtered[
-                (df_filtered[self.timestamp_col] >= start_date) &
-                (df_filtered[self.timestamp_col] <= end_date)
-            ]
+            start = int(self._times.searchsorted(pd.to_datetime(start_date), side='left'))
+            stop = max(start, int(self._times.searchsorted(pd.to_datetime(end_date), side='right')))
+        df_filtered = self.df.iloc[start:stop]
+        
+        # Filter by severity
+        if severity_filter and self._severity_codes is not None:
+            wanted = self._severity_levels.get_indexer(pd.Index(list(severity_filter)))
+            mask = np.isin(self._severity_codes[start:stop], wanted[wanted >= 0])
+            if not mask.all():
+                df_filtered = df_filtered[mask]
         
         return df_filtered
     
+    def _severity_colors(self, severity):
+        """Marker color per row, computed once per distinct severity"""
+        codes, uniques = pd.factorize(pd.Series(severity).astype(str))
+        return np.array([self._get_severity_color(u) for u in uniques], dtype=object)[codes]
+    
+    def _marker_layer(self, df, with_time=False):
+        """
+        Single FastMarkerCluster layer of severity-colored circle markers
+        
+        Rows are passed to the browser as [lat, lon, color, popup] arrays and
+        drawn by one callback, instead of one folium object per marker.
+        """
+        if self.severity_col and self.severity_col in df.columns:
+            severity = df[self.severity_col].astype(str)
+        else:
+            severity = pd.Series('Unknown', index=df.index)
+        popups = 'Severity: ' + severity
+        if with_time and self.timestamp_col and self.timestamp_col in df.columns:
+            popups = popups + '<br>Time: ' + df[self.timestamp_col].astype(str)
+        
+        data = pd.DataFrame({
+            'lat': df[self.lat_col].to_numpy(dtype=float),
+            'lon': df[self.lon_col].to_numpy(dtype=float),
+            'color': self._severity_colors(severity.to_numpy()),
+            'popup': popups.to_numpy(),
+        })
+        return FastMarkerCluster(data.values.tolist(), callback=_CIRCLE_MARKER_CALLBACK)
+    
     def _get_severity_color(self, severity):
         """Get color based on severity level"""
         severity_lower = str(severity).lower()
@@ -429,8 +603,7 @@ class VisualizationDashboard:
         
         # 2. Time series
         if self.timestamp_col:
-            df_ts = self.df.set_index(self.timestamp_col)
-            demand = df_ts.resample('H').size()
+            demand = pd.Series(1, index=pd.DatetimeIndex(self.df[self.timestamp_col])).resample('H').size()
             fig.add_trace(
                 go.Scatter(x=demand.index, y=demand.values, mode='lines', name='Demand'),
                 row=1, col=2
@@ -446,8 +619,7 @@ class VisualizationDashboard:
         
         # 4. Hourly pattern
         if self.timestamp_col:
-            self.df['hour'] = pd.to_datetime(self.df[self.timestamp_col]).dt.hour
-            hourly_counts = self.df['hour'].value_counts().sort_index()
+            hourly_counts = self.df[self.timestamp_col].dt.hour.value_counts().sort_index()
             fig.add_trace(
                 go.Bar(x=hourly_counts.index, y=hourly_counts.values, name='Hourly'),
                 row=2, col=2
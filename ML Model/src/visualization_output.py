@@ -7,6 +7,7 @@ import pandas as pd
 import numpy as np
 import json
 import os
+import tempfile
 from datetime import datetime
 
 
@@ -74,78 +75,183 @@ class VisualizationOutput:
         
         return lat_col, lon_col
     
+    def _severity_labels(self, codes):
+        """Severity label per code, looked up once per distinct code"""
+        unique, inverse = np.unique(codes, return_inverse=True)
+        labels = np.array([self.severity_map.get(c, f'Level_{c}') for c in unique.tolist()], dtype=object)
+        return labels[inverse]
+    
+    def _prediction_columns(self, include_test_indices=True):
+        """
+        Gather ids, labels, probabilities, coordinates and actual values as arrays
+        
+        Coordinates are looked up by position in self.df (test index values
+        are positions when the split came from a default RangeIndex).
+        """
+        lat_col, lon_col = self.find_coordinate_columns()
+        proba = np.asarray(self.model.predict_proba(self.X_test), dtype=float)
+        predictions = np.asarray(self.predictions)
+        n = len(predictions)
+        
+        # Get original dataframe indices for test set
+        test_indices = np.arange(len(self.X_test))
+        if include_test_indices and hasattr(self.X_test, 'index'):
+            index = np.asarray(self.X_test.index)
+            if np.issubdtype(index.dtype, np.integer):
+                test_indices = index
+        test_indices = test_indices[:n]
+        
+        columns = {
+            'id': test_indices.astype(np.int64),
+            'severity': self._severity_labels(predictions),
+            'severity_code': predictions.astype(np.int64),
+            'confidence': proba.max(axis=1),
+            'probabilities': pd.DataFrame(
+                proba, columns=[self.severity_map.get(i, f'Level_{i}') for i in range(proba.shape[1])]
+            ),
+            'has_coordinates': np.zeros(n, dtype=bool),
+        }
+        
+        # Add coordinates if available (rows without finite coordinates get none)
+        if lat_col and lon_col:
+            in_range = (test_indices >= 0) & (test_indices < len(self.df))
+            positions = np.where(in_range, test_indices, 0)
+            latitude = pd.to_numeric(self.df[lat_col], errors='coerce').to_numpy(dtype=float)[positions]
+            longitude = pd.to_numeric(self.df[lon_col], errors='coerce').to_numpy(dtype=float)[positions]
+            columns['has_coordinates'] = in_range & np.isfinite(latitude) & np.isfinite(longitude)
+            columns['latitude'] = latitude
+            columns['longitude'] = longitude
+        
+        # Add actual severity where available
+        actual = np.asarray(self.y_test)[:n]
+        columns['has_actual'] = np.arange(n) < len(actual)
+        columns['actual_severity'] = self._severity_labels(actual)
+        columns['actual_severity_code'] = actual.astype(np.int64)
+        columns['prediction_correct'] = predictions[:len(actual)] == actual
+        return columns
+    
+    @staticmethod
+    def _json_members(frame):
+        """
+        Each row of frame as JSON object members ('"key":value,...')
+        
+        Float columns are written with repr, the shortest text that round-trips
+        (DataFrame.to_json caps double_precision at 15 digits), non-finite
+        floats as null; other columns go through DataFrame.to_json.
+        """
+        if frame.empty:
+            return []
+        columns = []
+        for name in frame.columns:
+            if frame[name].dtype.kind == 'f':
+                key = json.dumps(str(name)) + ':'
+                values = frame[name].to_numpy(dtype=float)
+                columns.append([key + (repr(v) if finite else 'null')
+                                for v, finite in zip(values.tolist(), np.isfinite(values))])
+            else:
+                text = frame[[name]].to_json(orient='records', lines=True)
+                columns.append([line[1:-1] for line in text.rstrip('\n').split('\n')])
+        return [','.join(members) for members in zip(*columns)]
+    
+    def _prediction_records(self, columns, start, stop):
+        """Compact JSON text of the prediction records in rows start:stop"""
+        rows = slice(start, stop)
+        n = stop - start
+        head = self._json_members(pd.DataFrame({
+            'id': columns['id'][rows],
+            'severity': columns['severity'][rows],
+            'severity_code': columns['severity_code'][rows],
+            'confidence': columns['confidence'][rows],
+        }))
+        probabilities = self._json_members(columns['probabilities'].iloc[rows])
+        
+        # Optional members are omitted (not null) for rows without them
+        optional = []
+        for mask_name, names in (('has_coordinates', ('latitude', 'longitude')),
+                                 ('has_actual', ('actual_severity', 'actual_severity_code',
+                                                 'prediction_correct'))):
+            members = np.full(n, '', dtype=object)
+            mask = columns[mask_name][rows]
+            if mask.any():
+                rows_with = np.flatnonzero(mask) + start
+                present = pd.DataFrame({name: columns[name][rows_with] for name in names})
+                members[mask] = [',' + m for m in self._json_members(present)]
+            optional.append(members)
+        
+        return ['{%s,"probabilities":{%s}%s%s}' % parts
+                for parts in zip(head, probabilities, *optional)]
+    
     def generate_predictions_json(self, output_file='output/predictions.json', 
-                                   include_test_indices=True):
+                                   include_test_indices=True, output_format=None,
+                                   chunk_size=100_000):
         """
         Generate JSON file with predictions and coordinates for frontend
         
+        Columns are gathered as arrays once; records are serialized and written
+        chunk by chunk, so memory stays flat for millions of predictions. The
+        file is written to a temporary path and moved into place, so readers
+        never see a partial file.
+        
         Args:
             output_file: Path to output JSON file
             include_test_indices: Whether to include test set indices
+            output_format: 'json' (compact {"metadata", "predictions"} document)
+                           or 'ndjson' (a {"metadata": ...} line, then one
+                           prediction per line); default from the file extension
+            chunk_size: Records serialized per write
         """
-        # Get coordinate columns
-        lat_col, lon_col = self.find_coordinate_columns()
+        if output_format is None:
+            output_format = 'ndjson' if output_file.endswith(('.ndjson', '.jsonl')) else 'json'
         
-        # Get predictions with probabilities
-        predictions_proba = self.model.predict_proba(self.X_test)
-        
-        # Create output data
-        output_data = {
-            'metadata': {
-                'generated_at': datetime.now().isoformat(),
-                'total_predictions': len(self.predictions),
-                'model_type': 'Random Forest',
-                'severity_levels': self.severity_map
-            },
-            'predictions': []
+        columns = self._prediction_columns(include_test_indices)
+        n = len(columns['id'])
+        metadata = {
+            'generated_at': datetime.now().isoformat(),
+            'total_predictions': n,
+            'model_type': 'Random Forest',
+            'severity_levels': {str(k): v for k, v in self.severity_map.items()}
         }
         
-        # Get original dataframe indices for test set
-        if include_test_indices:
-            test_indices = self.X_test.index if hasattr(self.X_test, 'index') else range(len(self.X_test))
-        else:
-            test_indices = range(len(self.X_test))
-        
-        for idx, (test_idx, pred, proba) in enumerate(zip(test_indices, self.predictions, predictions_proba)):
-            prediction_entry = {
-                'id': int(test_idx) if isinstance(test_idx, (int, np.integer)) else idx,
-                'severity': self.severity_map.get(pred, f'Level_{pred}'),
-                'severity_code': int(pred),
-                'confidence': float(max(proba)),
-                'probabilities': {
-                    self.severity_map.get(i, f'Level_{i}'): float(prob) 
-                    for i, prob in enumerate(proba)
-                }
-            }
-            
-            # Add coordinates if available
-            if lat_col and lon_col and test_idx < len(self.df):
-                try:
-                    prediction_entry['latitude'] = float(self.df.iloc[test_idx][lat_col])
-                    prediction_entry['longitude'] = float(self.df.iloc[test_idx][lon_col])
-                except:
-                    pass
-            
-            # Add actual severity if available
-            if idx < len(self.y_test):
-                actual = self.y_test.iloc[idx] if hasattr(self.y_test, 'iloc') else self.y_test[idx]
-                prediction_entry['actual_severity'] = self.severity_map.get(actual, f'Level_{actual}')
-                prediction_entry['actual_severity_code'] = int(actual)
-                prediction_entry['prediction_correct'] = bool(pred == actual)
-            
-            output_data['predictions'].append(prediction_entry)
-        
-        # Save to file
-        os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
-        
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
+        # Save to file, through a uniquely named temporary file in the same
+        # directory so concurrent writers never share one
+        output_dir = os.path.dirname(output_file) or '.'
+        os.makedirs(output_dir, exist_ok=True)
+        f = tempfile.NamedTemporaryFile('w', dir=output_dir, delete=False,
+                                        prefix=os.path.basename(output_file) + '.', suffix='.tmp')
+        tmp_file = f.name
+        try:
+            self._write_predictions(f, columns, n, metadata, output_format, chunk_size)
+            f.close()
+            # mkstemp creates the file owner-only; keep the output readable like open() would
+            os.chmod(tmp_file, 0o644)
+            os.replace(tmp_file, output_file)
+        except BaseException:
+            f.close()
+            os.remove(tmp_file)
+            raise
         
         print(f"\nPredictions JSON saved to {output_file}")
-        print(f"Total predictions: {len(output_data['predictions'])}")
+        print(f"Total predictions: {n}")
         
         return output_file
     
+    def _write_predictions(self, f, columns, n, metadata, output_format, chunk_size):
+        """Write the metadata and prediction records to the open file f"""
+        if output_format == 'ndjson':
+            f.write(json.dumps({'metadata': metadata}, separators=(',', ':')) + '\n')
+        else:
+            f.write('{"metadata":' + json.dumps(metadata, separators=(',', ':')) + ',"predictions":[')
+        
+        for start in range(0, n, chunk_size):
+            records = self._prediction_records(columns, start, min(start + chunk_size, n))
+            if output_format == 'ndjson':
+                f.write('\n'.join(records) + '\n')
+            else:
+                f.write((',' if start else '') + ','.join(records))
+        
+        if output_format != 'ndjson':
+            f.write(']}')
+    
     def generate_summary_statistics(self, output_file='output/summary_stats.json'):
         """
         Generate summary statistics JSON
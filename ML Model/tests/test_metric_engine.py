@@ -0,0 +1,159 @@
+"""
+Parity of src/evaluation/metric_engine.py with sklearn.metrics.
+
+Run from the ML Model directory:
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.metrics import (
+    classification_report, confusion_matrix, f1_score, precision_recall_curve,
+    precision_score, recall_score, roc_auc_score
+)
+
+# Ensure src/ modules are importable when running from repository root
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from src.evaluation.metric_engine import (
+    best_f1_threshold, binary_curve, classification_report_text, confusion_counts,
+    metrics_from_confusion, precision_recall_from_curve, roc_auc_from_curve
+)
+
+
+def _labels_case(name, seed=0, n=500):
+    """(y_true, y_pred) for one labelling scenario"""
+    rng = np.random.default_rng(seed)
+    if name == 'binary':
+        return rng.integers(0, 2, n), rng.integers(0, 2, n)
+    if name == 'multiclass':
+        return rng.integers(0, 4, n), rng.integers(0, 4, n)
+    if name == 'missing_from_predictions':
+        # Classes 2 and 3 are never predicted
+        return rng.integers(0, 4, n), rng.integers(0, 2, n)
+    if name == 'predicted_only':
+        # Class 3 is predicted but never true
+        return rng.integers(0, 3, n), rng.integers(0, 4, n)
+    if name == 'single_class':
+        return np.ones(n, dtype=int), np.ones(n, dtype=int)
+    if name == 'strings':
+        names = np.array(['High', 'Low', 'Medium'])
+        return names[rng.integers(0, 3, n)], names[rng.integers(0, 3, n)]
+    raise ValueError(name)
+
+
+LABEL_CASES = ['binary', 'multiclass', 'missing_from_predictions', 'predicted_only',
+               'single_class', 'strings']
+
+
+@pytest.mark.filterwarnings('ignore:A single label was found')
+@pytest.mark.parametrize('case', LABEL_CASES)
+def test_confusion_metrics_match_sklearn(case):
+    y_true, y_pred = _labels_case(case)
+    labels, cm = confusion_counts(y_true, y_pred)
+    metrics = metrics_from_confusion(cm)
+
+    np.testing.assert_array_equal(labels, np.union1d(y_true, y_pred))
+    np.testing.assert_array_equal(cm, confusion_matrix(y_true, y_pred, labels=labels))
+    assert metrics['accuracy'] == pytest.approx(np.mean(y_true == y_pred))
+
+    for name, score in (('precision', precision_score), ('recall', recall_score),
+                        ('f1', f1_score)):
+        np.testing.assert_allclose(
+            metrics[f'{name}_per_class'],
+            score(y_true, y_pred, labels=labels, average=None, zero_division=0))
+        for average in ('micro', 'macro', 'weighted'):
+            assert metrics[average][name] == pytest.approx(
+                score(y_true, y_pred, labels=labels, average=average, zero_division=0))
+
+
+@pytest.mark.parametrize('case', LABEL_CASES)
+@pytest.mark.parametrize('digits', [2, 4])
+def test_classification_report_matches_sklearn(case, digits):
+    y_true, y_pred = _labels_case(case)
+    labels, cm = confusion_counts(y_true, y_pred)
+    target_names = [f'Class {label}' for label in labels]
+
+    expected = classification_report(y_true, y_pred, labels=labels, target_names=target_names,
+                                     digits=digits, zero_division=0)
+    assert classification_report_text(metrics_from_confusion(cm), target_names,
+                                      digits=digits) == expected
+
+
+def test_confusion_counts_ignores_labels_outside_the_list():
+    y_true, y_pred = _labels_case('multiclass')
+    labels, cm = confusion_counts(y_true, y_pred, labels=[2, 0])
+    np.testing.assert_array_equal(cm, confusion_matrix(y_true, y_pred, labels=[2, 0]))
+
+
+def _scores_case(name, seed=0, n=400):
+    """(y_true, y_score) for one scoring scenario"""
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(0, 2, n)
+    if name == 'continuous':
+        return y_true, rng.random(n) + 0.3 * y_true
+    if name == 'ties':
+        # Few distinct scores, each shared by both classes
+        return y_true, np.round(rng.random(n) + 0.3 * y_true, 1)
+    if name == 'constant':
+        return y_true, np.full(n, 0.5)
+    if name == 'rare_positive':
+        y_true = (rng.random(n) < 0.02).astype(int)
+        return y_true, rng.random(n)
+    raise ValueError(name)
+
+
+SCORE_CASES = ['continuous', 'ties', 'constant', 'rare_positive']
+
+
+@pytest.mark.parametrize('case', SCORE_CASES)
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_precision_recall_curve_matches_sklearn(case, seed):
+    y_true, y_score = _scores_case(case, seed)
+    precision, recall, thresholds = precision_recall_from_curve(*binary_curve(y_true, y_score))
+    expected = precision_recall_curve(y_true, y_score)
+
+    np.testing.assert_allclose(precision, expected[0])
+    np.testing.assert_allclose(recall, expected[1])
+    np.testing.assert_allclose(thresholds, expected[2])
+    assert (best_f1_threshold(precision, recall, thresholds)
+            == best_f1_threshold(*expected))
+
+
+@pytest.mark.parametrize('case', SCORE_CASES)
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_roc_auc_matches_sklearn(case, seed):
+    y_true, y_score = _scores_case(case, seed)
+    fps, tps, _ = binary_curve(y_true, y_score)
+    assert roc_auc_from_curve(fps, tps) == pytest.approx(roc_auc_score(y_true, y_score))
+
+
+def test_pos_label_selects_the_positive_class():
+    y_true, y_score = _scores_case('ties')
+    labels = np.array(['no', 'yes'])[y_true]
+    fps, tps, _ = binary_curve(labels, y_score, pos_label='yes')
+    assert roc_auc_from_curve(fps, tps) == pytest.approx(roc_auc_score(y_true, y_score))
+
+
+def test_single_class_curve():
+    y_score = np.random.default_rng(0).random(50)
+
+    # No positives: sklearn sets recall to 1 everywhere (with a warning)
+    y_true = np.zeros(50, dtype=int)
+    precision, recall, thresholds = precision_recall_from_curve(*binary_curve(y_true, y_score))
+    with pytest.warns(UserWarning):
+        expected = precision_recall_curve(y_true, y_score)
+    np.testing.assert_allclose(precision, expected[0])
+    np.testing.assert_allclose(recall, expected[1])
+    np.testing.assert_allclose(thresholds, expected[2])
+
+    # ROC-AUC is undefined with one class, as in sklearn
+    for y_true in (np.zeros(50, dtype=int), np.ones(50, dtype=int)):
+        fps, tps, _ = binary_curve(y_true, y_score)
+        with pytest.raises(ValueError, match='Only one class'):
+            roc_auc_from_curve(fps, tps)